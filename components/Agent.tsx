@@ -41,6 +41,9 @@ const Agent = ({
 
   // Stop flag for the interview loop
   const shouldStopRef = useRef<boolean>(false);
+  // Current server session and turn, so a disconnect can cancel work still running server-side
+  const sessionIdRef = useRef<string | null>(null);
+  const turnIdRef = useRef<string | null>(null);
 
   useEffect(() => {
     if (messages.length > 0) {
@@ -91,21 +94,47 @@ const Agent = ({
     const baseUrl =
       process.env.NEXT_PUBLIC_INTERVIEW_SERVER_URL || "http://localhost:5000";
 
-    const postJson = async (url: string, body?: unknown) => {
+    const postJson = async (url: string, body?: unknown, turnId?: string) => {
       const res = await fetch(url, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          ...(turnId ? { "X-Turn-Id": turnId } : {}),
+        },
         body: body ? JSON.stringify(body) : undefined,
       });
       if (!res.ok) {
         const text = await res.text();
-        throw new Error(text || `Request failed: ${res.status}`);
+        const error: any = new Error(text || `Request failed: ${res.status}`);
+        error.status = res.status;
+        throw error;
       }
       return res.json();
     };
 
-    const getJson = async (url: string) => {
-      const res = await fetch(url);
+    // Safe to retry: the server replays the stored result for a repeated request_id
+    const postJsonWithRetry = async (
+      url: string,
+      body: Record<string, unknown>,
+      turnId?: string,
+      attempts = 3
+    ) => {
+      for (let attempt = 1; ; attempt++) {
+        try {
+          return await postJson(url, body, turnId);
+        } catch (e: any) {
+          // Client errors (including a cancelled turn) won't succeed on retry
+          if (attempt >= attempts || (e?.status >= 400 && e?.status < 500)) throw e;
+          console.warn(`Retrying ${url} (attempt ${attempt + 1})`, e);
+          await new Promise((r) => setTimeout(r, 500 * attempt));
+        }
+      }
+    };
+
+    const getJson = async (url: string, turnId?: string) => {
+      const res = await fetch(url, {
+        headers: turnId ? { "X-Turn-Id": turnId } : undefined,
+      });
       if (!res.ok) {
         const text = await res.text();
         throw new Error(text || `Request failed: ${res.status}`);
@@ -113,6 +142,42 @@ const Agent = ({
       return res.json();
     };
 
+    // Start server-side capture and follow pushed transcripts over SSE.
+    // Partials are shown as live captions; resolves as soon as end-of-turn fires.
+    const listenViaEvents = async (turnId: string): Promise<string | null> => {
+      const started = await postJson(`${baseUrl}/stt/start`, undefined, turnId);
+
+      return new Promise((resolve) => {
+        const source = new EventSource(
+          `${baseUrl}${started.events_url}?turn_id=${encodeURIComponent(turnId)}`
+        );
+        let latestFinal: string | null = null;
+        let settled = false;
+
+        const finish = (text: string | null) => {
+          if (settled) return;
+          settled = true;
+          source.close();
+          resolve(text);
+        };
+
+        source.addEventListener("partial", (e) => {
+          setLastMessage(JSON.parse((e as MessageEvent).data).text);
+        });
+        source.addEventListener("final", (e) => {
+          const data = JSON.parse((e as MessageEvent).data);
+          setLastMessage(data.text);
+          latestFinal = data.text;
+          if (data.formatted) finish(data.text);
+        });
+        source.addEventListener("end", (e) => {
+          const data = JSON.parse((e as MessageEvent).data);
+          finish(data.transcription || latestFinal);
+        });
+        source.onerror = () => finish(latestFinal);
+      });
+    };
+
     try {
       // Ensure we have an interview document id for history/feedback
       let currentInterviewId = activeInterviewId;
@@ -129,7 +194,7 @@ const Agent = ({
       }
 
       // Prepare interview data to send to backend
-      const interviewData: any = {};
+      const interviewData: any = { request_id: crypto.randomUUID() };
       if (role) interviewData.role = role;
       if (level) interviewData.level = level;
       if (techstack) interviewData.techstack = techstack;
@@ -137,11 +202,12 @@ const Agent = ({
       if (questions) interviewData.questions = questions;
 
       // Start interview session with interview data
-      const startData = await postJson(
+      const startData = await postJsonWithRetry(
         `${baseUrl}/api/start-interview`,
-        Object.keys(interviewData).length > 0 ? interviewData : undefined
+        interviewData
       );
       const sessionId: string = startData.session_id;
+      sessionIdRef.current = sessionId;
       const firstMessage: string = startData.message;
 
       setMessages((prev) => [
@@ -164,18 +230,28 @@ const Agent = ({
       while (true) {
         if (shouldStopRef.current) break;
 
+        // One id per voice turn so the server can trace STT -> respond together
+        const turnId = crypto.randomUUID();
+        turnIdRef.current = turnId;
+
         // Ask server to listen for user speech
         let userInput: string | null = null;
         // Try a few times before falling back to manual input
         for (let attempt = 0; attempt < 3 && !userInput; attempt++) {
           try {
-            const sttData = await getJson(`${baseUrl}/stt`);
-            if (sttData?.status === "ok" && sttData?.transcription) {
-              userInput = sttData.transcription as string;
-              break;
-            }
+            userInput = await listenViaEvents(turnId);
+            if (userInput) break;
           } catch (e) {
-            console.warn("STT attempt failed", e);
+            console.warn("Push STT unavailable, falling back to /stt", e);
+            try {
+              const sttData = await getJson(`${baseUrl}/stt`, turnId);
+              if (sttData?.status === "ok" && sttData?.transcription) {
+                userInput = sttData.transcription as string;
+                break;
+              }
+            } catch (err) {
+              console.warn("STT attempt failed", err);
+            }
           }
           // small delay before next attempt
           await new Promise((r) => setTimeout(r, 800));
@@ -196,10 +272,17 @@ const Agent = ({
           { role: "user", content: userInput! },
         ]);
 
-        const respond = await postJson(`${baseUrl}/api/respond`, {
-          session_id: sessionId,
-          response: userInput,
-        });
+        const respond = await postJsonWithRetry(
+          `${baseUrl}/api/respond`,
+          {
+            session_id: sessionId,
+            response: userInput,
+            request_id: turnId,
+            // Feedback is generated client-side by handleGenerateFeedback
+            feedback_mode: "none",
+          },
+          turnId
+        );
 
         const assistantMessage: string = respond.message;
         const completed: boolean = respond.status === "completed";
@@ -225,6 +308,8 @@ const Agent = ({
 
       setCallStatus(CallStatus.FINISHED);
     } catch (error: any) {
+      // Requests cancelled by handleDisconnect are expected, not errors
+      if (shouldStopRef.current) return;
       const message =
         error?.response?.data?.message ||
         error?.response?.data ||
@@ -240,6 +325,22 @@ const Agent = ({
   const handleDisconnect = () => {
     shouldStopRef.current = true;
     setCallStatus(CallStatus.FINISHED);
+
+    // Stop the pending LLM call, open mic stream or TTS for a user who has left
+    if (sessionIdRef.current) {
+      const baseUrl =
+        process.env.NEXT_PUBLIC_INTERVIEW_SERVER_URL || "http://localhost:5000";
+      fetch(`${baseUrl}/api/cancel`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          session_id: sessionIdRef.current,
+          turn_id: turnIdRef.current,
+          reason: "disconnect",
+        }),
+        keepalive: true,
+      }).catch((e) => console.warn("Cancel request failed", e));
+    }
   };
 
   return (
@@ -1,16 +1,50 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
-import json
-import uuid
+# Load environment variables before the local modules below read their settings at import
+load_dotenv()
 from datetime import datetime
-import torch
 from omegaconf import OmegaConf
 import urllib.request
-import sounddevice as sd
 import pyttsx3
+from llm_client import LLM_BACKEND, LLM_SCHEDULER, configure_llm_backend, create_llm_model, supports_response_schema
+from llm_cache import create_llm_cache_from_env
+from llm_scheduler import reset_client as reset_llm_client, set_client as set_llm_client
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from tracing import TRACER, TURN_ID_HEADER, run_in_context
+from stt_events import SttCapture, SttCaptureRegistry, format_sse
+from stt_pool import create_stt_pool_from_env
+from stt_audio import iter_pcm_chunks, read_wav_pcm
+from profiler import ProfilerBusy, SamplingProfiler, TracemallocTracker
+from idempotency import IDEMPOTENCY_KEY_HEADER, create_idempotency_store_from_env
+from cassettes import CASSETTE_PLAYER, CASSETTE_RECORDER, CassetteReplayMiss
+from session_store import create_session_archive_from_env, iter_sessions
+from columnar_archive import create_columnar_archive_from_env, create_session_evictor_from_env
+from question_bank import create_question_bank_from_env
+from structured_feedback import apply_to_candidate_info, format_feedback_text, generate_structured_feedback
+from prefork import PreforkServer, memory_usage, new_id, workers_memory_report
+from cancellation import CancelRegistry, OperationCancelled, activate, current_token, deactivate
+from interview_session import (
+    FAREWELL_PROMPT,
+    InterviewSession,
+    build_feedback_prompt,
+    build_turn_prompt,
+    should_end_interview,
+)
+from tts_engine import configure_torch_threads, create_tts_engine, default_num_threads, split_sentences, synthesize, warm_up
+from tts_pool import TTSPoolBusy, TTSWorkerError, create_tts_pool_from_env
+from tts_tiers import create_tiered_tts_from_env
+from audio_encoding import (
+    AudioChunks,
+    UnsupportedAudioFormat,
+    concatenate,
+    content_type_for,
+    negotiate_format,
+    stream_encoded,
+    validate_sample_rate,
+)
 
 # AssemblyAI imports
 import assemblyai as aai
@@ -29,23 +63,27 @@ import logging
 from typing import Type
 import threading
 import time
-
-# Load environment variables
-load_dotenv()
+import hmac
+import atexit
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 app = Flask(__name__)
 CORS(app, supports_credentials=True)
 
-# Configure Gemini API
+# Configure Gemini API (LLM_BACKEND=fake runs against a local fake model instead)
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if not GEMINI_API_KEY:
-    raise ValueError("Please set GEMINI_API_KEY in your .env file")
+configure_llm_backend(GEMINI_API_KEY)
 
-genai.configure(api_key=GEMINI_API_KEY)
+# Admin-only endpoints (profiling) require this token in the X-Admin-Token header
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
 
 # Configure AssemblyAI
 ASSEMBLYAI_API_KEY = os.getenv('ASSEMBLYAI_API_KEY', '8be40cb90d054beeb10bd8ca8ce00b0e')
 aai.settings.api_key = ASSEMBLYAI_API_KEY
+# Point at a local stand-in for offline tests and benchmarks
+ASSEMBLYAI_API_HOST = os.getenv('ASSEMBLYAI_API_HOST', 'streaming.assemblyai.com')
+# Replay this 16 kHz mono WAV at real-time pace instead of the microphone (offline runs with fake_stt_server.py)
+STT_AUDIO_FILE = os.getenv('STT_AUDIO_FILE')
 
 # Use the available models from your test
 GEMINI_MODELS = [
@@ -96,19 +134,31 @@ urllib.request.urlretrieve(url, "latest_silero_models.yml")
 
 models = OmegaConf.load("latest_silero_models.yml")
 
-language = "en"
-model_id = "v3_en"
-device = torch.device("cpu")
-
-model, _ = torch.hub.load(
-    repo_or_dir="snakers4/silero-models",
-    model="silero_tts",
-    language=language,
-    speaker=model_id,
-)
-model.to(device)
-
-engine = pyttsx3.init()
+# PREFORK_WORKERS > 0: load the model once here, then fork workers that share it copy-on-write
+PREFORK_WORKERS = int(os.getenv("PREFORK_WORKERS", "0"))
+
+# TTS_VARIANT: stock | quantized | jit, TTS_NUM_THREADS pins torch intra-op threads
+# (default: the cores split evenly between the processes that synthesize)
+# TTS_WORKERS > 0 moves synthesis into a process pool so it never runs on request threads
+if PREFORK_WORKERS > 0:
+    if os.getenv("TTS_WORKERS", "0") != "0":
+        print("⚠️ TTS_WORKERS is ignored in pre-fork mode; each worker synthesizes with the shared model")
+    tts_pool = None
+    # Warm up after forking: running torch's thread pools in the master is not fork-safe
+    model, tts_variant = create_tts_engine(warmup=False, workers=PREFORK_WORKERS)
+else:
+    tts_pool = create_tts_pool_from_env()
+    if tts_pool is None:
+        model, tts_variant = create_tts_engine()
+    else:
+        model, tts_variant = None, os.getenv("TTS_VARIANT", "stock")
+
+# pyttsx3 starts a platform speech driver, which does not survive fork: pre-fork workers start their own
+engine = pyttsx3.init() if PREFORK_WORKERS <= 0 else None
+
+# Silero while its queue is short; cached audio or the pyttsx3 voice above the load thresholds
+TTS_TIER_CONCURRENCY = tts_pool.num_workers if tts_pool else int(os.getenv("TTS_CONCURRENCY", "1"))
+tts_tiers = create_tiered_tts_from_env(engine, concurrency=TTS_TIER_CONCURRENCY)
 
 # AssemblyAI Streaming Variables
 is_streaming = False
@@ -118,192 +168,157 @@ client_instance = None
 transcribed_text = ""
 transcription_complete = False
 last_audio_time = 0
+stt_started_at = 0
 
-# ========== INTERVIEW SESSION CLASS ==========
-
-class InterviewSession:
-    def __init__(self, session_id, interview_data=None):
-        self.session_id = session_id
-        self.conversation_history = []
-        self.question_count = 0
-        self.start_time = datetime.now()
-        self.is_completed = False
-        
-        # Store interview metadata from form
-        self.interview_data = interview_data or {}
-        self.role = self.interview_data.get('role', 'Software Engineer')
-        self.level = self.interview_data.get('level', 'intermediate')
-        self.techstack = self.interview_data.get('techstack', [])
-        self.interview_type = self.interview_data.get('type', 'Technical')
-        self.questions = self.interview_data.get('questions', [])
-        
-        self.candidate_info = {
-            'applied_role': self.role,  # Pre-fill with form data
-            'introduction': '',
-            'skills_mentioned': list(self.techstack) if isinstance(self.techstack, list) else [],
-            'experience_level': self.level,
-            'communication_score': 0,
-            'technical_score': 0,
-            'key_strengths': [],
-            'areas_for_improvement': []
-        }
-        self.all_questions_answers = []  # Store all Q&A for feedback
-        self.topic_coverage = {
-            'algorithms': 0,
-            'data_structures': 0,
-            'system_design': 0,
-            'coding': 0,
-            'problem_solving': 0,
-            'technical_concepts': 0
-        }
-        
-        # Generate system prompt with interview data
-        system_prompt = self._generate_system_prompt()
-        self.add_message("system", system_prompt)
-    
-    def _generate_system_prompt(self):
-        """Generate system prompt based on interview metadata"""
-        techstack_str = ", ".join(self.techstack) if isinstance(self.techstack, list) else str(self.techstack)
-        
-        # Build questions context - CRITICAL for question scope
-        questions_context = ""
-        if self.questions and len(self.questions) > 0:
-            questions_list = "\n".join([f"{i+1}. {q}" for i, q in enumerate(self.questions)])
-            questions_context = f"""
-
-═══════════════════════════════════════════════════════════════
-PREPARED QUESTIONS FOR THIS INTERVIEW (MANDATORY SCOPE):
-═══════════════════════════════════════════════════════════════
-You have {len(self.questions)} prepared questions. You MUST ask questions ONLY from this list or variations/clarifications based on these questions.
-
-{questions_list}
-
-CRITICAL: All your questions MUST be directly related to these {len(self.questions)} prepared questions. You can:
-- Ask these questions in natural conversation flow
-- Adapt them based on candidate's previous answers
-- Ask follow-up questions related to these topics
-- BUT NEVER ask questions outside this scope or unrelated topics
-═══════════════════════════════════════════════════════════════
-"""
-        else:
-            questions_context = f"""
-
-═══════════════════════════════════════════════════════════════
-QUESTION SCOPE - NO PREPARED QUESTIONS PROVIDED
-═══════════════════════════════════════════════════════════════
-Since no specific questions were provided, you must generate questions STRICTLY based on:
-- Position: {self.role}
-- Level: {self.level}
-- Technologies: {techstack_str}
-- Type: {self.interview_type}
-
-ALL questions MUST be relevant to these specific criteria above.
-═══════════════════════════════════════════════════════════════
-"""
-        
-        return f"""
-You are an expert technical interviewer conducting an interview for a {self.role} position at {self.level} level. 
-
-═══════════════════════════════════════════════════════════════
-INTERVIEW CARD DETAILS (MANDATORY SCOPE - DO NOT DEVIATE):
-═══════════════════════════════════════════════════════════════
-- Position/Role: {self.role}
-- Experience Level: {self.level}
-- Required Technologies: {techstack_str}
-- Interview Type: {self.interview_type}
-{questions_context}
-
-CRITICAL QUESTION SCOPE RULES:
-1. ALL questions MUST be based ONLY on the interview card details above
-2. Questions MUST relate to: {self.role} position, {self.level} level concepts, {techstack_str} technologies
-3. Interview type focus: {self.interview_type} questions
-4. DO NOT ask questions outside this scope
-5. DO NOT ask about unrelated technologies, roles, or topics
-6. Every question must align with at least one of: role, level, technology, or prepared questions
-═══════════════════════════════════════════════════════════════
-
-INTERVIEW FLOW GUIDELINES:
-1. START with asking the candidate to introduce themselves (name, background, experience)
-2. DO NOT ask about the role, level, or technologies - these are already known from the form
-3. After introduction, proceed directly to ask questions STRICTLY from the interview card scope above
-4. There is NO fixed number of questions - continue until the candidate asks to stop
-5. Each question should build upon the previous responses - make it conversational and contextual
-6. Ask one question at a time and wait for their response
-7. Provide brief, constructive feedback after each answer (1-2 sentences only)
-8. Questions should be {self.level} level and CONCISE
-9. Make the interview flow naturally like a real conversation
-10. When the candidate says they want to stop or end the interview, provide brief overall feedback
-11. KEEP QUESTIONS AND FEEDBACK BRIEF AND TO THE POINT - maximum 2 sentences each
-12. Avoid long explanations and detailed examples
-
-ANTI-REPETITION RULES (CRITICAL):
-- NEVER repeat or echo back the candidate's response
-- NEVER repeat your previous question
-- NEVER summarize what they said unless absolutely necessary for context
-- Simply acknowledge briefly (1 sentence) and move to the next question
-- Your responses should ONLY contain: brief feedback + new question (2-3 sentences total)
-- Do NOT say things like "You mentioned..." or "Based on your answer about..." - just respond naturally
-
-Remember: The candidate has already scheduled this interview with these specific requirements. 
-ALL questions must be within the scope of: {self.role} role, {self.level} level, {techstack_str} technologies, and {self.interview_type} focus.
-DO NOT deviate from this scope.
-"""
-        
-    def add_message(self, role, content):
-        self.conversation_history.append({
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    def extract_candidate_info(self, response):
-        """Extract candidate information from their responses"""
-        response_lower = response.lower()
-        
-        # Extract role information
-        if "applied for" in response_lower or "role" in response_lower:
-            self.candidate_info['applied_role'] = response
-        
-        # Extract introduction and experience
-        if "introduction" in response_lower or "name" in response_lower or "experience" in response_lower:
-            self.candidate_info['introduction'] = response
-            
-            # Extract experience level
-            experience_indicators = {
-                'junior': ['junior', 'entry level', 'fresh graduate', '0-2 years', 'starting my career'],
-                'mid-level': ['mid level', 'intermediate', '2-5 years', '3-5 years', 'few years of experience'],
-                'senior': ['senior', 'lead', '5+ years', 'extensive experience', 'many years']
-            }
-            
-            for level, indicators in experience_indicators.items():
-                if any(indicator in response_lower for indicator in indicators):
-                    self.candidate_info['experience_level'] = level
-                    break
-        
-        # Extract technical skills
-        tech_skills = [
-            'python', 'java', 'javascript', 'typescript', 'react', 'node', 'angular', 'vue',
-            'aws', 'azure', 'docker', 'kubernetes', 'sql', 'nosql', 'mongodb', 'redis',
-            'rest', 'graphql', 'ci/cd', 'git', 'agile', 'scrum', 'machine learning',
-            'data structures', 'algorithms', 'system design', 'microservices'
-        ]
-        
-        found_skills = [skill for skill in tech_skills if skill in response_lower]
-        if found_skills:
-            self.candidate_info['skills_mentioned'].extend(found_skills)
-            self.candidate_info['skills_mentioned'] = list(set(self.candidate_info['skills_mentioned']))
-    
-    def add_qa_pair(self, question, answer):
-        """Store question-answer pair for feedback"""
-        self.all_questions_answers.append({
-            'question': question,
-            'answer': answer,
-            'timestamp': datetime.now().isoformat()
-        })
+# Push-mode STT: the capture currently fed by on_turn, and recent captures by handle
+current_capture = None
+stt_captures = SttCaptureRegistry()
 
 # Store active interview sessions
 interview_sessions = {}
 
+# Cancel tokens per session and per turn: a disconnect or barge-in stops in-flight LLM/STT/TTS work
+CANCELLATION = CancelRegistry()
+CANCEL_REASONS = ('disconnect', 'barge_in', 'client_cancelled')
+# Routes whose work can be cancelled; others (metrics, health, SSE) must not push live turns out of the LRU
+CANCELLABLE_ROUTES = {'/tts', '/stt', '/stt/start', '/api/start-interview', '/api/respond', '/api/end-interview/<session_id>'}
+STT_DISCONNECT_GRACE_SECONDS = float(os.getenv('STT_DISCONNECT_GRACE_SECONDS', '5'))
+
+# Results of /api/start-interview and /api/respond by idempotency key, so client retries are safe
+idempotent_results = create_idempotency_store_from_env()
+
+# Finished interviews are appended here so they can be re-graded offline (see regrade.py).
+# Both archives are opt-in: set one of SESSION_ARCHIVE_PATH / COLUMNAR_ARCHIVE_DIR to a data directory
+SESSION_ARCHIVE = create_session_archive_from_env()
+
+# Completed sessions are moved out of interview_sessions in batches into compressed columnar segments
+COLUMNAR_ARCHIVE = create_columnar_archive_from_env()
+session_evictor = create_session_evictor_from_env(COLUMNAR_ARCHIVE, interview_sessions) if COLUMNAR_ARCHIVE is not None else None
+
+# Canned replies used when the LLM call fails; never banked as real questions
+EMPTY_RESPONSE_FALLBACK = "Thank you for that response. Let me ask you another question based on what you've shared."
+FALLBACK_RESPONSES = [
+    "Thank you for sharing that. What would you say is the most challenging aspect?",
+    "I appreciate your response. Could you elaborate briefly?",
+    "That's interesting. What factors would you consider?",
+]
+
+# Questions from completed interviews, served again for repeated interview cards
+QUESTION_BANK = create_question_bank_from_env(ignore=[EMPTY_RESPONSE_FALLBACK, *FALLBACK_RESPONSES])
+if QUESTION_BANK is not None and SESSION_ARCHIVE is not None and os.path.exists(SESSION_ARCHIVE.path):
+    print(f"📚 Question bank: {QUESTION_BANK.load(iter_sessions(SESSION_ARCHIVE.path))} questions from {SESSION_ARCHIVE.path}")
+
+# Client-facing routes captured to cassettes (CASSETTE_MODE=record) and driven by replay_cassettes.py
+CASSETTE_ROUTES = {
+    '/api/start-interview', '/api/respond', '/api/end-interview/<session_id>', '/api/feedback/<session_id>',
+    '/api/cancel', '/tts', '/stt', '/stt/start', '/stt/events/<handle>', '/stt/result/<handle>', '/stt/stop',
+}
+if CASSETTE_RECORDER is not None:
+    # Sessions still in progress at shutdown are written as they are
+    atexit.register(CASSETTE_RECORDER.flush)
+
+# ========== METRICS ==========
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency per route', ['route', 'method', 'status'])
+TTS_SYNTHESIS_SECONDS = REGISTRY.histogram(
+    'tts_synthesis_duration_seconds', 'TTS synthesis time', ['engine'])
+TTS_REAL_TIME_FACTOR = REGISTRY.histogram(
+    'tts_real_time_factor', 'TTS synthesis time divided by audio duration', ['engine'],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0))
+STT_SESSION_SECONDS = REGISTRY.histogram(
+    'stt_session_duration_seconds', 'Duration of an STT capture session')
+STT_TIME_TO_FINAL_SECONDS = REGISTRY.histogram(
+    'stt_time_to_final_transcript_seconds', 'Time from STT start to the first end-of-turn transcript')
+REGISTRY.gauge(
+    'interview_sessions_active', 'Interview sessions that have not completed',
+    function=lambda: sum(1 for s in list(interview_sessions.values()) if not s.is_completed))
+REGISTRY.gauge(
+    'interview_sessions_total', 'Interview sessions held in memory',
+    function=lambda: len(interview_sessions))
+REGISTRY.gauge(
+    'interview_sessions_memory_bytes', 'Estimated memory held by in-memory interview sessions',
+    function=lambda: sum(s.estimated_size_bytes() for s in list(interview_sessions.values())))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+    # Root span for this request, grouped under the client's turn id when one is sent
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    # EventSource can't send headers, so the turn id may also come as ?turn_id=;
+    # generated ones hash to this worker, so a later cancel by turn_id reaches it
+    turn_id = request.headers.get(TURN_ID_HEADER) or request.args.get('turn_id') or new_id(hex=True)
+    g.trace_span, g.trace_token = TRACER.start_span(f"{request.method} {route}", trace_id=turn_id, route=route)
+    
+    # Work done for this request checks the turn's cancel token at its checkpoints
+    if route in CANCELLABLE_ROUTES:
+        g.cancel_token = CANCELLATION.turn(turn_id)
+        g.cancel_context = activate(g.cancel_token)
+    
+    # LLM slots are shared fairly between sessions (or client addresses before a session exists)
+    body = request.get_json(silent=True) if request.is_json else None
+    session_id = (request.view_args or {}).get('session_id') or (body.get('session_id') if isinstance(body, dict) else None)
+    g.llm_client_context = set_llm_client(session_id or request.remote_addr)
+    
+    # CASSETTE_MODE=record: capture this request and the upstream calls it makes
+    if CASSETTE_RECORDER is not None and route in CASSETTE_ROUTES:
+        g.cassette_context = CASSETTE_RECORDER.begin_request(turn_id)
+
+@app.after_request
+def record_request_metrics(response):
+    start = getattr(g, 'request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, method=request.method, status=response.status_code)
+
+    span = getattr(g, 'trace_span', None)
+    if span is not None:
+        span.set_attribute('status_code', response.status_code)
+        response.headers[TURN_ID_HEADER] = span.trace_id
+    
+    if getattr(g, 'cassette_context', None) is not None:
+        record_cassette_request(response)
+    return response
+
+def record_cassette_request(response):
+    """Add the finished request to its session's cassette (session id from the path, body or response)"""
+    body = request.get_json(silent=True) if request.is_json else None
+    response_data = response.get_json(silent=True) if response.is_json else None
+    session_id = (
+        (request.view_args or {}).get('session_id')
+        or (body or {}).get('session_id')
+        or (response_data or {}).get('session_id')
+    )
+    CASSETTE_RECORDER.end_request(
+        g.cassette_context,
+        session_id,
+        method=request.method,
+        path=request.path,
+        query=request.query_string.decode(),
+        body=body,
+        idempotency_key=request.headers.get(IDEMPOTENCY_KEY_HEADER),
+        status=response.status_code,
+        seconds=round(time.perf_counter() - g.request_start, 3),
+        # Ids the server generated, so a replay can map them to the ones it gets back
+        ids={key: response_data[key] for key in ('session_id', 'handle') if isinstance(response_data, dict) and key in response_data},
+    )
+    g.cassette_context = None
+
+@app.teardown_request
+def end_request_span(exc):
+    span = getattr(g, 'trace_span', None)
+    if span is not None:
+        TRACER.end_span(span, g.trace_token, status='error' if exc or span.attributes.get('status_code', 200) >= 500 else None)
+    cancel_context = getattr(g, 'cancel_context', None)
+    if cancel_context is not None:
+        # The turn is over: drop its link from the session token so links do not pile up
+        g.cancel_token.detach()
+        deactivate(cancel_context)
+    llm_client_context = getattr(g, 'llm_client_context', None)
+    if llm_client_context is not None:
+        reset_llm_client(llm_client_context)
+
 # ========== ASSEMBLYAI EVENT HANDLERS ==========
 
 def on_begin(self: Type[StreamingClient], event: BeginEvent):
@@ -319,6 +334,18 @@ def on_turn(self: Type[StreamingClient], event: TurnEvent):
     if event.transcript.strip():
         print(f"Transcribed: {event.transcript} ({event.end_of_turn})")
         transcribed_text = event.transcript
+        
+        # Push partial / final transcripts to push-mode listeners
+        capture = current_capture
+        if capture:
+            capture.publish('final' if event.end_of_turn else 'partial', {
+                'text': event.transcript,
+                'end_of_turn': event.end_of_turn,
+                'formatted': event.turn_is_formatted,
+            })
+            # End of a formatted turn: stop the mic now instead of waiting for the silence/time caps
+            if event.end_of_turn and event.turn_is_formatted and capture.stop_on_final:
+                threading.Thread(target=stop_speech_recognition_internal, daemon=True).start()
 
     if event.end_of_turn and not event.turn_is_formatted:
         params = StreamingSessionParameters(
@@ -328,6 +355,8 @@ def on_turn(self: Type[StreamingClient], event: TurnEvent):
     
     # Mark transcription as complete when we have a full turn
     if event.end_of_turn and event.transcript.strip():
+        if not transcription_complete:
+            STT_TIME_TO_FINAL_SECONDS.observe(time.time() - stt_started_at)
         transcription_complete = True
 
 def on_terminated(self: Type[StreamingClient], event: TerminationEvent):
@@ -343,7 +372,10 @@ class ControlledMicrophoneStream:
         self.mic_stream = None
         
     def __iter__(self):
-        self.mic_stream = aai.extras.MicrophoneStream(sample_rate=self.sample_rate)
+        if STT_AUDIO_FILE:
+            self.mic_stream = iter_pcm_chunks(read_wav_pcm(STT_AUDIO_FILE, self.sample_rate), self.sample_rate)
+        else:
+            self.mic_stream = aai.extras.MicrophoneStream(sample_rate=self.sample_rate)
         return self
     
     def __next__(self):
@@ -378,16 +410,57 @@ class ControlledMicrophoneStream:
 
 # ========== UTILITY FUNCTIONS ==========
 
+def process_rss_bytes():
+    """Resident set size of this server process (Linux /proc, 0 if unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+REGISTRY.gauge('process_resident_memory_bytes', 'Resident memory size in bytes', function=process_rss_bytes)
+REGISTRY.gauge('process_proportional_memory_bytes', 'Proportional set size (shared pages split between sharers)',
+               function=lambda: memory_usage().get('pss_bytes', 0))
+REGISTRY.gauge('process_private_memory_bytes', 'Memory not shared with any other process',
+               function=lambda: sum(memory_usage().get(k, 0) for k in ('private_clean_bytes', 'private_dirty_bytes')))
+
+# Cassettes need every LLM call to reach the model: to be recorded, or to be answered from the tape in replay
+LLM_CACHE = create_llm_cache_from_env(enabled=CASSETTE_RECORDER is None and CASSETTE_PLAYER is None)
+MODEL_PROBE_PROMPT = "Say 'Hello' in one word."
+LLM_CACHE_VARIANTS = int(os.getenv('LLM_CACHE_VARIANTS', '3'))
+
+# Background LLM work (speculative first question) runs off the request threads
+SPECULATIVE_FIRST_QUESTION = os.getenv('SPECULATIVE_FIRST_QUESTION', '1') == '1'
+SPECULATIVE_WAIT_SECONDS = float(os.getenv('SPECULATIVE_WAIT_SECONDS', '30'))
+llm_background_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('LLM_BACKGROUND_WORKERS', '8')), thread_name_prefix='llm-background')
+# Feedback jobs get their own threads: a burst of them waiting for batch LLM slots must not
+# queue the interactive first questions above behind them
+feedback_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('FEEDBACK_WORKERS', '4')), thread_name_prefix='llm-feedback')
+# Server-side feedback on completion: skipped, generated in the background, or returned inline
+FEEDBACK_MODES = ('none', 'deferred', 'inline')
+# Longest an inline-mode completion waits for feedback before answering "pending" with a feedback_url
+INLINE_FEEDBACK_TIMEOUT = float(os.getenv('INLINE_FEEDBACK_TIMEOUT', '30'))
+# "structured": JSON scores/strengths validated locally and filled into candidate_info; "prose": free-form text
+FEEDBACK_FORMAT = os.getenv('FEEDBACK_FORMAT', 'structured')
+FEEDBACK_FIELD_RETRIES = int(os.getenv('FEEDBACK_FIELD_RETRIES', '2'))
+FEEDBACK_ERROR_TEXT = "Thank you for completing the interview. Your responses have been recorded and will be reviewed by our team."
+# google-generativeai 0.3.0 has no response_schema: the schema then goes in the prompt only
+LLM_RESPONSE_SCHEMA = supports_response_schema()
+SPECULATIVE_FIRST_QUESTIONS = REGISTRY.counter(
+    'speculative_first_questions', 'Speculatively generated first questions by outcome', ['result'])
+
 def find_working_model():
     """Find a working Gemini model from the available list"""
     print("🔍 Searching for working model...")
     
     for model_name in GEMINI_MODELS:
         try:
-            model = genai.GenerativeModel(model_name)
-            # Test with a simple prompt
-            response = model.generate_content("Say 'Hello' in one word.")
-            if response.text:
+            model = create_llm_model(model_name)
+            # Test with a simple prompt; never cached, since it checks the current key and backend
+            response = model.generate_content(MODEL_PROBE_PROMPT)
+            if response and response.text:
                 print(f"✅ Successfully connected to model: {model_name}")
                 return model_name
         except Exception as e:
@@ -400,7 +473,7 @@ def find_working_model():
         for model in models:
             if 'generateContent' in model.supported_generation_methods:
                 try:
-                    test_model = genai.GenerativeModel(model.name)
+                    test_model = create_llm_model(model.name)
                     response = test_model.generate_content("Test")
                     if response.text:
                         print(f"✅ Successfully connected to available model: {model.name}")
@@ -412,208 +485,228 @@ def find_working_model():
     
     return None
 
-# Find and set the working model
-WORKING_MODEL = find_working_model()
-if not WORKING_MODEL:
-    raise Exception("No working Gemini model found. Please check your API key and region.")
-
-print(f"🎯 Using model: {WORKING_MODEL}")
+def resolve_working_model():
+    """Find and set the working model"""
+    global WORKING_MODEL
+    WORKING_MODEL = find_working_model()
+    if not WORKING_MODEL:
+        raise Exception("No working Gemini model found. Please check your API key and region.")
+    print(f"🎯 Using model: {WORKING_MODEL}")
+
+# Pre-fork workers probe after forking: gRPC channels opened in the master do not survive fork
+WORKING_MODEL = None
+if PREFORK_WORKERS <= 0:
+    resolve_working_model()
+
+def start_background_tasks():
+    """Pre-generate farewell variants and pre-connect STT sessions in the background"""
+    stt_pool.start()
+    if session_evictor is not None:
+        session_evictor.start()
+    threading.Thread(
+        target=LLM_CACHE.prefill,
+        args=('farewell', create_llm_model(WORKING_MODEL, priority='background'), FAREWELL_PROMPT, LLM_CACHE_VARIANTS),
+        daemon=True,
+    ).start()
+
+def init_prefork_worker(index):
+    """Per-worker setup after fork: LLM client and model probe, pyttsx3 voice, TTS warm-up, background tasks"""
+    global engine, tts_tiers
+    configure_llm_backend(GEMINI_API_KEY)
+    resolve_working_model()
+    engine = pyttsx3.init()
+    tts_tiers = create_tiered_tts_from_env(engine, concurrency=TTS_TIER_CONCURRENCY)
+    if model is not None:
+        configure_torch_threads(os.getenv("TTS_NUM_THREADS") or default_num_threads(PREFORK_WORKERS))
+        elapsed = warm_up(model)
+        print(f"🔥 Worker {index} TTS warm-up synthesis took {elapsed:.2f}s")
+    start_background_tasks()
 
 def generate_overall_feedback(conversation_history, candidate_info, qa_pairs):
     """Generate brief comprehensive feedback after interview ends"""
     try:
-        model = genai.GenerativeModel(WORKING_MODEL)
-        
-        # Prepare conversation summary for feedback
-        qa_summary = "\n".join([f"Q: {qa['question']}\nA: {qa['answer']}\n" for qa in qa_pairs])
-        
-        feedback_prompt = f"""
-As an expert technical interviewer, analyze the following interview and provide comprehensive feedback. Be objective and balanced in your assessment.
-
-Candidate Information:
-{json.dumps(candidate_info, indent=2)}
-
-Interview Conversation Summary:
-{qa_summary}
-
-Please provide structured feedback in the following format:
-
-1. Technical Proficiency (Score /100):
-- Knowledge of core concepts
-- Problem-solving capability
-- Code/system design understanding
-
-2. Communication & Soft Skills (Score /100):
-- Clarity of explanations
-- Question understanding
-- Professional interaction
-
-3. Overall Assessment:
-- Top 3 Strengths
-- Top 3 Areas for Improvement
-- Final Recommendation
-
-Remember:
-- Be specific with examples from their answers
-- Balance constructive criticism with positive feedback
-- Focus on actionable improvements
-- Keep the feedback professional and objective
-- Overall length should not exceed 200 words
-
-Format the response as a clear, well-structured assessment that would be valuable for both the candidate and hiring team.
-"""
+        # Feedback is a heavy batch job: it must not starve in-progress interviews
+        model = create_llm_model(WORKING_MODEL, priority='batch')
+        feedback_prompt = build_feedback_prompt(candidate_info, qa_pairs)
 
         response = model.generate_content(feedback_prompt)
         return response.text.strip() if response.text else "Thank you for your time. We appreciate your participation in this interview."
     
     except Exception as e:
         print(f"Feedback generation error: {e}")
-        return "Thank you for completing the interview. Your responses have been recorded and will be reviewed by our team."
+        return FEEDBACK_ERROR_TEXT
+
+def generate_structured_overall_feedback(candidate_info, qa_pairs):
+    """Feedback as validated JSON fields (retrying only failing fields), or None to fall back to prose
+
+    Only unparseable or invalid output falls back; LLM call errors are raised.
+    """
+    model = create_llm_model(WORKING_MODEL, priority='batch')
+    feedback, failing = generate_structured_feedback(
+        model, candidate_info, qa_pairs, LLM_RESPONSE_SCHEMA, retries=FEEDBACK_FIELD_RETRIES)
+    if failing:
+        print(f"⚠️ Structured feedback missing fields after retries: {failing}")
+    return feedback or None
 
 def generate_ai_response(conversation_history, is_final_feedback=False, interview_session=None):
     """Generate response using Gemini API with contextual awareness"""
     try:
         # Create model with working model name
-        model = genai.GenerativeModel(WORKING_MODEL)
-        
-        # Extract conversation context without full repetition
-        # Get key topics mentioned but not full responses
-        topic_summary = ""
-        last_user_msg = None
-        
-        # Find last user message (candidate's response)
-        for msg in reversed(conversation_history):
-            if msg['role'] == 'user':
-                last_user_msg = msg['content']
-                break
-        
-        # Build topic summary from conversation (without full text)
-        topics_mentioned = []
-        for msg in conversation_history:
-            if msg['role'] == 'user' and msg['content']:
-                # Extract key topics/technologies mentioned (simple approach)
-                content_lower = msg['content'].lower()
-                if any(word in content_lower for word in ['react', 'node', 'python', 'javascript', 'java', 'sql', 'database']):
-                    topics_mentioned.append("technical experience")
-                if 'experience' in content_lower or 'worked' in content_lower:
-                    topics_mentioned.append("work experience")
-        
-        topic_summary = ", ".join(set(topics_mentioned[:3])) if topics_mentioned else "general background"
+        model = create_llm_model(WORKING_MODEL)
         
         if is_final_feedback:
-            # Generate farewell message when interview ends
-            prompt = "The candidate has decided to end the interview. Please provide a brief polite closing message thanking them for their time. Keep it to one sentence. Do NOT repeat any previous conversation."
-            response = model.generate_content(prompt)
+            # Farewell prompt never changes: serve it from the cached variant pool
+            farewell = LLM_CACHE.generate_text('farewell', model, FAREWELL_PROMPT, variants=LLM_CACHE_VARIANTS)
+            if farewell:
+                return farewell
+            response = None
         else:
-            # Build enhanced prompt with role context and question scope
-            role_context = ""
-            question_scope = ""
-            
+            # The session tracks the last answer and answer count incrementally;
+            # only scan the history when called without one
             if interview_session:
-                techstack_str = ", ".join(interview_session.techstack) if isinstance(interview_session.techstack, list) else str(interview_session.techstack)
-                role_context = f"\n\nINTERVIEW CARD SCOPE (MANDATORY):\n- Role: {interview_session.role}\n- Level: {interview_session.level}\n- Technologies: {techstack_str}\n- Type: {interview_session.interview_type}"
-                
-                # Add question scope reminder
-                if interview_session.questions and len(interview_session.questions) > 0:
-                    question_scope = f"\n\nQUESTION SCOPE: You have {len(interview_session.questions)} prepared questions. Your next question MUST be:\n- From the prepared questions list, OR\n- A follow-up/clarification related to those questions, OR\n- Related to {interview_session.role} role, {interview_session.level} level, and {techstack_str} technologies\n\nDO NOT ask questions outside this scope!"
-                else:
-                    question_scope = f"\n\nQUESTION SCOPE: Your next question MUST be related to:\n- {interview_session.role} position\n- {interview_session.level} level concepts\n- {techstack_str} technologies\n- {interview_session.interview_type} interview focus\n\nDO NOT ask questions outside this scope!"
-            
-            # Build prompt that provides context but prevents repetition
-            if last_user_msg:
-                # Check if this is the first response after introduction/confirmation
-                # Count how many exchanges have happened
-                user_responses = [msg for msg in conversation_history if msg['role'] == 'user']
-                is_after_confirmation = len(user_responses) == 1
-                
-                if is_after_confirmation:
-                    # This is after introduction and confirmation - acknowledge and start technical questions
-                    prompt = f"""You are conducting a technical interview. The candidate has just introduced themselves and confirmed the interview details (role, level, tech stack, number of questions).
-
-{role_context}{question_scope}
-
-IMPORTANT: They have confirmed the interview details. Now start asking TECHNICAL questions based on the interview card scope above.
-
-Your response should:
-1. Briefly acknowledge their introduction and confirmation (1 sentence)
-2. Ask your FIRST technical question based on the interview card scope
-3. Maximum 2-3 sentences total
-4. Question MUST be within the scope: {interview_session.role if interview_session else 'role'}, {interview_session.level if interview_session else 'level'}, and technologies listed above
-
-Start with your first technical question now:"""
-                else:
-                    # Regular follow-up question
-                    prompt = f"""You are conducting a technical interview. The candidate just responded to your question.
-
-{role_context}{question_scope}
-
-CRITICAL ANTI-REPETITION RULES:
-1. NEVER repeat what the candidate just said - assume you already know their answer
-2. NEVER echo back phrases like "you mentioned..." or "based on your answer..."
-3. NEVER repeat your previous question
-4. Simply acknowledge briefly (1 short sentence) and ask the NEXT new question
-5. Maximum 2-3 sentences total: brief acknowledgment + new question
-6. Keep it natural and forward-moving
-7. REMEMBER: Next question MUST be within the interview card scope above
-
-GOOD example: "Good point. What's your approach to testing this?"
-BAD example: "Based on your answer about React hooks, you mentioned useState. Tell me about React hooks..." (DON'T DO THIS)
-
-Now respond with brief acknowledgment and next question (must be within scope):"""
+                last_user_msg = interview_session.last_user_message
+                user_response_count = interview_session.user_message_count
             else:
-                # This shouldn't happen, but fallback
-                prompt = f"""You are conducting a technical interview. The candidate has just introduced themselves.
-
-{role_context}{question_scope}
-
-Ask your first technical question. The question MUST be:
-- Within the interview card scope listed above
-- Related to {interview_session.role if interview_session else 'the position'} role
-- Appropriate for {interview_session.level if interview_session else 'the'} level
-- Keep it to 1-2 sentences
-- Do NOT repeat what they said in their introduction
-- Do NOT ask questions outside the scope"""
-
+                user_messages = [msg['content'] for msg in conversation_history if msg['role'] == 'user']
+                last_user_msg = user_messages[-1] if user_messages else None
+                user_response_count = len(user_messages)
+            
+            prompt = build_turn_prompt(interview_session, last_user_msg, user_response_count)
             response = model.generate_content(prompt)
         
         if response and response.text:
             return response.text.strip()
         else:
-            return "Thank you for that response. Let me ask you another question based on what you've shared."
+            return EMPTY_RESPONSE_FALLBACK
     
+    except (OperationCancelled, CassetteReplayMiss):
+        raise
     except Exception as e:
         print(f"Gemini API Error: {str(e)}")
         # Contextual fallback responses
-        fallback_responses = [
-            "Thank you for sharing that. What would you say is the most challenging aspect?",
-            "I appreciate your response. Could you elaborate briefly?",
-            "That's interesting. What factors would you consider?",
-        ]
         import random
-        return random.choice(fallback_responses)
-
-def should_end_interview(user_input):
-    """Check if user wants to end the interview"""
-    end_phrases = [
-        "end interview",
-        "stop interview",
-        "finish interview",
-        "conclude interview",
-        "that's all",
-        "i'm done",
-        "let's end",
-        "let's stop",
-        "can we stop",
-        "can we end",
-        "wrap up",
-        "finish up",
-        "no more",
-        "thank you that's it",
-        "we can stop here",
-        "end the session"
-    ]
-    user_input_lower = user_input.lower()
-    return any(phrase in user_input_lower for phrase in end_phrases)
+        return random.choice(FALLBACK_RESPONSES)
+
+def generate_first_question(interview_session):
+    """Generate the first technical question (after the introduction) from the interview card alone"""
+    model = create_llm_model(WORKING_MODEL, priority='background')
+    # Only the fact that an introduction exists matters to the prompt, not its content
+    prompt = build_turn_prompt(interview_session, "(introduction)", 1)
+    response = model.generate_content(prompt)
+    return response.text.strip() if response and response.text else None
+
+def take_prefetched_first_question(interview_session):
+    """Use the speculatively generated first question on the introduction turn, if it succeeded"""
+    future = interview_session.prefetched_first_question
+    if future is None:
+        return None
+    interview_session.prefetched_first_question = None
+    
+    if interview_session.user_message_count != 1:
+        future.cancel()
+        return None
+    
+    try:
+        question = future.result(timeout=SPECULATIVE_WAIT_SECONDS)
+    except Exception as e:
+        print(f"⚠️ Speculative first question unavailable, generating inline: {e}")
+        SPECULATIVE_FIRST_QUESTIONS.inc(result='failed')
+        return None
+    
+    SPECULATIVE_FIRST_QUESTIONS.inc(result='used' if question else 'failed')
+    return question
+
+def generate_session_feedback(interview_session):
+    """Background job: generate overall feedback and keep it on the session"""
+    with TRACER.span("generate_overall_feedback", session_id=interview_session.session_id, format=FEEDBACK_FORMAT):
+        structured = None
+        if FEEDBACK_FORMAT == 'structured':
+            try:
+                structured = generate_structured_overall_feedback(
+                    interview_session.candidate_info,
+                    interview_session.all_questions_answers
+                )
+            except Exception as e:
+                # A failed LLM call would fail the prose call too: don't spend a second one
+                print(f"Structured feedback generation error: {e}")
+                interview_session.feedback = FEEDBACK_ERROR_TEXT
+                return FEEDBACK_ERROR_TEXT
+        
+        if structured:
+            apply_to_candidate_info(interview_session.candidate_info, structured)
+            interview_session.structured_feedback = structured
+            feedback = format_feedback_text(structured)
+        else:
+            feedback = generate_overall_feedback(
+                interview_session.conversation_history,
+                interview_session.candidate_info,
+                interview_session.all_questions_answers
+            )
+    interview_session.feedback = feedback
+    return feedback
+
+def start_feedback_job(interview_session):
+    """Start overall feedback generation once per session and return its future"""
+    if interview_session.feedback_future is None:
+        interview_session.feedback_future = feedback_executor.submit(
+            run_in_context(generate_session_feedback, interview_session)
+        )
+    return interview_session.feedback_future
+
+def archive_session(interview_session):
+    """Archive a finished session and bank its questions, once its feedback job (if any) has completed"""
+    def archive(_=None):
+        if SESSION_ARCHIVE is not None:
+            SESSION_ARCHIVE.append(interview_session)
+        if QUESTION_BANK is not None:
+            QUESTION_BANK.add_session(interview_session.to_dict())
+        if CASSETTE_RECORDER is not None:
+            CASSETTE_RECORDER.finish(interview_session.session_id)
+    
+    if interview_session.feedback_future is not None:
+        interview_session.feedback_future.add_done_callback(archive)
+    else:
+        archive()
+
+def take_banked_question(interview_session):
+    """Next question from the question bank for this card, or None to generate it"""
+    if QUESTION_BANK is None:
+        return None
+    question = QUESTION_BANK.next_question(
+        interview_session.interview_data,
+        interview_session.user_message_count,
+        [qa['question'] for qa in interview_session.all_questions_answers],
+    )
+    if question is not None and interview_session.prefetched_first_question is not None:
+        # The bank filled up after this session started: drop the speculative generation
+        interview_session.prefetched_first_question.cancel()
+        interview_session.prefetched_first_question = None
+    return question
+
+def feedback_response_fields(interview_session, feedback_mode):
+    """Feedback part of a completion response for the requested feedback mode"""
+    if feedback_mode == 'none':
+        return {'feedback': None, 'feedback_status': 'skipped'}
+    
+    future = start_feedback_job(interview_session)
+    if feedback_mode == 'inline':
+        with TRACER.span("wait_overall_feedback", session_id=interview_session.session_id):
+            try:
+                return {
+                    'feedback': future.result(timeout=INLINE_FEEDBACK_TIMEOUT),
+                    'structured_feedback': interview_session.structured_feedback,
+                    'feedback_status': 'ready',
+                }
+            except FutureTimeoutError:
+                # Slow batch queue: answer now and let the client fetch feedback when it is ready
+                pass
+    
+    return {
+        'feedback': future.result() if future.done() else None,
+        'structured_feedback': interview_session.structured_feedback if future.done() else None,
+        'feedback_status': 'ready' if future.done() else 'pending',
+        'feedback_url': f"/api/feedback/{interview_session.session_id}",
+    }
 
 # ========== ASSEMBLYAI SPEECH FUNCTIONS ==========
 
@@ -661,15 +754,54 @@ def stop_speech_recognition_internal():
         except:
             pass
 
+def connect_stt_client(on_closed):
+    """Open an AssemblyAI streaming session ready for audio; on_closed fires if it ends while idle"""
+    client = StreamingClient(
+        StreamingClientOptions(
+            api_key=ASSEMBLYAI_API_KEY,
+            api_host=ASSEMBLYAI_API_HOST,
+        )
+    )
+    
+    client.on(StreamingEvents.Begin, on_begin)
+    client.on(StreamingEvents.Turn, on_turn)
+    client.on(StreamingEvents.Termination, on_terminated)
+    client.on(StreamingEvents.Error, on_error)
+    client.on(StreamingEvents.Termination, lambda client, event: on_closed())
+    client.on(StreamingEvents.Error, lambda client, error: on_closed())
+    
+    client.connect(
+        StreamingParameters(
+            sample_rate=16000,
+            format_turns=True
+        )
+    )
+    return client
+
+# Pre-connected STT sessions handed to captures and refilled in the background
+stt_pool = create_stt_pool_from_env(connect_stt_client)
+
+# Threads must not be running when the pre-fork master forks; workers start their own
+if PREFORK_WORKERS <= 0:
+    start_background_tasks()
+
 def start_speech_recognition():
     """Start AssemblyAI speech recognition and return transcribed text"""
-    global is_streaming, stop_event, client_instance, transcribed_text, transcription_complete, last_audio_time
+    global is_streaming, stop_event, client_instance, transcribed_text, transcription_complete, last_audio_time, stt_started_at
+    
+    cancel_token = current_token()
+    if cancel_token is not None:
+        cancel_token.check('stt')
+    
+    if CASSETTE_PLAYER is not None:
+        return replay_speech_recognition(cancel_token)
     
     # Reset variables
     transcribed_text = ""
     transcription_complete = False
     stop_event.clear()
     last_audio_time = time.time()
+    stt_started_at = last_audio_time
     
     with stream_lock:
         is_streaming = True
@@ -681,36 +813,30 @@ def start_speech_recognition():
     timeout_monitor_thread = threading.Thread(target=monitor_silence_timeout, args=(5,), daemon=True)
     timeout_monitor_thread.start()
     
-    client = StreamingClient(
-        StreamingClientOptions(
-            api_key=ASSEMBLYAI_API_KEY,
-            api_host="streaming.assemblyai.com",
-        )
-    )
+    # Usually a pre-connected session from the pool, so no handshake on the turn's critical path
+    with TRACER.span("stt.connect") as span:
+        client, warm = stt_pool.acquire()
+        span.set_attribute("warm", warm)
     
     client_instance = client
 
-    client.on(StreamingEvents.Begin, on_begin)
-    client.on(StreamingEvents.Turn, on_turn)
-    client.on(StreamingEvents.Termination, on_terminated)
-    client.on(StreamingEvents.Error, on_error)
-
-    client.connect(
-        StreamingParameters(
-            sample_rate=16000,
-            format_turns=True
-        )
-    )
-
+    # Cancelling the turn closes the mic and the AssemblyAI stream right away
+    if cancel_token is not None:
+        cancel_token.add_callback(stop_speech_recognition_internal)
+    
     try:
         # Use the controlled microphone stream
         controlled_stream = ControlledMicrophoneStream(sample_rate=16000)
-        client.stream(controlled_stream)
+        with TRACER.span("stt.stream"):
+            client.stream(controlled_stream)
             
     except Exception as e:
         if not stop_event.is_set():  # Only print error if not intentionally stopped
             print(f"\n[Error during streaming: {e}]")
     finally:
+        if cancel_token is not None:
+            cancel_token.remove_callback(stop_speech_recognition_internal)
+        
         # Small delay to ensure everything is processed
         time.sleep(0.1)
         
@@ -727,9 +853,25 @@ def start_speech_recognition():
         is_streaming = False
     stop_event.clear()
     client_instance = None
+    STT_SESSION_SECONDS.observe(time.time() - stt_started_at)
     
+    if cancel_token is not None:
+        cancel_token.check('stt')
+    
+    if CASSETTE_RECORDER is not None:
+        CASSETTE_RECORDER.record('stt', transcript=transcribed_text, seconds=round(time.time() - stt_started_at, 3))
     return transcribed_text
 
+def replay_speech_recognition(cancel_token):
+    """CASSETTE_MODE=replay: the transcript recorded for this turn, after the recorded capture time"""
+    with TRACER.span("stt.replay"):
+        transcript, seconds = CASSETTE_PLAYER.stt_transcript(TRACER.current_trace_id())
+        CASSETTE_PLAYER.sleep(seconds)
+    STT_SESSION_SECONDS.observe(seconds)
+    if cancel_token is not None:
+        cancel_token.check('stt')
+    return transcript
+
 # ========== FLASK ROUTES ==========
 
 @app.route("/tts", methods=["POST"])
@@ -737,22 +879,123 @@ def tts():
     data = request.get_json()
     text = data.get("text", "Hello from Silero TTS")
     speaker = data.get("speaker", "en_10")
-    sample_rate = 24000
-
-    # Generate audio
-    audio = model.apply_tts(
-        text=text,
-        speaker=speaker,
-        sample_rate=sample_rate,
-        put_accent=True,
-        put_yo=True,
-    )
 
-    # Play audio automatically
-    sd.play(audio, sample_rate)
-    sd.wait()
+    # Output format via "format" (body or query string) or the Accept header.
+    # Without one, audio is played on the server speakers as before.
+    try:
+        output_format = negotiate_format(
+            data.get("format") or request.args.get("format"),
+            request.headers.get("Accept"),
+        )
+        sample_rate = validate_sample_rate(data.get("sample_rate") or request.args.get("sample_rate") or 24000)
+    except UnsupportedAudioFormat as e:
+        return jsonify({"status": "error", "message": str(e)}), 406
+
+    # Barge-in or disconnect cancels the turn (or the whole session when session_id is sent)
+    cancel_token = current_token()
+    if data.get("session_id"):
+        CANCELLATION.bind(cancel_token, data["session_id"])
+    
+    # Encoded output streams each sentence to the encoder as Silero finishes it
+    sink = AudioChunks() if output_format else None
+    primary_decision = []
+
+    def synthesize_silero(text):
+        # Sentence by sentence so a cancelled turn stops at the next boundary
+        chunks = []
+        for sentence in split_sentences(text):
+            cancel_token.check('tts')
+            try:
+                if tts_pool is not None:
+                    chunks.append(tts_pool.synthesize(sentence, speaker, sample_rate))
+                else:
+                    chunks.append(synthesize(model, sentence, speaker=speaker, sample_rate=sample_rate))
+            except TTSPoolBusy as e:
+                if chunks and sink is not None:
+                    # Part of the clip is already streamed: falling back would repeat it
+                    raise TTSWorkerError(f"TTS pool busy mid-stream: {e}") from e
+                raise
+            if sink is not None:
+                sink.put(chunks[-1])
+        return concatenate(chunks)
+
+    def synthesize_tiered():
+        # Generate audio with the tier the current load allows
+        synthesis_start = time.perf_counter()
+        with TRACER.span("tts.synthesize", chars=len(text)) as span:
+            audio, decision = tts_tiers.synthesize(text, speaker, sample_rate, synthesize_silero,
+                                                   on_primary=primary_decision.append)
+            span.set_attribute("tier", decision.tier)
+            span.set_attribute("tier_reason", decision.reason)
+        synthesis_seconds = time.perf_counter() - synthesis_start
+
+        engine_label = f"silero-{tts_variant}" if decision.tier == "silero" else decision.tier
+        TTS_SYNTHESIS_SECONDS.observe(synthesis_seconds, engine=engine_label)
+        if len(audio):
+            TTS_REAL_TIME_FACTOR.observe(synthesis_seconds / (len(audio) / sample_rate), engine=engine_label)
+        return audio, decision
+
+    result = {}
+
+    def synthesize_to_sink():
+        try:
+            result['audio'], result['decision'] = synthesize_tiered()
+            if not sink.count:
+                # Cached and pyttsx3 audio arrive whole
+                sink.put(result['audio'])
+            sink.close()
+        except Exception as e:
+            result['error'] = e
+            sink.close(e)
+
+    try:
+        if output_format:
+            try:
+                audio_stream = stream_encoded(sink, output_format, sample_rate)
+            except UnsupportedAudioFormat as e:
+                return jsonify({"status": "error", "message": str(e)}), 406
+            threading.Thread(target=run_in_context(synthesize_to_sink), name="tts-synthesize", daemon=True).start()
+            # Headers go out with the first sentence; errors before it still get a status code
+            sink.wait_ready()
+            if 'error' in result and not sink.count:
+                raise result['error']
+            decision = result.get('decision') or primary_decision[-1]
+        else:
+            audio, decision = synthesize_tiered()
+    except (TTSPoolBusy, TTSWorkerError) as e:
+        # Full queue, a worker that died mid-job or timed out: retryable, not a server bug
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except OperationCancelled as e:
+        return jsonify({"status": "cancelled", "message": str(e)}), 409
+
+    if output_format:
+        return Response(
+            stream_with_context(audio_stream),
+            content_type=content_type_for(output_format, sample_rate),
+            headers={
+                "X-Audio-Format": output_format,
+                "X-Sample-Rate": str(sample_rate),
+                "X-TTS-Tier": decision.tier,
+                "X-TTS-Tier-Reason": decision.reason,
+            },
+        )
+
+    # Imported on first playback: loading sounddevice initializes PortAudio, which must not happen before fork
+    import sounddevice as sd
 
-    return jsonify({"status": "ok", "text": text, "speaker": speaker})
+    # Play audio automatically; cancelling the turn stops the speakers mid-playback
+    cancel_token.add_callback(sd.stop)
+    try:
+        with TRACER.span("tts.playback", audio_seconds=round(len(audio) / sample_rate, 3)):
+            sd.play(audio, sample_rate)
+            sd.wait()
+        cancel_token.check('tts_playback')
+    except OperationCancelled as e:
+        return jsonify({"status": "cancelled", "message": str(e)}), 409
+    finally:
+        cancel_token.remove_callback(sd.stop)
+
+    return jsonify({"status": "ok", "text": text, "speaker": speaker, "tts": decision.to_dict()})
 
 @app.route("/stt", methods=["GET"])
 def stt():
@@ -768,11 +1011,96 @@ def stt():
             return jsonify({"status": "ok", "transcription": transcribed_text})
         else:
             return jsonify({"status": "error", "message": "No speech detected"})
-            
+    
+    except OperationCancelled as e:
+        return jsonify({"status": "cancelled", "message": str(e)}), 409
     except Exception as e:
         print(f"STT Error: {str(e)}")
         return jsonify({"status": "error", "message": f"Speech recognition error: {str(e)}"})
 
+def run_push_capture(capture):
+    """Run one STT capture in the background, publishing transcripts to its listeners"""
+    global current_capture
+    
+    try:
+        transcription = start_speech_recognition()
+        capture.finish(transcription)
+    except OperationCancelled as e:
+        capture.finish("", error=str(e))
+    except Exception as e:
+        print(f"STT Error: {str(e)}")
+        capture.finish("", error=f"Speech recognition error: {str(e)}")
+    finally:
+        current_capture = None
+
+@app.route("/stt/start", methods=["POST"])
+def stt_start():
+    """Start capture and return a handle immediately; transcripts are pushed over SSE"""
+    global current_capture
+    data = request.get_json(silent=True) or {}
+    capture = SttCapture(stop_on_final=data.get("stop_on_final", True), cancel_token=current_token())
+    
+    with stream_lock:
+        if is_streaming or current_capture is not None:
+            return jsonify({"status": "error", "message": "Speech recognition already in progress"}), 409
+        current_capture = capture
+    
+    stt_captures.add(capture)
+    threading.Thread(target=run_in_context(run_push_capture, capture), name=f"stt-{capture.handle[:8]}", daemon=True).start()
+    
+    print(f"🎤 Started push-mode speech recognition: {capture.handle}")
+    return jsonify({
+        "status": "started",
+        "handle": capture.handle,
+        "events_url": f"/stt/events/{capture.handle}",
+        "result_url": f"/stt/result/{capture.handle}",
+    }), 202
+
+@app.route("/stt/events/<handle>", methods=["GET"])
+def stt_events(handle):
+    """Server-Sent Events stream of partial, final and end events for a capture"""
+    capture = stt_captures.get(handle)
+    if capture is None:
+        return jsonify({"status": "error", "message": "Unknown STT handle"}), 404
+    
+    # Resume after a reconnect from the last event the client saw
+    try:
+        start_index = int(request.headers.get("Last-Event-ID", -1)) + 1
+    except ValueError:
+        start_index = 0
+    
+    def stream():
+        capture.attach()
+        try:
+            for index, event, data in capture.iter_events(start_index):
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield format_sse(event, data, index)
+        finally:
+            # The client went away; stop the mic unless it reconnects within the grace period
+            if capture.detach() == 0 and not capture.done:
+                threading.Timer(STT_DISCONNECT_GRACE_SECONDS, cancel_unwatched_capture, args=(capture,)).start()
+    
+    return Response(stream(), content_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+def cancel_unwatched_capture(capture):
+    """Cancel a push-mode capture nobody is listening to any more"""
+    if capture.listeners <= 0 and not capture.done and capture.cancel_token is not None:
+        print(f"🔌 STT listener disconnected, cancelling capture {capture.handle}")
+        capture.cancel_token.cancel('disconnect')
+
+@app.route("/stt/result/<handle>", methods=["GET"])
+def stt_result(handle):
+    """Non-blocking status of a push-mode capture"""
+    capture = stt_captures.get(handle)
+    if capture is None:
+        return jsonify({"status": "error", "message": "Unknown STT handle"}), 404
+    return jsonify(capture.snapshot())
+
 @app.route("/stt/stop", methods=["POST"])
 def stop_stt():
     """Stop ongoing speech recognition"""
@@ -794,14 +1122,39 @@ def stop_stt():
     
     return jsonify({"status": "ok", "message": "Speech recognition stopped"})
 
+def idempotent_call(route, scope, data, handler):
+    """Run handler once per idempotency key; retries and concurrent duplicates get the same response"""
+    request_id = request.headers.get(IDEMPOTENCY_KEY_HEADER) or data.get('request_id')
+    if not request_id:
+        return handler()
+    
+    def compute():
+        response = app.make_response(handler())
+        return response.get_data(), response.status_code, response.mimetype
+    
+    key = (route, scope, str(request_id))
+    (body, status, mimetype), replayed = idempotent_results.run(key, compute, route=route)
+    if status >= 500:
+        # Server errors are not a final answer; let the next retry try again
+        idempotent_results.forget(key)
+    
+    response = app.response_class(body, status=status, mimetype=mimetype)
+    response.headers[IDEMPOTENCY_KEY_HEADER] = str(request_id)
+    if replayed:
+        response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
 @app.route('/api/start-interview', methods=['POST'])
 def start_interview():
     """Start a new interview session"""
+    data = request.get_json(silent=True) or {}
+    return idempotent_call('start-interview', None, data, lambda: create_interview_session(data))
+
+def create_interview_session(data):
     try:
         print("🚀 Starting new interview session...")
         
         # Get interview data from request (if provided)
-        data = request.get_json() or {}
         interview_data = {
             'role': data.get('role', 'Software Engineer'),
             'level': data.get('level', 'intermediate'),
@@ -812,9 +1165,18 @@ def start_interview():
         
         print(f"📋 Interview data: Role={interview_data['role']}, Level={interview_data['level']}, Tech={interview_data['techstack']}")
         
-        session_id = str(uuid.uuid4())
+        session_id = new_id()
         interview_session = InterviewSession(session_id, interview_data)
         interview_sessions[session_id] = interview_session
+        CANCELLATION.open_session(session_id)
+        
+        # The first technical question depends only on the interview card, so start
+        # generating it while the candidate is still introducing themselves
+        # (unless the question bank already has first questions for this card)
+        if SPECULATIVE_FIRST_QUESTION and not (QUESTION_BANK is not None and QUESTION_BANK.can_serve_first(interview_data)):
+            interview_session.prefetched_first_question = llm_background_executor.submit(
+                run_in_context(generate_first_question, interview_session)
+            )
         
         # Generate initial greeting asking for introduction
         initial_response = generate_initial_greeting(interview_session)
@@ -869,85 +1231,116 @@ Please share your introduction and confirm these details."""
 @app.route('/api/respond', methods=['POST'])
 def respond_to_question():
     """Process candidate's response and get next question or end interview"""
+    data = request.get_json(silent=True) or {}
+    return idempotent_call('respond', data.get('session_id'), data, lambda: process_candidate_response(data))
+
+def process_candidate_response(data):
     try:
-        data = request.json
         session_id = data.get('session_id')
         candidate_response = data.get('response', '').strip()
         
         print(f"📨 Received response for session {session_id}: {candidate_response[:50]}...")
         
-        if not session_id or session_id not in interview_sessions:
+        # .get() once: the session evictor may remove completed sessions from another thread
+        interview_session = interview_sessions.get(session_id) if session_id else None
+        if interview_session is None:
+            if session_id and COLUMNAR_ARCHIVE is not None and COLUMNAR_ARCHIVE.contains(session_id):
+                return jsonify({'error': 'Interview already completed'}), 400
             return jsonify({'error': 'Invalid session ID'}), 400
         
         if not candidate_response:
             return jsonify({'error': 'Response is required'}), 400
         
-        interview_session = interview_sessions[session_id]
-        
-        # Check if interview is completed
-        if interview_session.is_completed:
-            return jsonify({'error': 'Interview already completed'}), 400
+        # Cancelling the session (disconnect) also cancels this turn's LLM calls
+        turn_token = current_token()
+        CANCELLATION.bind(turn_token, session_id)
         
-        # Check if user wants to end the interview
-        if should_end_interview(candidate_response):
-            print(f"🏁 Ending interview session: {session_id}")
-            interview_session.is_completed = True
+        # One turn at a time per session so concurrent requests cannot interleave the history
+        with interview_session.lock:
+            turn_token.check('turn')
+            
+            # Check if interview is completed
+            if interview_session.is_completed:
+                return jsonify({'error': 'Interview already completed'}), 400
+            
+            # Clients that grade the interview themselves can skip or defer server-side feedback
+            feedback_mode = data.get('feedback_mode', 'inline')
+            if feedback_mode not in FEEDBACK_MODES:
+                return jsonify({'error': f'Invalid feedback_mode. Expected one of {list(FEEDBACK_MODES)}'}), 400
+            
+            # Check if user wants to end the interview
+            if should_end_interview(candidate_response):
+                print(f"🏁 Ending interview session: {session_id}")
+                interview_session.is_completed = True
+                interview_session.completed_at = datetime.now()
+                CANCELLATION.discard_session(session_id)
+            
+                # Store the last question-answer pair if available
+                if interview_session.conversation_history and len(interview_session.conversation_history) >= 2:
+                    last_question = interview_session.conversation_history[-2]['content'] if interview_session.conversation_history[-2]['role'] == 'assistant' else "Introduction question"
+                    interview_session.add_qa_pair(last_question, candidate_response)
+            
+                # Start overall feedback first so it runs concurrently with the farewell call
+                if feedback_mode != 'none':
+                    start_feedback_job(interview_session)
             
-            # Store the last question-answer pair if available
-            if interview_session.conversation_history and len(interview_session.conversation_history) >= 2:
-                last_question = interview_session.conversation_history[-2]['content'] if interview_session.conversation_history[-2]['role'] == 'assistant' else "Introduction question"
+                # Add final message
+                with TRACER.span("generate_ai_response", session_id=session_id, kind="farewell"):
+                    farewell_message = generate_ai_response(interview_session.conversation_history, is_final_feedback=True, interview_session=interview_session)
+                interview_session.add_message("assistant", farewell_message)
+                archive_session(interview_session)
+            
+                return jsonify({
+                    'session_id': session_id,
+                    'message': farewell_message,
+                    **feedback_response_fields(interview_session, feedback_mode),
+                    'question_number': interview_session.question_count,
+                    'total_questions_asked': interview_session.question_count,
+                    'status': 'completed',
+                    'is_final_message': True,
+                    'candidate_info': interview_session.candidate_info,
+                    'duration_minutes': round((datetime.now() - interview_session.start_time).total_seconds() / 60, 2)
+                })
+            
+            # Extract candidate information from response
+            with TRACER.span("extract_candidate_info", session_id=session_id):
+                interview_session.extract_candidate_info(candidate_response)
+            
+            # Store the previous question and current answer for feedback
+            if interview_session.conversation_history and interview_session.conversation_history[-1]['role'] == 'assistant':
+                last_question = interview_session.conversation_history[-1]['content']
                 interview_session.add_qa_pair(last_question, candidate_response)
             
-            # Generate overall feedback
-            feedback = generate_overall_feedback(
-                interview_session.conversation_history,
-                interview_session.candidate_info,
-                interview_session.all_questions_answers
-            )
+            # Add candidate's response to history
+            interview_session.add_message("user", candidate_response)
+            
+            # Generate next question with contextual awareness
+            with TRACER.span("generate_ai_response", session_id=session_id, kind="next_question"):
+                ai_response = take_banked_question(interview_session)
+                # Banked questions were written without this session's planner target in the prompt
+                offered = ai_response is None
+                if ai_response is None:
+                    ai_response = take_prefetched_first_question(interview_session)
+                if ai_response is None:
+                    ai_response = generate_ai_response(interview_session.conversation_history, interview_session=interview_session)
+            offered = offered and ai_response != EMPTY_RESPONSE_FALLBACK and ai_response not in FALLBACK_RESPONSES
+            interview_session.add_message("assistant", ai_response, offered=offered)
+            interview_session.question_count += 1
             
-            # Add final message
-            farewell_message = generate_ai_response(interview_session.conversation_history, is_final_feedback=True, interview_session=interview_session)
-            interview_session.add_message("assistant", farewell_message)
+            print(f"🤖 Next question: {ai_response}")
             
             return jsonify({
                 'session_id': session_id,
-                'message': farewell_message,
-                'feedback': feedback,
+                'message': ai_response,
                 'question_number': interview_session.question_count,
-                'total_questions_asked': interview_session.question_count,
-                'status': 'completed',
-                'is_final_message': True,
+                'status': 'in_progress',
                 'candidate_info': interview_session.candidate_info,
-                'duration_minutes': round((datetime.now() - interview_session.start_time).total_seconds() / 60, 2)
+                'has_question_limit': False
             })
-        
-        # Extract candidate information from response
-        interview_session.extract_candidate_info(candidate_response)
-        
-        # Store the previous question and current answer for feedback
-        if interview_session.conversation_history and interview_session.conversation_history[-1]['role'] == 'assistant':
-            last_question = interview_session.conversation_history[-1]['content']
-            interview_session.add_qa_pair(last_question, candidate_response)
-        
-        # Add candidate's response to history
-        interview_session.add_message("user", candidate_response)
-        
-        # Generate next question with contextual awareness
-        ai_response = generate_ai_response(interview_session.conversation_history, interview_session=interview_session)
-        interview_session.add_message("assistant", ai_response)
-        interview_session.question_count += 1
-        
-        print(f"🤖 Next question: {ai_response}")
-        
-        return jsonify({
-            'session_id': session_id,
-            'message': ai_response,
-            'question_number': interview_session.question_count,
-            'status': 'in_progress',
-            'candidate_info': interview_session.candidate_info,
-            'has_question_limit': False
-        })
     
+    except OperationCancelled as e:
+        print(f"🚫 Turn cancelled for session {data.get('session_id')}: {e.reason}")
+        return jsonify({'error': str(e), 'status': 'cancelled', 'reason': e.reason}), 409
     except Exception as e:
         print(f"❌ Error processing response: {str(e)}")
         return jsonify({'error': f'Failed to process response: {str(e)}'}), 500
@@ -955,27 +1348,36 @@ def respond_to_question():
 @app.route('/api/end-interview/<session_id>', methods=['POST'])
 def end_interview(session_id):
     """End an interview session manually"""
-    if session_id not in interview_sessions:
+    interview_session = interview_sessions.get(session_id)
+    if interview_session is None:
+        if COLUMNAR_ARCHIVE is not None and COLUMNAR_ARCHIVE.contains(session_id):
+            return jsonify({'error': 'Interview already completed'}), 400
         return jsonify({'error': 'Session not found'}), 404
     
-    interview_session = interview_sessions[session_id]
+    data = request.get_json(silent=True) or {}
+    feedback_mode = data.get('feedback_mode') or request.args.get('feedback_mode', 'inline')
+    if feedback_mode not in FEEDBACK_MODES:
+        return jsonify({'error': f'Invalid feedback_mode. Expected one of {list(FEEDBACK_MODES)}'}), 400
     
-    if not interview_session.is_completed:
+    with interview_session.lock:
+        was_completed = interview_session.is_completed
         interview_session.is_completed = True
-        
+        if not was_completed:
+            interview_session.completed_at = datetime.now()
+            CANCELLATION.discard_session(session_id)
+    
+    if not was_completed:
         # Generate overall feedback
-        feedback = generate_overall_feedback(
-            interview_session.conversation_history,
-            interview_session.candidate_info,
-            interview_session.all_questions_answers
-        )
+        if feedback_mode != 'none':
+            start_feedback_job(interview_session)
         
         # Generate farewell message
         farewell_message = "Thank you for your participation in this interview. The session has been concluded."
+        archive_session(interview_session)
         
         return jsonify({
             'message': farewell_message,
-            'feedback': feedback,
+            **feedback_response_fields(interview_session, feedback_mode),
             'session_id': session_id,
             'status': 'ended',
             'total_questions_asked': interview_session.question_count,
@@ -985,13 +1387,85 @@ def end_interview(session_id):
     
     return jsonify({'error': 'Interview already completed'}), 400
 
+@app.route('/api/feedback/<session_id>', methods=['GET'])
+def get_feedback(session_id):
+    """Overall feedback for a session whose feedback was deferred"""
+    interview_session = interview_sessions.get(session_id)
+    if interview_session is None:
+        archived = COLUMNAR_ARCHIVE.get(session_id) if COLUMNAR_ARCHIVE is not None else None
+        if archived is None:
+            return jsonify({'error': 'Session not found'}), 404
+        # Sessions are only archived once their feedback job has finished
+        return jsonify({
+            'session_id': session_id,
+            'feedback': archived['feedback'] or None,
+            'structured_feedback': archived['structured_feedback'],
+            'feedback_status': 'ready' if archived['feedback'] else 'not_requested',
+            'candidate_info': archived['candidate_info'],
+            'archived': True,
+        })
+    
+    future = interview_session.feedback_future
+    if future is None:
+        return jsonify({'session_id': session_id, 'feedback': None, 'feedback_status': 'not_requested'})
+    
+    # ?wait=<seconds> lets a client block briefly instead of polling
+    wait_seconds = min(request.args.get('wait', 0, type=float), 60)
+    if not future.done() and wait_seconds > 0:
+        try:
+            future.result(timeout=wait_seconds)
+        except Exception:
+            pass
+    
+    return jsonify({
+        'session_id': session_id,
+        'feedback': future.result() if future.done() else None,
+        'structured_feedback': interview_session.structured_feedback if future.done() else None,
+        'feedback_status': 'ready' if future.done() else 'pending',
+        'candidate_info': interview_session.candidate_info,
+    })
+
+@app.route('/api/cancel', methods=['POST'])
+def cancel_work():
+    """Cancel in-flight work for a turn (barge-in), a whole session (disconnect), or both"""
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session_id')
+    turn_id = data.get('turn_id')
+    reason = data.get('reason') if data.get('reason') in CANCEL_REASONS else 'client_cancelled'
+    
+    if not session_id and not turn_id:
+        return jsonify({'error': 'session_id or turn_id is required'}), 400
+    
+    # True if this request cancelled it, False if it was already cancelled
+    cancelled = {}
+    if turn_id:
+        cancelled['turn'] = CANCELLATION.cancel_turn(turn_id, reason)
+    if session_id:
+        cancelled['session'] = CANCELLATION.cancel_session(session_id, reason)
+    
+    print(f"🚫 Cancelled {cancelled} for session={session_id} turn={turn_id} ({reason})")
+    return jsonify({'status': 'cancelled', 'reason': reason, 'cancelled': cancelled})
+
 @app.route('/api/interview-status/<session_id>', methods=['GET'])
 def get_interview_status(session_id):
     """Get current status of an interview session"""
-    if session_id not in interview_sessions:
-        return jsonify({'error': 'Session not found'}), 404
+    interview_session = interview_sessions.get(session_id)
+    if interview_session is None:
+        archived = COLUMNAR_ARCHIVE.get(session_id) if COLUMNAR_ARCHIVE is not None else None
+        if archived is None:
+            return jsonify({'error': 'Session not found'}), 404
+        return jsonify({
+            'session_id': session_id,
+            'question_number': archived['question_count'],
+            'is_completed': True,
+            'start_time': datetime.fromtimestamp(archived['start_time']).isoformat() if archived['start_time'] is not None else None,
+            'duration_minutes': round(archived['duration_seconds'] / 60, 2) if archived['duration_seconds'] is not None else None,
+            'candidate_info': archived['candidate_info'],
+            'prepared_questions': archived['prepared_questions'],
+            'has_question_limit': False,
+            'archived': True,
+        })
     
-    interview_session = interview_sessions[session_id]
     
     return jsonify({
         'session_id': session_id,
@@ -1000,6 +1474,7 @@ def get_interview_status(session_id):
         'start_time': interview_session.start_time.isoformat(),
         'duration_minutes': round((datetime.now() - interview_session.start_time).total_seconds() / 60, 2),
         'candidate_info': interview_session.candidate_info,
+        'prepared_questions': interview_session.planner.stats() if interview_session.planner is not None else None,
         'has_question_limit': False
     })
 
@@ -1009,18 +1484,170 @@ def health_check():
     return jsonify({
         'status': 'healthy', 
         'service': 'Interview API',
-        'model': WORKING_MODEL
+        'model': WORKING_MODEL,
+        'tts_variant': tts_variant,
+        'tts_pool': tts_pool.stats() if tts_pool else None,
+        'tts_tiers': tts_tiers.stats(),
+        'stt_pool': stt_pool.stats(),
+        'llm_backend': LLM_BACKEND,
+        'llm_cache': LLM_CACHE.stats(),
+        'question_bank': QUESTION_BANK.stats() if QUESTION_BANK is not None else None,
+        'columnar_archive': COLUMNAR_ARCHIVE.stats() if COLUMNAR_ARCHIVE is not None else None,
+        'cassettes': 'record' if CASSETTE_RECORDER is not None else CASSETTE_PLAYER.stats() if CASSETTE_PLAYER is not None else None,
+        'llm_scheduler': LLM_SCHEDULER.stats(),
+        'active_sessions': sum(1 for s in list(interview_sessions.values()) if not s.is_completed),
+        'total_sessions': len(interview_sessions),
+        'rss_bytes': process_rss_bytes(),
+        'pid': os.getpid(),
+        'memory': memory_usage()
+    })
+
+def require_admin():
+    """Return an error response unless the request carries the admin token"""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Unauthorized'}), 401
+    return None
+
+@app.route('/api/workers', methods=['GET'])
+def get_workers():
+    """RSS/PSS of every pre-fork worker, to check the model pages stay shared under load"""
+    denied = require_admin()
+    if denied:
+        return denied
+    return jsonify(workers_memory_report())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of server metrics"""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
+MAX_TRACES_PER_REQUEST = 200
+
+@app.route('/api/traces', methods=['GET'])
+def get_traces():
+    """Recent per-turn traces from the in-process ring buffer (admin only: spans carry session ids)"""
+    denied = require_admin()
+    if denied:
+        return denied
+
+    turn_id = request.args.get('turn_id')
+    if turn_id:
+        trace = TRACER.get_trace(turn_id)
+        if trace is None:
+            return jsonify({'error': 'Trace not found'}), 404
+        return jsonify(trace)
+
+    limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_TRACES_PER_REQUEST)
+    return jsonify({'traces': TRACER.recent_traces(limit)})
+
+# ========== ADMIN PROFILING ROUTES ==========
+
+sampling_profiler = SamplingProfiler()
+tracemalloc_tracker = TracemallocTracker()
+
+@app.route('/admin/profile', methods=['POST'])
+def admin_profile():
+    """Sample all threads for N seconds and return flamegraph-compatible collapsed stacks"""
+    denied = require_admin()
+    if denied:
+        return denied
+
+    seconds = request.args.get('seconds', 10, type=float)
+    interval_ms = request.args.get('interval_ms', 10, type=float)
+    include_idle = request.args.get('include_idle', '0') == '1'
+
+    print(f"🔬 Profiling worker for {seconds}s (every {interval_ms}ms)...")
+    try:
+        collapsed, samples = sampling_profiler.profile(seconds, interval_ms / 1000, include_idle)
+    except ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+
+    return Response(collapsed, content_type='text/plain; charset=utf-8', headers={
+        'X-Profile-Samples': str(samples),
+        'Content-Disposition': f'attachment; filename=profile-{os.getpid()}-{int(time.time())}.collapsed',
+    })
+
+@app.route('/admin/tracemalloc/start', methods=['POST'])
+def admin_tracemalloc_start():
+    """Start tracemalloc and record the baseline snapshot"""
+    denied = require_admin()
+    if denied:
+        return denied
+
+    try:
+        tracemalloc_tracker.start(request.args.get('frames', 10, type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify({'status': 'started', 'pid': os.getpid()})
+
+@app.route('/admin/tracemalloc/diff', methods=['GET'])
+def admin_tracemalloc_diff():
+    """Top allocation growth since the baseline (?reset=1 moves the baseline forward)"""
+    denied = require_admin()
+    if denied:
+        return denied
+
+    try:
+        diff = tracemalloc_tracker.diff(
+            limit=request.args.get('limit', 25, type=int),
+            group_by=request.args.get('group_by', 'lineno'),
+            reset_baseline=request.args.get('reset', '0') == '1',
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if diff is None:
+        return jsonify({'error': 'tracemalloc is not running. POST /admin/tracemalloc/start first.'}), 400
+    diff['live_sessions'] = len(interview_sessions)
+    return jsonify(diff)
+
+@app.route('/admin/tracemalloc/stop', methods=['POST'])
+def admin_tracemalloc_stop():
+    """Stop tracemalloc and drop the baseline"""
+    denied = require_admin()
+    if denied:
+        return denied
+
+    tracemalloc_tracker.stop()
+    return jsonify({'status': 'stopped'})
+
+@app.route('/admin/analytics/scores', methods=['GET'])
+def admin_analytics_scores():
+    """Average scores, durations and answer lengths of archived sessions per role, level, type or techstack"""
+    denied = require_admin()
+    if denied:
+        return denied
+    if COLUMNAR_ARCHIVE is None:
+        return jsonify({'error': 'Columnar archive is disabled. Set COLUMNAR_ARCHIVE_DIR to enable it.'}), 404
+
+    group_by = request.args.get('group_by', 'role')
+    start = time.perf_counter()
+    try:
+        groups = COLUMNAR_ARCHIVE.scores_by(group_by)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'group_by': group_by,
+        'groups': groups,
+        'archive': COLUMNAR_ARCHIVE.stats(),
+        'scan_seconds': round(time.perf_counter() - start, 4),
     })
 
 @app.route('/api/models', methods=['GET'])
 def get_models():
     """Get available models"""
+    if LLM_BACKEND == 'fake':
+        return jsonify({'available_models': GEMINI_MODELS, 'current_model': WORKING_MODEL})
     try:
-        models = genai.list_models()
-        available_models = []
-        for model in models:
-            if 'generateContent' in model.supported_generation_methods:
-                available_models.append(model.name)
+        with LLM_SCHEDULER.slot('batch'):
+            models = genai.list_models()
+            available_models = []
+            for model in models:
+                if 'generateContent' in model.supported_generation_methods:
+                    available_models.append(model.name)
         return jsonify({'available_models': available_models, 'current_model': WORKING_MODEL})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1032,14 +1659,27 @@ def home():
     return jsonify({
         "message": "Speech and Interview Server is running!",
         "routes": {
-            "POST /tts": "Convert text to speech",
+            "POST /tts": "Convert text to speech (play on server, or return float32/pcm16/wav/opus/mp3 via 'format' or Accept)",
             "GET /stt": "Convert microphone speech to text",
             "POST /stt/stop": "Stop ongoing speech recognition",
+            "POST /stt/start": "Start speech recognition and return a handle immediately",
+            "GET /stt/events/<handle>": "SSE stream of partial and final transcripts",
+            "GET /stt/result/<handle>": "Current state of a speech recognition handle",
             "POST /api/start-interview": "Start a new interview session",
             "POST /api/respond": "Respond to interview question",
             "GET /api/interview-status/<session_id>": "Get interview status",
             "POST /api/end-interview/<session_id>": "End interview session",
+            "GET /api/feedback/<session_id>": "Deferred overall feedback (?wait=<seconds>)",
+            "POST /api/cancel": "Cancel in-flight LLM/STT/TTS work for a turn or session",
             "GET /api/health": "Health check",
+            "GET /api/workers": "Admin: per-worker RSS/PSS (shared vs private memory)",
+            "GET /metrics": "Prometheus metrics",
+            "GET /api/traces": "Admin: recent per-turn traces (?turn_id=, ?limit=)",
+            "POST /admin/profile": "Admin: sample CPU for N seconds, returns collapsed stacks",
+            "POST /admin/tracemalloc/start": "Admin: start allocation tracking",
+            "GET /admin/tracemalloc/diff": "Admin: allocation growth since baseline (?group_by=filename/lineno/traceback)",
+            "POST /admin/tracemalloc/stop": "Admin: stop allocation tracking",
+            "GET /admin/analytics/scores": "Admin: archived session scores per role/level/interview_type/techstack (?group_by=)",
             "GET /api/models": "Get available models"
         }
     })
@@ -1047,9 +1687,9 @@ def home():
 # ========== RUN SERVER ==========
 
 if __name__ == "__main__":
-    port = 5000
+    port = int(os.getenv("PORT", "5000"))
     print(f"🚀 Combined Speech and Interview Server running at http://127.0.0.1:{port}")
-    print(f"🎯 Using Gemini model: ")
+    print(f"🎯 Using Gemini model: {WORKING_MODEL or 'probed per worker'} (backend: {LLM_BACKEND})")
     print(f"🎤 Using AssemblyAI for speech recognition")
     print("⏰ STT Auto-stop: 5 seconds of silence")
     print("📝 Available endpoints:")
@@ -1057,11 +1697,19 @@ if __name__ == "__main__":
     print("   POST /tts")
     print("   GET  /stt")
     print("   POST /stt/stop")
+    print("   POST /stt/start")
+    print("   GET  /stt/events/<handle>")
+    print("   GET  /stt/result/<handle>")
     print("   POST /api/start-interview")
     print("   POST /api/respond")
     print("   GET  /api/interview-status/<session_id>")
     print("   POST /api/end-interview/<session_id>")
+    print("   GET  /api/feedback/<session_id>")
+    print("   POST /api/cancel")
     print("   GET  /api/health")
+    print("   GET  /api/workers")
+    print("   GET  /metrics")
+    print("   GET  /api/traces")
     print("   GET  /api/models")
     print("\n✨ Features:")
     print("   - Text-to-Speech (TTS) with Silero")
@@ -1071,4 +1719,10 @@ if __name__ == "__main__":
     print("   - No question limit - interview continues until you stop")
     print("   - Automatic brief feedback at the end")
     
-    app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
+    if PREFORK_WORKERS > 0:
+        # Sessions live in one worker's memory: the master routes each request to the worker owning its
+        # session id, capture handle, idempotency key or turn id
+        PreforkServer(app, "0.0.0.0", port, PREFORK_WORKERS, post_fork=init_prefork_worker,
+                      affinity_headers=(IDEMPOTENCY_KEY_HEADER, TURN_ID_HEADER)).run()
+    else:
+        app.run(host="0.0.0.0", port=port, debug=os.getenv("FLASK_DEBUG", "1") == "1", threaded=True)
\ No newline at end of file
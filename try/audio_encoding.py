@@ -0,0 +1,304 @@
+import io
+import queue
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+
+# Output formats the /tts endpoint can negotiate, with their response content types
+AUDIO_FORMATS = {
+    "float32": "audio/x-float32",
+    "pcm16": "audio/L16",
+    "wav": "audio/wav",
+    "opus": "audio/ogg; codecs=opus",
+    "webm": "audio/webm; codecs=opus",
+    "mp3": "audio/mpeg",
+}
+
+# Accept header media types mapped to output formats
+ACCEPT_TYPES = {
+    "audio/x-float32": "float32",
+    "audio/l16": "pcm16",
+    "audio/pcm": "pcm16",
+    "audio/wav": "wav",
+    "audio/wave": "wav",
+    "audio/x-wav": "wav",
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/webm": "webm",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+}
+
+# Silero synthesizes natively at these rates, so no resampling is needed
+SUPPORTED_SAMPLE_RATES = (8000, 24000, 48000)
+
+# Formats that need an external encoder (ffmpeg) rather than numpy conversion
+COMPRESSED_FORMATS = {
+    "opus": ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-f", "ogg"],
+    "webm": ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-f", "webm"],
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "48k", "-f", "mp3"],
+}
+
+CHUNK_SAMPLES = 4800
+
+
+class UnsupportedAudioFormat(Exception):
+    """Raised when the requested format or sample rate cannot be produced"""
+
+
+class AudioChunks:
+    """Samples handed from a synthesis thread to the encoder as each sentence is ready"""
+
+    _END = object()
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self.count = 0
+
+    def put(self, samples):
+        self.count += 1
+        self._queue.put(to_float32(samples))
+        self._ready.set()
+
+    def close(self, error=None):
+        """End the stream; an error is raised to the encoder after the chunks already put"""
+        self._queue.put(error if error is not None else self._END)
+        self._ready.set()
+
+    def wait_ready(self, timeout=None):
+        """Block until the first chunk (or the end of the stream) is available"""
+        return self._ready.wait(timeout)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+def negotiate_format(requested=None, accept_header=None):
+    """Pick an output format from an explicit parameter or the Accept header, None if not asked
+
+    Checked before synthesis, so a format this server cannot encode is
+    refused up front instead of failing inside the streamed response.
+    """
+    if requested:
+        requested = requested.lower()
+        if requested in ("pcm", "int16", "s16le"):
+            requested = "pcm16"
+        if requested not in AUDIO_FORMATS:
+            raise UnsupportedAudioFormat(f"Unsupported audio format '{requested}'. Expected one of {list(AUDIO_FORMATS)}")
+        if requested in COMPRESSED_FORMATS and not ffmpeg_available():
+            raise UnsupportedAudioFormat(f"'{requested}' output requires ffmpeg on the server")
+        return requested
+
+    if not accept_header:
+        return None
+
+    # Highest q-value wins, ties keep header order
+    candidates = []
+    for index, part in enumerate(accept_header.split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        media_type = fields[0].lower()
+        q = 1.0
+        for field in fields[1:]:
+            if field.startswith("q="):
+                try:
+                    q = float(field[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type in ACCEPT_TYPES and q > 0:
+            if ACCEPT_TYPES[media_type] in COMPRESSED_FORMATS and not ffmpeg_available():
+                continue
+            candidates.append((-q, index, ACCEPT_TYPES[media_type]))
+
+    if not candidates:
+        return None
+    return min(candidates)[2]
+
+
+def validate_sample_rate(sample_rate):
+    """Return sample_rate as int if Silero can synthesize at it"""
+    try:
+        sample_rate = int(sample_rate)
+    except (TypeError, ValueError):
+        raise UnsupportedAudioFormat(f"Invalid sample rate '{sample_rate}'")
+
+    if sample_rate not in SUPPORTED_SAMPLE_RATES:
+        raise UnsupportedAudioFormat(f"Unsupported sample rate {sample_rate}. Expected one of {SUPPORTED_SAMPLE_RATES}")
+    return sample_rate
+
+
+def ffmpeg_available():
+    return shutil.which("ffmpeg") is not None
+
+
+def content_type_for(fmt, sample_rate):
+    """Response content type, including rate/channels for raw PCM"""
+    if fmt in ("float32", "pcm16"):
+        return f"{AUDIO_FORMATS[fmt]}; rate={sample_rate}; channels=1"
+    return AUDIO_FORMATS[fmt]
+
+
+def to_float32(audio):
+    """Normalize a torch tensor or numpy array of samples to contiguous float32"""
+    if hasattr(audio, "detach"):
+        audio = audio.detach().cpu().numpy()
+    return np.ascontiguousarray(audio, dtype=np.float32).reshape(-1)
+
+
+def concatenate(chunks):
+    """Join per-sentence syntheses into one float32 buffer"""
+    if len(chunks) == 1:
+        return to_float32(chunks[0])
+    return np.concatenate([to_float32(chunk) for chunk in chunks])
+
+
+def _to_pcm16(samples):
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def _wav_header(num_samples, sample_rate):
+    """44-byte RIFF header for mono 16-bit PCM"""
+    data_size = num_samples * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+def _split(chunks):
+    """Re-chunk a sequence of sample arrays into pieces of at most CHUNK_SAMPLES"""
+    for samples in chunks:
+        for start in range(0, len(samples), CHUNK_SAMPLES):
+            yield samples[start:start + CHUNK_SAMPLES]
+
+
+def _encode_raw(chunks, fmt, sample_rate, emit):
+    """Encode uncompressed formats chunk by chunk"""
+    if fmt == "wav":
+        # The RIFF header carries the length, so WAV waits for the whole clip
+        chunks = [concatenate(list(chunks))]
+        emit(_wav_header(len(chunks[0]), sample_rate))
+
+    for chunk in _split(chunks):
+        emit(chunk.astype("<f4").tobytes() if fmt == "float32" else _to_pcm16(chunk))
+
+
+def _encode_compressed(chunks, fmt, sample_rate, emit, processes):
+    """Pipe PCM through ffmpeg, feeding stdin from a thread while stdout is streamed out"""
+    command = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+        *COMPRESSED_FORMATS[fmt], "pipe:1",
+    ]
+    # A file, not a pipe: nothing reads stderr until ffmpeg exits, and a full pipe would stall it
+    stderr = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr)
+    processes.append(process)
+    feed_errors = []
+
+    def feed_stdin():
+        try:
+            for chunk in _split(chunks):
+                process.stdin.write(_to_pcm16(chunk))
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            # Synthesis failed mid-stream: end ffmpeg's input and report it after the encoded part
+            feed_errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=feed_stdin, daemon=True)
+    feeder.start()
+
+    while True:
+        chunk = process.stdout.read(8192)
+        if not chunk:
+            break
+        emit(chunk)
+
+    feeder.join()
+    with stderr:
+        if process.wait() != 0 and process.returncode != -9:
+            stderr.seek(0)
+            raise RuntimeError(f"ffmpeg {fmt} encoding failed: {stderr.read().decode(errors='ignore').strip()}")
+    if feed_errors:
+        raise feed_errors[0]
+
+
+def stream_encoded(audio, fmt, sample_rate, max_buffered_chunks=32):
+    """Iterator of encoded audio bytes; raises UnsupportedAudioFormat right away, not on first read
+
+    audio is a whole clip or an AudioChunks fed while synthesis is still
+    running, so encoding overlaps synthesis.
+    """
+    if fmt in COMPRESSED_FORMATS and not ffmpeg_available():
+        raise UnsupportedAudioFormat(f"'{fmt}' output requires ffmpeg on the server")
+    samples = audio if isinstance(audio, AudioChunks) else [to_float32(audio)]
+    return _stream_encoded(samples, fmt, sample_rate, max_buffered_chunks)
+
+
+def _stream_encoded(samples, fmt, sample_rate, max_buffered_chunks):
+    """Yield encoded audio bytes while a worker thread does the encoding"""
+    chunks = queue.Queue(maxsize=max_buffered_chunks)
+    done = object()
+    cancelled = threading.Event()
+    processes = []
+
+    def emit(data):
+        while not cancelled.is_set():
+            try:
+                chunks.put(data, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def encode():
+        try:
+            if fmt in COMPRESSED_FORMATS:
+                _encode_compressed(samples, fmt, sample_rate, emit, processes)
+            else:
+                _encode_raw(samples, fmt, sample_rate, emit)
+            emit(done)
+        except Exception as e:
+            emit(e)
+
+    threading.Thread(target=encode, name=f"tts-encode-{fmt}", daemon=True).start()
+
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Client went away or we finished - let the encoder thread exit and stop ffmpeg
+        cancelled.set()
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+
+
+def encode_to_bytes(audio, fmt, sample_rate):
+    """Encode the whole clip into a single bytes object"""
+    buffer = io.BytesIO()
+    for chunk in stream_encoded(audio, fmt, sample_rate):
+        buffer.write(chunk)
+    return buffer.getvalue()
@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://localhost:5000"
+
+SAMPLE_CARDS = [
+    {"role": "Frontend Developer", "level": "junior", "techstack": ["React", "TypeScript"], "type": "Technical",
+     "questions": ["What is the virtual DOM?", "Explain useEffect cleanup.", "How do you type props in TypeScript?"]},
+    {"role": "Backend Developer", "level": "intermediate", "techstack": ["Python", "Flask", "PostgreSQL"], "type": "Technical",
+     "questions": []},
+    {"role": "Full Stack Engineer", "level": "senior", "techstack": ["Node", "React", "AWS"], "type": "Mixed",
+     "questions": ["Design a URL shortener.", "How do you scale a Node service?"]},
+]
+
+SAMPLE_INTRODUCTION = (
+    "Hi, my name is Alex and I have 3-5 years of experience as a software engineer working with "
+    "python, react and sql. I confirm the role, level, tech stack and number of questions."
+)
+
+SAMPLE_ANSWERS = [
+    "I would start by profiling the endpoint and checking the database queries for missing indexes.",
+    "I usually write unit tests with mocks for the external services and a few integration tests.",
+    "In React I keep state close to where it is used and lift it up only when siblings need it.",
+    "For scaling I would put the service behind a load balancer and cache hot reads in redis.",
+    "I handle errors by failing fast at the boundary and returning structured error responses.",
+]
+
+
+class RouteStats:
+    """Thread-safe latency / error collector for one route"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self.lock:
+            self.latencies.append(seconds)
+            if not ok:
+                self.errors += 1
+
+    def summary(self, wall_seconds):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            index = min(count - 1, int(round(p / 100 * (count - 1))))
+            return round(latencies[index] * 1000, 2)
+
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / wall_seconds, 2) if wall_seconds else None,
+            "mean_ms": round(sum(latencies) / count * 1000, 2) if count else None,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+
+
+def timed_post(http, stats, route, url, payload=None, timeout=120):
+    """POST and record latency under the route name; returns parsed JSON or None"""
+    start = time.perf_counter()
+    try:
+        response = http.post(url, json=payload, timeout=timeout)
+        ok = response.status_code == 200
+        body = response.json() if ok else None
+    except (requests.RequestException, ValueError):
+        ok, body = False, None
+    stats[route].record(time.perf_counter() - start, ok)
+    return body
+
+
+def run_candidate(base_url, turns, stats, think_time):
+    """Drive one synthetic candidate through start -> N x respond -> end"""
+    http = requests.Session()
+
+    start_data = timed_post(http, stats, "start-interview", f"{base_url}/api/start-interview", random.choice(SAMPLE_CARDS))
+    if not start_data:
+        return False
+    session_id = start_data["session_id"]
+
+    for turn in range(turns):
+        answer = SAMPLE_INTRODUCTION if turn == 0 else random.choice(SAMPLE_ANSWERS)
+        respond_data = timed_post(http, stats, "respond", f"{base_url}/api/respond",
+                                  {"session_id": session_id, "response": answer})
+        if respond_data is None:
+            return False
+        if think_time:
+            time.sleep(random.uniform(0, think_time))
+
+    end_data = timed_post(http, stats, "end-interview", f"{base_url}/api/end-interview/{session_id}")
+    return end_data is not None
+
+
+def get_health(base_url):
+    try:
+        return requests.get(f"{base_url}/api/health", timeout=10).json()
+    except (requests.RequestException, ValueError):
+        return {}
+
+
+def spawn_server(port, latency_ms):
+    """Start app.py against the fake LLM backend and wait until it is healthy"""
+    env = dict(os.environ, LLM_BACKEND="fake", FLASK_DEBUG="0", PORT=str(port),
+               FAKE_LLM_LATENCY_MS=str(latency_ms))
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    process = subprocess.Popen([sys.executable, app_path], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        if get_health(base_url).get("status") == "healthy":
+            return process, base_url
+        time.sleep(1)
+
+    process.terminate()
+    raise RuntimeError("Server did not become healthy in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the interview API")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--candidates", type=int, default=50, help="total synthetic candidates")
+    parser.add_argument("--concurrency", type=int, default=10, help="candidates in flight at once")
+    parser.add_argument("--turns", type=int, default=5, help="/api/respond calls per candidate")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between turns (s)")
+    parser.add_argument("--spawn-server", action="store_true", help="start app.py with LLM_BACKEND=fake")
+    parser.add_argument("--port", type=int, default=5055, help="port for --spawn-server")
+    parser.add_argument("--fake-latency-ms", type=float, default=300)
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if args.spawn_server:
+        print("🚀 Starting local server with fake LLM backend...", file=sys.stderr)
+        server, base_url = spawn_server(args.port, args.fake_latency_ms)
+
+    try:
+        health_before = get_health(base_url)
+        stats = {route: RouteStats() for route in ("start-interview", "respond", "end-interview")}
+
+        print(f"🧪 {args.candidates} candidates x {args.turns} turns, concurrency {args.concurrency}", file=sys.stderr)
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            outcomes = list(executor.map(
+                lambda _: run_candidate(base_url, args.turns, stats, args.think_time),
+                range(args.candidates),
+            ))
+        wall_seconds = time.perf_counter() - wall_start
+
+        health_after = get_health(base_url)
+        new_sessions = health_after.get("total_sessions", 0) - health_before.get("total_sessions", 0)
+        rss_growth = health_after.get("rss_bytes", 0) - health_before.get("rss_bytes", 0)
+
+        report = {
+            "config": {
+                "candidates": args.candidates,
+                "concurrency": args.concurrency,
+                "turns": args.turns,
+                "llm_backend": health_after.get("llm_backend"),
+            },
+            "wall_seconds": round(wall_seconds, 3),
+            "completed_candidates": sum(outcomes),
+            "failed_candidates": len(outcomes) - sum(outcomes),
+            "total_requests": sum(len(s.latencies) for s in stats.values()),
+            "throughput_rps": round(sum(len(s.latencies) for s in stats.values()) / wall_seconds, 2),
+            "routes": {route: s.summary(wall_seconds) for route, s in stats.items()},
+            "memory": {
+                "rss_before_bytes": health_before.get("rss_bytes"),
+                "rss_after_bytes": health_after.get("rss_bytes"),
+                "sessions_created": new_sessions,
+                "bytes_per_session": round(rss_growth / new_sessions) if new_sessions > 0 else None,
+            },
+        }
+
+        output = json.dumps(report, indent=2)
+        print(output)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
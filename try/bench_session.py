@@ -0,0 +1,200 @@
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from interview_session import (
+    InterviewSession,
+    build_feedback_prompt,
+    build_turn_prompt,
+    scan_topics,
+    should_end_interview,
+)
+
+TURN_SIZES = (10, 100, 1000)
+
+SAMPLE_CARD = {
+    "role": "Backend Developer",
+    "level": "intermediate",
+    "techstack": ["Python", "Flask", "PostgreSQL", "Redis"],
+    "type": "Technical",
+    "questions": [
+        "How does Flask handle request contexts?",
+        "Explain database indexing and when it hurts.",
+        "How would you cache expensive queries with Redis?",
+        "Describe how you would design a rate limiter.",
+    ],
+}
+
+SAMPLE_ANSWER = (
+    "I have worked with python and sql for a few years of experience, mostly building rest services "
+    "with docker and redis, and I usually start with profiling before touching the algorithms."
+)
+
+SAMPLE_QUESTION = "Good point. How would you add caching to that endpoint without serving stale data?"
+
+
+def build_session(turns, card=SAMPLE_CARD):
+    """Synthetic interview with `turns` completed question/answer exchanges"""
+    session = InterviewSession("bench", card)
+    session.add_message("assistant", "Hello! Please introduce yourself.")
+    for _ in range(turns):
+        run_turn(session)
+    return session
+
+
+def run_turn(session, answer=SAMPLE_ANSWER):
+    """Server-side work of one /api/respond turn, minus the LLM call"""
+    should_end_interview(answer)
+    session.extract_candidate_info(answer)
+    session.add_qa_pair(session.conversation_history[-1]["content"], answer)
+    session.add_message("user", answer)
+    prompt = build_turn_prompt(session, session.last_user_message, session.user_message_count)
+    session.add_message("assistant", SAMPLE_QUESTION)
+    session.question_count += 1
+    return prompt
+
+
+def legacy_history_scan(conversation_history):
+    """Per-turn history rescan generate_ai_response used to do (O(turns) per turn)"""
+    last_user_msg = None
+    for msg in reversed(conversation_history):
+        if msg["role"] == "user":
+            last_user_msg = msg["content"]
+            break
+    topics_mentioned = []
+    for msg in conversation_history:
+        if msg["role"] == "user" and msg["content"]:
+            topics_mentioned.extend(scan_topics(msg["content"]))
+    user_responses = [msg for msg in conversation_history if msg["role"] == "user"]
+    return last_user_msg, len(user_responses), ", ".join(set(topics_mentioned[:3]))
+
+
+def measure(func, repeat, number):
+    """Median seconds per call over `repeat` batches of `number` calls, plus allocations of one call"""
+    gc.collect()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+
+    return {
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "min_us": round(min(timings) * 1e6, 3),
+        "allocated_bytes": allocated,
+        "peak_bytes": peak,
+    }
+
+
+def bench_turn_scaling(repeat):
+    """Each hot path at 10 / 100 / 1,000 turns of history"""
+    results = {}
+    for turns in TURN_SIZES:
+        session = build_session(turns)
+        qa_pairs = session.all_questions_answers
+        history = session.conversation_history
+        number = max(1, 2000 // turns)
+
+        results[turns] = {
+            "session_init": measure(lambda: InterviewSession("bench", SAMPLE_CARD), repeat, 200),
+            "extract_candidate_info": measure(lambda: session.extract_candidate_info(SAMPLE_ANSWER), repeat, 200),
+            "should_end_interview": measure(lambda: should_end_interview(SAMPLE_ANSWER), repeat, 1000),
+            "turn_prompt": measure(
+                lambda: build_turn_prompt(session, session.last_user_message, session.user_message_count), repeat, 200),
+            "legacy_history_scan": measure(lambda: legacy_history_scan(history), repeat, number),
+            "feedback_prompt": measure(
+                lambda: build_feedback_prompt(session.candidate_info, qa_pairs), repeat, number),
+        }
+
+        # Full turn, continuing the same interview (mutates the session)
+        results[turns]["full_turn"] = measure(lambda: run_turn(session), repeat, 10)
+    return results
+
+
+def bench_concurrent_sessions(num_sessions, turns):
+    """Memory and per-turn time with many live sessions interleaving turns"""
+    gc.collect()
+    tracemalloc.start()
+    start_mem, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    sessions = [InterviewSession(f"bench-{i}", SAMPLE_CARD) for i in range(num_sessions)]
+    for session in sessions:
+        session.add_message("assistant", "Hello! Please introduce yourself.")
+    init_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(turns):
+        for session in sessions:
+            run_turn(session)
+    turn_seconds = time.perf_counter() - start
+
+    end_mem, peak_mem = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "sessions": num_sessions,
+        "turns_per_session": turns,
+        "init_us_per_session": round(init_seconds / num_sessions * 1e6, 3),
+        "turn_us": round(turn_seconds / max(1, num_sessions * turns) * 1e6, 3),
+        "bytes_per_session": round((end_mem - start_mem) / num_sessions),
+        "peak_bytes": peak_mem,
+    }
+
+
+def check_scaling(results, max_ratio):
+    """Per-turn hot paths must not grow with history length"""
+    failures = []
+    small, large = results[TURN_SIZES[0]], results[TURN_SIZES[-1]]
+    for name in ("extract_candidate_info", "should_end_interview", "turn_prompt", "full_turn"):
+        ratio = large[name]["median_us"] / max(small[name]["median_us"], 1e-3)
+        if ratio > max_ratio:
+            failures.append(f"{name}: {ratio:.1f}x slower at {TURN_SIZES[-1]} turns than at {TURN_SIZES[0]}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for InterviewSession hot paths")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=1000, help="concurrent sessions for the memory benchmark")
+    parser.add_argument("--session-turns", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="exit non-zero if per-turn cost scales with history")
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    report = {
+        "turn_scaling": bench_turn_scaling(args.repeat),
+        "concurrent_sessions": bench_concurrent_sessions(args.sessions, args.session_turns),
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+    if args.check:
+        failures = check_scaling(report["turn_scaling"], args.max_ratio)
+        for failure in failures:
+            print(f"❌ {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print("✅ Per-turn hot paths are independent of history length", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
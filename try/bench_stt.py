@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from assemblyai.streaming.v3 import (
+    StreamingClient,
+    StreamingClientOptions,
+    StreamingEvents,
+    StreamingParameters,
+)
+
+from fake_stt_server import FakeSttConfig, FakeSttServer, make_self_signed_cert, server_ssl_context
+from stt_audio import iter_pcm_chunks, read_wav_pcm, synthetic_pcm
+
+SAMPLE_RATE = 16000
+STAGES = ("connect", "begin", "first_partial", "final")
+
+
+class StageStats:
+    """Thread-safe latency collector per pipeline stage"""
+
+    def __init__(self):
+        self.latencies = {stage: [] for stage in STAGES}
+        self.errors = {}
+        self.sessions = 0
+        self.completed = 0
+        self.lock = threading.Lock()
+
+    def record(self, session):
+        with self.lock:
+            self.sessions += 1
+            for stage in STAGES:
+                if session.get(stage) is not None:
+                    self.latencies[stage].append(session[stage])
+            if session["error"]:
+                self.errors[session["error"]] = self.errors.get(session["error"], 0) + 1
+            elif session.get("final") is not None:
+                self.completed += 1
+
+    def summary(self):
+        def percentiles(values):
+            values = sorted(values)
+            count = len(values)
+
+            def percentile(p):
+                if not values:
+                    return None
+                index = min(count - 1, int(round(p / 100 * (count - 1))))
+                return round(values[index] * 1000, 2)
+
+            return {
+                "count": count,
+                "mean_ms": round(sum(values) / count * 1000, 2) if count else None,
+                "p50_ms": percentile(50),
+                "p95_ms": percentile(95),
+                "p99_ms": percentile(99),
+                "max_ms": round(values[-1] * 1000, 2) if values else None,
+            }
+
+        failed = sum(self.errors.values())
+        return {
+            "sessions": self.sessions,
+            "completed": self.completed,
+            "failed": failed,
+            "error_rate": round(failed / self.sessions, 4) if self.sessions else 0.0,
+            "errors": self.errors,
+            "stages": {stage: percentiles(values) for stage, values in self.latencies.items()},
+        }
+
+
+def run_session(api_host, pcm, realtime, stats):
+    """One capture through the SDK client: connect, stream the audio, wait for the formatted final
+
+    Latencies are from the start of the session: connect (TLS + WebSocket),
+    begin (session ready), first_partial and final (first formatted
+    end-of-turn, the transcript the interview turn waits on).
+    """
+    session = {"error": None}
+    start = time.perf_counter()
+    done = threading.Event()
+
+    def on_begin(client, event):
+        session["begin"] = time.perf_counter() - start
+
+    def on_turn(client, event):
+        elapsed = time.perf_counter() - start
+        if event.transcript.strip() and "first_partial" not in session:
+            session["first_partial"] = elapsed
+        if event.end_of_turn and event.turn_is_formatted and "final" not in session:
+            session["final"] = elapsed
+            done.set()
+
+    def on_error(client, error):
+        session["error"] = session["error"] or str(error)[:80]
+        done.set()
+
+    client = StreamingClient(StreamingClientOptions(api_key="fake", api_host=api_host))
+    client.on(StreamingEvents.Begin, on_begin)
+    client.on(StreamingEvents.Turn, on_turn)
+    client.on(StreamingEvents.Error, on_error)
+    try:
+        client.connect(StreamingParameters(sample_rate=SAMPLE_RATE, format_turns=True))
+        session["connect"] = time.perf_counter() - start
+        client.stream(iter_pcm_chunks(pcm, SAMPLE_RATE, realtime=realtime))
+        done.wait(timeout=10)
+        if "final" not in session and not session["error"]:
+            session["error"] = "no final transcript"
+    except Exception as e:
+        session["error"] = session["error"] or f"{type(e).__name__}: {str(e)[:80]}"
+    finally:
+        try:
+            client.disconnect(terminate=True)
+        except Exception:
+            pass
+
+    stats.record(session)
+    return session["error"] is None
+
+
+def check_thresholds(report, args):
+    """Failure messages for --max-* thresholds that the run exceeded"""
+    failures = []
+    final_p95 = report["results"]["stages"]["final"]["p95_ms"]
+    connect_p95 = report["results"]["stages"]["connect"]["p95_ms"]
+    if args.max_p95_final_ms is not None and (final_p95 is None or final_p95 > args.max_p95_final_ms):
+        failures.append(f"final p95 {final_p95} ms > {args.max_p95_final_ms} ms")
+    if args.max_p95_connect_ms is not None and (connect_p95 is None or connect_p95 > args.max_p95_connect_ms):
+        failures.append(f"connect p95 {connect_p95} ms > {args.max_p95_connect_ms} ms")
+    if args.max_error_rate is not None and report["results"]["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {report['results']['error_rate']} > {args.max_error_rate}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming-STT client path against a fake server")
+    parser.add_argument("--api-host", help="host:port of a running fake_stt_server.py (default: start one in-process)")
+    parser.add_argument("--sessions", type=int, default=20, help="total STT captures")
+    parser.add_argument("--concurrency", type=int, default=5, help="captures in flight at once")
+    parser.add_argument("--audio", help="16 kHz mono WAV to stream (default: synthetic tone + silence)")
+    parser.add_argument("--audio-seconds", type=float, default=8.0, help="length of the synthetic audio")
+    parser.add_argument("--realtime", type=float, default=1.0, help="audio pace, 2.0 = twice real time, 0 = unpaced")
+    parser.add_argument("--handshake-latency-ms", type=float, default=0)
+    parser.add_argument("--turn-latency-ms", type=float, default=0)
+    parser.add_argument("--drop-rate", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--max-p95-final-ms", type=float, help="fail if the final-transcript p95 is above this")
+    parser.add_argument("--max-p95-connect-ms", type=float, help="fail if the connect p95 is above this")
+    parser.add_argument("--max-error-rate", type=float, help="fail if the session error rate is above this")
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    server = None
+    api_host = args.api_host
+    if api_host is None:
+        # The SDK only speaks wss://, so the local server gets a throwaway localhost cert
+        certfile, keyfile = make_self_signed_cert(os.path.join(tempfile.gettempdir(), "fake_stt_tls"))
+        os.environ["SSL_CERT_FILE"] = certfile
+        server = FakeSttServer(
+            FakeSttConfig(
+                handshake_latency=args.handshake_latency_ms / 1000,
+                turn_latency=args.turn_latency_ms / 1000,
+                drop_rate=args.drop_rate,
+                error_rate=args.error_rate,
+            ),
+            ssl_context=server_ssl_context(certfile, keyfile),
+        )
+        server.start()
+        api_host = server.api_host
+        print(f"🎙️ Fake STT server on wss://{api_host}", file=sys.stderr)
+
+    pcm = read_wav_pcm(args.audio, SAMPLE_RATE) if args.audio else synthetic_pcm(
+        speech_seconds=max(args.audio_seconds - 1.5, 0.5), sample_rate=SAMPLE_RATE)
+
+    try:
+        stats = StageStats()
+        print(f"🧪 {args.sessions} STT sessions, concurrency {args.concurrency}, {args.realtime}x real time", file=sys.stderr)
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(lambda _: run_session(api_host, pcm, args.realtime, stats), range(args.sessions)))
+        wall_seconds = time.perf_counter() - wall_start
+
+        report = {
+            "config": {
+                "api_host": api_host,
+                "sessions": args.sessions,
+                "concurrency": args.concurrency,
+                "audio_seconds": round(len(pcm) / 2 / SAMPLE_RATE, 2),
+                "realtime": args.realtime,
+                "handshake_latency_ms": args.handshake_latency_ms,
+                "turn_latency_ms": args.turn_latency_ms,
+                "drop_rate": args.drop_rate,
+                "error_rate": args.error_rate,
+            },
+            "wall_seconds": round(wall_seconds, 3),
+            "results": stats.summary(),
+        }
+        failures = check_thresholds(report, args)
+        report["check"] = {"passed": not failures, "failures": failures}
+
+        output = json.dumps(report, indent=2)
+        print(output)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output)
+    finally:
+        if server:
+            server.stop()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
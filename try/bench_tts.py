@@ -0,0 +1,142 @@
+import argparse
+import gc
+import json
+import time
+
+from tts_engine import (
+    DEFAULT_SAMPLE_RATE,
+    TTS_VARIANTS,
+    configure_torch_threads,
+    load_silero_model,
+    synthesize,
+    warm_up,
+)
+
+# Typical interviewer turns: short acknowledgement + one question
+SAMPLE_SENTENCES = [
+    "Hello! Welcome to your interview.",
+    "Good point. What's your approach to testing this?",
+    "Can you explain the difference between a process and a thread?",
+    "How would you design a rate limiter for a public API that serves millions of requests per day?",
+    "Thank you for your time today, we appreciate your participation in this interview.",
+]
+
+
+def _proc_status_mb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, falls back to peak RSS)"""
+    rss = _proc_status_mb("VmRSS")
+    if rss is not None:
+        return rss
+
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss():
+    """Restart the kernel's peak RSS count so each variant reports its own peak (Linux only)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (VmHWM, falls back to ru_maxrss)"""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_variant(variant, runs, sample_rate):
+    """Load one variant and measure load time, memory and real-time factor"""
+    gc.collect()
+    reset_peak_rss()
+    rss_before = current_rss_mb()
+
+    load_start = time.perf_counter()
+    model, loaded_variant = load_silero_model(variant)
+    load_seconds = time.perf_counter() - load_start
+
+    warmup_seconds = warm_up(model, sample_rate=sample_rate)
+    rss_after_load = current_rss_mb()
+
+    synth_seconds = 0.0
+    audio_seconds = 0.0
+    per_sentence = []
+
+    for _ in range(runs):
+        for text in SAMPLE_SENTENCES:
+            start = time.perf_counter()
+            audio = synthesize(model, text, sample_rate=sample_rate)
+            elapsed = time.perf_counter() - start
+
+            duration = len(audio) / sample_rate
+            synth_seconds += elapsed
+            audio_seconds += duration
+            per_sentence.append(elapsed / duration if duration else 0.0)
+
+    per_sentence.sort()
+    result = {
+        "requested_variant": variant,
+        "loaded_variant": loaded_variant,
+        "load_seconds": round(load_seconds, 3),
+        "warmup_seconds": round(warmup_seconds, 3),
+        "model_rss_mb": round(rss_after_load - rss_before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "audio_seconds": round(audio_seconds, 2),
+        "synthesis_seconds": round(synth_seconds, 3),
+        "rtf": round(synth_seconds / audio_seconds, 4) if audio_seconds else None,
+        "rtf_p50": round(per_sentence[len(per_sentence) // 2], 4) if per_sentence else None,
+        "rtf_max": round(per_sentence[-1], 4) if per_sentence else None,
+    }
+
+    del model
+    gc.collect()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Silero TTS variants (real-time factor and memory)")
+    parser.add_argument("--variants", nargs="+", default=list(TTS_VARIANTS), choices=TTS_VARIANTS)
+    parser.add_argument("--runs", type=int, default=3, help="passes over the sample sentences per variant")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    threads = configure_torch_threads(args.threads, 1)
+    print(f"🧪 Benchmarking TTS variants {args.variants} with {threads} torch threads")
+
+    results = []
+    for variant in args.variants:
+        print(f"🔄 Running variant: {variant}")
+        result = benchmark_variant(variant, args.runs, args.sample_rate)
+        print(f"   RTF={result['rtf']}  model RSS={result['model_rss_mb']} MB  load={result['load_seconds']}s")
+        results.append(result)
+
+    report = {"torch_threads": threads, "sample_rate": args.sample_rate, "results": results}
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import contextvars
+import threading
+from collections import OrderedDict
+
+from metrics import REGISTRY
+
+CANCEL_REQUESTS = REGISTRY.counter(
+    'cancel_requests', 'Cancellations requested by clients', ['scope', 'reason'])
+CANCELLED_OPERATIONS = REGISTRY.counter(
+    'cancelled_operations', 'LLM/STT/TTS work stopped early because its session or turn was cancelled',
+    ['operation', 'reason'])
+
+_current_token = contextvars.ContextVar('cancel_token', default=None)
+
+
+class OperationCancelled(Exception):
+    """Raised at a cancellation checkpoint once the session or turn has been cancelled"""
+
+    def __init__(self, operation, reason):
+        super().__init__(f"{operation} cancelled ({reason})")
+        self.operation = operation
+        self.reason = reason
+
+
+class CancelToken:
+    """One-shot cancellation flag with callbacks to abort blocking work (sockets, audio playback)"""
+
+    def __init__(self):
+        self.reason = None
+        self._event = threading.Event()
+        self._callbacks = []
+        # (parent, callback) for every link() to a parent, so detach() can undo them
+        self._parents = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason='cancelled'):
+        """Cancel once and run callbacks; returns False if it was already cancelled"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Cancel callback failed: {e}")
+        return True
+
+    def add_callback(self, callback):
+        """Run callback on cancel (immediately if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def link(self, child):
+        """Cancelling this token also cancels child (session -> turn), until child.detach()"""
+        callback = lambda: child.cancel(self.reason)
+        with child._lock:
+            child._parents.append((self, callback))
+        self.add_callback(callback)
+
+    def detach(self):
+        """Remove the callbacks this token's links left on its parents (when its turn ends)"""
+        with self._lock:
+            parents, self._parents = self._parents, []
+        for parent, callback in parents:
+            parent.remove_callback(callback)
+
+    def check(self, operation):
+        """Cancellation checkpoint: raise OperationCancelled if cancelled"""
+        if self._event.is_set():
+            CANCELLED_OPERATIONS.inc(operation=operation, reason=self.reason)
+            raise OperationCancelled(operation, self.reason)
+
+
+def current_token():
+    """Cancel token of the turn being handled in this context, if any"""
+    return _current_token.get()
+
+
+def activate(token):
+    """Make token current for this context; returns the contextvar token for deactivate()"""
+    return _current_token.set(token)
+
+
+def deactivate(context_token):
+    try:
+        _current_token.reset(context_token)
+    except ValueError:
+        # Reset from a different context (e.g. a streamed response): just clear it
+        _current_token.set(None)
+
+
+def check_cancelled(operation):
+    """Checkpoint against the current context's token (no-op without one)"""
+    token = _current_token.get()
+    if token is not None:
+        token.check(operation)
+
+
+class CancelRegistry:
+    """Cancel tokens per session and per turn id; a turn bound to a session is cancelled with it
+
+    Session tokens exist from open_session() until discard_session(); binding
+    to or cancelling any other session id is a no-op, so made-up ids cannot
+    grow the registry.
+    """
+
+    def __init__(self, max_turns=1000):
+        self.max_turns = max_turns
+        self._sessions = {}
+        self._turns = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open_session(self, session_id):
+        with self._lock:
+            token = self._sessions.get(session_id)
+            if token is None:
+                token = self._sessions[session_id] = CancelToken()
+            return token
+
+    def session(self, session_id):
+        """Token of an open session, or None"""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def turn(self, turn_id):
+        """Token for a turn id; a cancel that arrives before the turn's requests is kept"""
+        with self._lock:
+            token = self._turns.get(turn_id)
+            if token is None:
+                token = self._turns[turn_id] = CancelToken()
+                while len(self._turns) > self.max_turns:
+                    self._turns.popitem(last=False)
+            else:
+                self._turns.move_to_end(turn_id)
+            return token
+
+    def bind(self, turn_token, session_id):
+        """Attach a turn to its session so cancelling the session reaches the turn's work"""
+        session_token = self.session(session_id)
+        if session_token is not None and turn_token is not None:
+            session_token.link(turn_token)
+
+    def cancel_session(self, session_id, reason):
+        """Cancel an open session; None if there is no such session"""
+        session_token = self.session(session_id)
+        if session_token is None:
+            return None
+        CANCEL_REQUESTS.inc(scope='session', reason=reason)
+        return session_token.cancel(reason)
+
+    def cancel_turn(self, turn_id, reason):
+        CANCEL_REQUESTS.inc(scope='turn', reason=reason)
+        return self.turn(turn_id).cancel(reason)
+
+    def discard_session(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -0,0 +1,308 @@
+import contextvars
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from llm_cache import config_key, normalize_prompt
+from metrics import REGISTRY
+
+CASSETTE_EVENTS = REGISTRY.counter(
+    'cassette_events', 'Requests, LLM calls and STT captures recorded to or replayed from cassettes', ['mode', 'kind'])
+CASSETTE_REPLAY_MISSES = REGISTRY.counter(
+    'cassette_replay_misses', 'Upstream calls in replay mode with no matching recording', ['kind'])
+
+CASSETTE_VERSION = 1
+
+# Cassette holding upstream calls made outside any request, such as the startup model probe
+STARTUP_CASSETTE = "_startup"
+
+_current_recording = contextvars.ContextVar('cassette_recording', default=None)
+
+
+class CassetteReplayMiss(LookupError):
+    """Raised in replay for an LLM prompt the cassettes have no recording of"""
+
+
+def prompt_key(prompt, generation_config=None):
+    """Recordings are matched on the prompt and config, not the model, which replay may pick differently"""
+    text = f"{normalize_prompt(prompt)}\n{config_key(generation_config)}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:24]
+
+
+class _Recording:
+    """Events of one request (and the background work it started) until it is tied to a session"""
+
+    def __init__(self, turn_id):
+        self.turn_id = turn_id
+        self.events = []
+        self.session = None
+        self._lock = threading.Lock()
+
+    def add(self, event):
+        with self._lock:
+            if self.session is None:
+                self.events.append(event)
+                return
+        self.session.add(event)
+
+    def bind(self, session):
+        with self._lock:
+            if self.session is not None:
+                return
+            self.session = session
+            events, self.events = self.events, []
+        for event in events:
+            session.add(event)
+
+
+class _SessionTape:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def take(self):
+        with self._lock:
+            return sorted(self.events, key=lambda e: e['ts'])
+
+
+class CassetteRecorder:
+    """Records inbound requests, LLM prompts/responses and STT transcripts per interview session
+
+    Every request gets a recording; it is tied to a session through the
+    session id in its path, body or response, or through the turn id of an
+    earlier request of the same turn (an /stt capture before its /api/respond).
+    A session's cassette is written flush_delay seconds after it finishes, so
+    trailing requests such as the farewell's TTS are included. Calls made
+    outside a request (such as the startup model probe) go to a startup
+    cassette, so replay can answer them too.
+    """
+
+    def __init__(self, directory, flush_delay=10.0, max_turns=1000):
+        self.directory = directory
+        self.flush_delay = flush_delay
+        self.max_turns = max_turns
+        self._sessions = {}
+        self._turn_sessions = OrderedDict()
+        self._pending_turns = OrderedDict()
+        self._written = OrderedDict()
+        self._startup = _SessionTape(STARTUP_CASSETTE)
+        self._startup_written = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def begin_request(self, turn_id):
+        """Start recording this request's context; returns the contextvar token for end_request"""
+        return _current_recording.set(_Recording(turn_id))
+
+    def record(self, kind, **fields):
+        """Add an event to the current context's recording, or to the startup cassette outside a request"""
+        recording = _current_recording.get()
+        if recording is None:
+            self._startup.add({'ts': round(time.time(), 3), 'kind': kind, 'turn_id': None, **fields})
+        else:
+            recording.add({'ts': round(time.time(), 3), 'kind': kind, 'turn_id': recording.turn_id, **fields})
+        CASSETTE_EVENTS.inc(mode='record', kind=kind)
+
+    def _tape(self, session_id):
+        tape = self._sessions.get(session_id)
+        if tape is None:
+            tape = self._sessions[session_id] = _SessionTape(session_id)
+        return tape
+
+    def end_request(self, context_token, session_id, **request_fields):
+        """Record the request itself and tie its recording to session_id (or to its turn's session)"""
+        recording = _current_recording.get()
+        try:
+            _current_recording.reset(context_token)
+        except ValueError:
+            _current_recording.set(None)
+        if recording is None:
+            return
+
+        recording.add({'ts': round(time.time(), 3), 'kind': 'request', 'turn_id': recording.turn_id, **request_fields})
+        CASSETTE_EVENTS.inc(mode='record', kind='request')
+
+        with self._lock:
+            session_id = session_id or self._turn_sessions.get(recording.turn_id)
+            if session_id is None:
+                self._pending_turns.setdefault(recording.turn_id, []).append(recording)
+                while len(self._pending_turns) > self.max_turns:
+                    self._pending_turns.popitem(last=False)
+                return
+            if session_id in self._written:
+                # Its cassette is already on disk; a new tape would overwrite it at shutdown
+                return
+            tape = self._tape(session_id)
+            self._turn_sessions[recording.turn_id] = session_id
+            while len(self._turn_sessions) > self.max_turns:
+                self._turn_sessions.popitem(last=False)
+            pending = self._pending_turns.pop(recording.turn_id, [])
+
+        for earlier in pending + [recording]:
+            earlier.bind(tape)
+
+    def finish(self, session_id):
+        """Write the session's cassette shortly, once trailing requests have been recorded"""
+        timer = threading.Timer(self.flush_delay, self._write, args=(session_id,))
+        timer.daemon = True
+        timer.start()
+
+    def _write(self, session_id):
+        with self._lock:
+            tape = self._sessions.pop(session_id, None)
+            self._written[session_id] = True
+            while len(self._written) > self.max_turns:
+                self._written.popitem(last=False)
+        if tape is not None:
+            self._write_tape(session_id, tape.take())
+        self._write_startup()
+
+    def _write_startup(self):
+        """Rewrite the startup cassette when calls were recorded outside requests since it was last written"""
+        events = self._startup.take()
+        with self._lock:
+            if len(events) == self._startup_written:
+                return
+            self._startup_written = len(events)
+        self._write_tape(STARTUP_CASSETTE, events)
+
+    def _write_tape(self, session_id, events):
+        path = os.path.join(self.directory, f"{session_id}.jsonl.gz")
+        header = {'cassette': CASSETTE_VERSION, 'session_id': session_id, 'recorded_at': time.time()}
+        try:
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                for item in [header] + events:
+                    f.write(json.dumps(item, separators=(',', ':'), default=str) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write cassette {path}: {e}")
+
+    def flush(self):
+        """Write every session recorded so far, finished or not, and the startup cassette (at shutdown)"""
+        with self._lock:
+            session_ids = list(self._sessions)
+        for session_id in session_ids:
+            self._write(session_id)
+        self._write_startup()
+
+
+def read_cassette(path):
+    """(header, events) of one cassette file"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get('cassette') != CASSETTE_VERSION:
+        raise ValueError(f"{path}: not a version {CASSETTE_VERSION} cassette")
+    return lines[0], lines[1:]
+
+
+def iter_cassettes(directory):
+    for path in sorted(glob.glob(os.path.join(directory, '*.jsonl.gz'))):
+        try:
+            yield read_cassette(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping cassette {path}: {e}")
+
+
+class _ReplayResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class CassetteGenerativeModel:
+    """LLM backend that answers from recorded responses, after the recorded latency"""
+
+    def __init__(self, player, model_name):
+        self.player = player
+        self.model_name = model_name
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        text, latency = self.player.llm_response(prompt, generation_config)
+        self.player.sleep(latency)
+        return _ReplayResponse(text)
+
+
+class CassettePlayer:
+    """Serves LLM responses (by prompt) and STT transcripts (by turn id) from recorded cassettes
+
+    Repeated identical prompts are answered with their recordings in order,
+    cycling when replay asks more often than recording did. speed scales the
+    recorded upstream latencies (2.0 = twice as fast).
+    """
+
+    def __init__(self, directory, speed=1.0):
+        self.speed = speed
+        self._llm = defaultdict(list)
+        self._llm_next = defaultdict(int)
+        self._stt = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.cassettes = 0
+        for _, events in iter_cassettes(directory):
+            self.cassettes += 1
+            for event in events:
+                if event['kind'] == 'llm':
+                    self._llm[event['prompt_key']].append((event['text'], event['seconds']))
+                elif event['kind'] == 'stt':
+                    self._stt[event['turn_id']].append((event['transcript'], event['seconds']))
+
+    def sleep(self, seconds):
+        if seconds and self.speed > 0:
+            time.sleep(seconds / self.speed)
+
+    def llm_response(self, prompt, generation_config=None):
+        key = prompt_key(prompt, generation_config)
+        with self._lock:
+            recorded = self._llm.get(key)
+            if not recorded:
+                CASSETTE_REPLAY_MISSES.inc(kind='llm')
+                # No placeholder text: it could be spoken to the candidate as if the model wrote it
+                raise CassetteReplayMiss(f"No recorded LLM response for prompt {key}")
+            index = self._llm_next[key]
+            self._llm_next[key] = index + 1
+        CASSETTE_EVENTS.inc(mode='replay', kind='llm')
+        return recorded[index % len(recorded)]
+
+    def stt_transcript(self, turn_id):
+        """(transcript, capture seconds) recorded for this turn, or ("", 0) if there is none"""
+        with self._lock:
+            recorded = self._stt.get(turn_id)
+            if not recorded:
+                CASSETTE_REPLAY_MISSES.inc(kind='stt')
+                return "", 0.0
+            transcript, seconds = recorded.popleft()
+        CASSETTE_EVENTS.inc(mode='replay', kind='stt')
+        return transcript, seconds
+
+    def model(self, model_name):
+        return CassetteGenerativeModel(self, model_name)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cassettes': self.cassettes,
+                'llm_prompts': len(self._llm),
+                'stt_turns': sum(1 for turns in self._stt.values() if turns),
+                'speed': self.speed,
+            }
+
+
+def create_cassettes_from_env():
+    """(recorder, player) for CASSETTE_MODE=record|replay with cassettes in CASSETTE_DIR; both None when off"""
+    mode = os.getenv('CASSETTE_MODE', '')
+    directory = os.getenv('CASSETTE_DIR', 'cassettes')
+    if mode == 'record':
+        return CassetteRecorder(directory, flush_delay=float(os.getenv('CASSETTE_FLUSH_DELAY', '10'))), None
+    if mode == 'replay':
+        return None, CassettePlayer(directory, speed=float(os.getenv('CASSETTE_SPEED', '1')))
+    return None, None
+
+
+CASSETTE_RECORDER, CASSETTE_PLAYER = create_cassettes_from_env()
@@ -0,0 +1,711 @@
+import argparse
+import glob
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process writers only
+    fcntl = None
+
+from metrics import REGISTRY
+
+COLUMNAR_ARCHIVED_SESSIONS = REGISTRY.counter(
+    'columnar_archived_sessions', 'Completed sessions moved from memory into columnar segments')
+COLUMNAR_LOOKUP_SECONDS = REGISTRY.histogram(
+    'columnar_lookup_seconds', 'Single-session lookups in the columnar archive',
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+
+SEGMENT_MAGIC = b"HRCOLv1\n"
+INDEX_MAGIC = b"HRIDXv2\n"
+# v1 indexes are one sorted run without a run header
+INDEX_MAGIC_V1 = b"HRIDXv1\n"
+# Index record: 16-byte session id hash, segment number, row within the segment
+INDEX_RECORD = struct.Struct("<16sII")
+# Each flush appends a sorted run (record count, then records); past MAX_INDEX_RUNS they are merged into one
+INDEX_RUN_HEADER = struct.Struct("<I")
+MAX_INDEX_RUNS = 8
+
+# (column, type) per table; "json" columns are strings holding JSON documents
+SESSION_COLUMNS = [
+    ("session_id", "str"),
+    ("role", "str"),
+    ("level", "str"),
+    ("interview_type", "str"),
+    ("techstack", "json"),
+    ("start_time", "f64"),
+    ("completed_at", "f64"),
+    ("duration_seconds", "f64"),
+    ("question_count", "i64"),
+    ("technical_score", "f64"),
+    ("communication_score", "f64"),
+    ("experience_level", "str"),
+    ("turn_start", "i64"),
+    ("turn_count", "i64"),
+    ("feedback", "str"),
+    ("structured_feedback", "json"),
+    ("candidate_info", "json"),
+    ("topic_coverage", "json"),
+    ("prepared_questions", "json"),
+    ("interview_data", "json"),
+    ("conversation_history", "json"),
+]
+TURN_COLUMNS = [
+    ("session_row", "i64"),
+    ("question", "str"),
+    ("answer", "str"),
+    ("answer_words", "i64"),
+    ("timestamp", "str"),
+]
+NUMERIC_TYPECODES = {"f64": "d", "i64": "q"}
+# Columns only a single-session lookup reads: compressed per session (one block per session row,
+# or per session's turns) behind an uncompressed block offset table, so a lookup inflates just its slice
+ROW_BLOCK_COLUMNS = {
+    "sessions.feedback", "sessions.structured_feedback", "sessions.candidate_info", "sessions.topic_coverage",
+    "sessions.prepared_questions", "sessions.interview_data", "sessions.conversation_history",
+    "turns.question", "turns.answer", "turns.timestamp",
+}
+BLOCK_OFFSET = struct.Struct("<Q")
+
+
+def session_key(session_id):
+    return hashlib.blake2b(session_id.encode("utf-8"), digest_size=16).digest()
+
+
+def _timestamp(value):
+    if not value:
+        return math.nan
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _score(value):
+    # candidate_info keeps 0 until feedback fills the scores in: treat it as "not graded"
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return score if score > 0 else math.nan
+
+
+def _techstack(value):
+    """Tech stack as a list of lowercase names; cards may send a comma-separated string (as question_bank accepts)"""
+    if not isinstance(value, list):
+        value = str(value or "").split(",")
+    return [str(tech).strip().lower() for tech in value if str(tech).strip()]
+
+
+def _rows(records):
+    """Session and turn column values for archived session records (InterviewSession.to_dict())"""
+    sessions = {name: [] for name, _ in SESSION_COLUMNS}
+    turns = {name: [] for name, _ in TURN_COLUMNS}
+    for row, record in enumerate(records):
+        interview_data = record.get("interview_data") or {}
+        candidate_info = record.get("candidate_info") or {}
+        qa_pairs = record.get("all_questions_answers") or []
+        start_time = _timestamp(record.get("start_time"))
+        completed_at = _timestamp(record.get("completed_at"))
+        values = {
+            "session_id": record["session_id"],
+            "role": interview_data.get("role", ""),
+            "level": interview_data.get("level", ""),
+            "interview_type": interview_data.get("type", ""),
+            "techstack": _techstack(interview_data.get("techstack")),
+            "start_time": start_time,
+            "completed_at": completed_at,
+            "duration_seconds": completed_at - start_time,
+            "question_count": int(record.get("question_count") or 0),
+            "technical_score": _score(candidate_info.get("technical_score")),
+            "communication_score": _score(candidate_info.get("communication_score")),
+            "experience_level": candidate_info.get("experience_level") or "",
+            "turn_start": len(turns["session_row"]),
+            "turn_count": len(qa_pairs),
+            "feedback": record.get("feedback") or "",
+            "structured_feedback": record.get("structured_feedback"),
+            "candidate_info": candidate_info,
+            "topic_coverage": record.get("topic_coverage"),
+            "prepared_questions": record.get("prepared_questions"),
+            "interview_data": interview_data,
+            "conversation_history": record.get("conversation_history") or [],
+        }
+        for name, _ in SESSION_COLUMNS:
+            sessions[name].append(values[name])
+        for qa in qa_pairs:
+            answer = qa.get("answer") or ""
+            turns["session_row"].append(row)
+            turns["question"].append(qa.get("question") or "")
+            turns["answer"].append(answer)
+            turns["answer_words"].append(len(answer.split()))
+            turns["timestamp"].append(qa.get("timestamp") or "")
+    return sessions, turns
+
+
+def _encode(values, column_type):
+    if column_type in NUMERIC_TYPECODES:
+        data = array(NUMERIC_TYPECODES[column_type], values)
+        if sys.byteorder == "big":
+            data.byteswap()
+        return data.tobytes()
+
+    if column_type == "json":
+        values = [json.dumps(value, separators=(",", ":"), default=str) for value in values]
+    blobs = [str(value).encode("utf-8") for value in values]
+    offsets = array("I", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets.tobytes() + b"".join(blobs)
+
+
+class _StringColumn:
+    """Strings decoded on access from an offsets array and one UTF-8 blob"""
+
+    def __init__(self, raw, count, is_json):
+        self._offsets = array("I")
+        self._offsets.frombytes(raw[:(count + 1) * 4])
+        if sys.byteorder == "big":
+            self._offsets.byteswap()
+        self._blob = memoryview(raw)[(count + 1) * 4:]
+        self._is_json = is_json
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        text = bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+        return json.loads(text) if self._is_json else text
+
+    def __iter__(self):
+        return (self[i] for i in range(self._count))
+
+
+def _encode_row_blocks(values, column_type, bounds):
+    """Block offset table plus one zlib block per (start, end) slice of values; returns (data, raw size)"""
+    blocks, raw_size = [], 0
+    offsets = array("Q", [0])
+    for start, end in bounds:
+        raw = _encode(values[start:end], column_type)
+        raw_size += len(raw)
+        blocks.append(zlib.compress(raw, 6))
+        offsets.append(offsets[-1] + len(blocks[-1]))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets.tobytes() + b"".join(blocks), raw_size
+
+
+def write_segment(path, records):
+    """Write session records as one segment: per-column zlib blocks after a JSON header"""
+    sessions, turns = _rows(records)
+    bounds = {
+        "sessions": [(row, row + 1) for row in range(len(sessions["session_id"]))],
+        "turns": [(start, start + count) for start, count in zip(sessions["turn_start"], sessions["turn_count"])],
+    }
+    blocks, columns, offset = [], {}, 0
+    for table, schema, values in (("sessions", SESSION_COLUMNS, sessions), ("turns", TURN_COLUMNS, turns)):
+        for name, column_type in schema:
+            meta = {"type": column_type}
+            if f"{table}.{name}" in ROW_BLOCK_COLUMNS:
+                block, raw_size = _encode_row_blocks(values[name], column_type, bounds[table])
+                meta.update(layout="rows", blocks=len(bounds[table]))
+            else:
+                raw = _encode(values[name], column_type)
+                block, raw_size = zlib.compress(raw, 6), len(raw)
+            columns[f"{table}.{name}"] = dict(meta, offset=offset, size=len(block), raw_size=raw_size)
+            blocks.append(block)
+            offset += len(block)
+
+    header = json.dumps({
+        "rows": len(sessions["session_id"]),
+        "turns": len(turns["session_row"]),
+        "created_at": time.time(),
+        "columns": columns,
+    }).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SEGMENT_MAGIC + struct.pack("<I", len(header)) + header)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+    return sessions["session_id"]
+
+
+class Segment:
+    """A memory-mapped segment; columns are decompressed on first use and kept
+
+    Per-session ("rows" layout) columns are never kept: session() inflates
+    only the requested row's block of each.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a columnar segment")
+        (header_size,) = struct.unpack_from("<I", self._mm, len(SEGMENT_MAGIC))
+        data_start = len(SEGMENT_MAGIC) + 4 + header_size
+        header = json.loads(self._mm[len(SEGMENT_MAGIC) + 4:data_start])
+        self.rows = header["rows"]
+        self.turns = header["turns"]
+        self._columns = header["columns"]
+        self._data_start = data_start
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    def _row_blocks(self, name):
+        return self._columns[name].get("layout") == "rows"
+
+    def _block(self, name, index, count):
+        """The count values in block `index` of a per-session column"""
+        meta = self._columns[name]
+        start = self._data_start + meta["offset"]
+        data_start = start + (meta["blocks"] + 1) * BLOCK_OFFSET.size
+        (begin,) = BLOCK_OFFSET.unpack_from(self._mm, start + index * BLOCK_OFFSET.size)
+        (end,) = BLOCK_OFFSET.unpack_from(self._mm, start + (index + 1) * BLOCK_OFFSET.size)
+        raw = zlib.decompress(self._mm[data_start + begin:data_start + end])
+        return _StringColumn(raw, count, meta["type"] == "json")
+
+    def column(self, name):
+        """Decoded column "sessions.<name>" or "turns.<name>" (array for numbers, sequence for strings)"""
+        if self._row_blocks(name):
+            # Whole-column reads of per-session columns (scans) are not cached
+            counts = [1] * self.rows if name.startswith("sessions.") else self.column("sessions.turn_count")
+            return [value for index, count in enumerate(counts) for value in self._block(name, index, count)]
+        with self._lock:
+            decoded = self._decoded.get(name)
+            if decoded is not None:
+                return decoded
+            meta = self._columns[name]
+            start = self._data_start + meta["offset"]
+            raw = zlib.decompress(self._mm[start:start + meta["size"]])
+            count = self.rows if name.startswith("sessions.") else self.turns
+            if meta["type"] in NUMERIC_TYPECODES:
+                decoded = array(NUMERIC_TYPECODES[meta["type"]])
+                decoded.frombytes(raw)
+                if sys.byteorder == "big":
+                    decoded.byteswap()
+            else:
+                decoded = _StringColumn(raw, count, meta["type"] == "json")
+            self._decoded[name] = decoded
+            return decoded
+
+    def session(self, row):
+        """One session's columns plus its turns as a plain record"""
+        record = {}
+        for name, column_type in SESSION_COLUMNS:
+            column = f"sessions.{name}"
+            record[name] = self._block(column, row, 1)[0] if self._row_blocks(column) else self.column(column)[row]
+            if column_type == "f64" and math.isnan(record[name]):
+                record[name] = None
+        start, count = record["turn_start"], record["turn_count"]
+        turns = {}
+        for name in ("question", "answer", "timestamp"):
+            column = f"turns.{name}"
+            if self._row_blocks(column):
+                turns[name] = self._block(column, row, count)
+            else:
+                values = self.column(column)
+                turns[name] = [values[i] for i in range(start, start + count)]
+        record["all_questions_answers"] = [
+            {name: turns[name][i] for name in ("question", "answer", "timestamp")}
+            for i in range(count)
+        ]
+        return record
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+class SessionIndex:
+    """Sorted runs of fixed-size (session hash -> segment, row) records, memory-mapped and binary-searched
+
+    Each flush appends one sorted run instead of rewriting the file; once
+    there are more than max_runs runs they are merged into one. A run
+    still being appended by another process is ignored until complete.
+    """
+
+    def __init__(self, path, max_runs=MAX_INDEX_RUNS):
+        self.path = path
+        self.max_runs = max_runs
+        self._file = None
+        self._mm = None
+        # (offset of the first record, record count) per run, oldest first
+        self._runs = []
+        # End of the last complete run
+        self._end = 0
+        self._stat = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Reopen the index if it was appended to or replaced on disk (by this or another process)"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            if self._stat is not None and (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self._stat:
+                return
+            if self._mm is not None:
+                self._mm.close()
+                self._file.close()
+            self._file = open(self.path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else None
+            self._runs = self._read_runs(len(self._mm) if self._mm is not None else 0)
+            self._end = self._runs[-1][0] + self._runs[-1][1] * INDEX_RECORD.size if self._runs else len(INDEX_MAGIC)
+            self._stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _read_runs(self, size):
+        if size < len(INDEX_MAGIC):
+            return []
+        magic = self._mm[:len(INDEX_MAGIC)]
+        if magic == INDEX_MAGIC_V1:
+            return [(len(INDEX_MAGIC), (size - len(INDEX_MAGIC)) // INDEX_RECORD.size)]
+        runs, offset = [], len(INDEX_MAGIC)
+        while offset + INDEX_RUN_HEADER.size <= size:
+            (count,) = INDEX_RUN_HEADER.unpack_from(self._mm, offset)
+            start = offset + INDEX_RUN_HEADER.size
+            if start + count * INDEX_RECORD.size > size:
+                break
+            runs.append((start, count))
+            offset = start + count * INDEX_RECORD.size
+        return runs
+
+    @property
+    def runs(self):
+        return len(self._runs)
+
+    def __len__(self):
+        return sum(count for _, count in self._runs)
+
+    def lookup(self, session_id):
+        """(segment, row) for session_id, or None"""
+        key = session_key(session_id)
+        with self._lock:
+            # Newest run first
+            for start, count in reversed(self._runs):
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    record_key, segment, row = INDEX_RECORD.unpack_from(self._mm, start + middle * INDEX_RECORD.size)
+                    if record_key < key:
+                        low = middle + 1
+                    elif record_key > key:
+                        high = middle
+                    else:
+                        return segment, row
+        return None
+
+    def _run_records(self, start, count):
+        for i in range(count):
+            yield INDEX_RECORD.unpack_from(self._mm, start + i * INDEX_RECORD.size)
+
+    def records(self):
+        """All records in key order"""
+        with self._lock:
+            return list(heapq.merge(*(self._run_records(start, count) for start, count in self._runs)))
+
+    def append(self, entries):
+        """Append entries [(key, segment, row)] as a new sorted run; merges the runs when there are too many.
+
+        Callers serialize writers (ColumnarArchive.write holds the directory lock).
+        """
+        entries = sorted(entries)
+        if self._mm is not None and self._mm[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            # A v1 index can't take runs: rewrite it in the current format with the entries merged in
+            self.compact(entries)
+            return
+        with open(self.path, "ab") as f:
+            if f.tell() == 0:
+                f.write(INDEX_MAGIC)
+            elif f.tell() > self._end:
+                # Drop a run left incomplete by a writer that died mid-append
+                f.truncate(self._end)
+            f.write(INDEX_RUN_HEADER.pack(len(entries)) + b"".join(INDEX_RECORD.pack(*entry) for entry in entries))
+        self.reload()
+        if len(self._runs) > self.max_runs:
+            self.compact()
+
+    def compact(self, entries=()):
+        """Rewrite the index as one sorted run (with entries merged in) and swap it in"""
+        records = list(heapq.merge(self.records(), sorted(entries)))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(INDEX_MAGIC + INDEX_RUN_HEADER.pack(len(records)))
+            for record in records:
+                f.write(INDEX_RECORD.pack(*record))
+        os.replace(tmp_path, self.path)
+        self.reload()
+
+
+class ColumnarArchive:
+    """Finished interviews in compressed columnar segments with a memory-mapped session index
+
+    Each flush writes one segment of sessions. Session fields are columns,
+    answers are a separate turns table, and each column is compressed on
+    its own, so an aggregate only decompresses the columns it reads. The
+    index maps a session id hash to (segment, row). A lookup is a binary
+    search over the mmap'd index runs plus a read of that session's row
+    blocks; transcripts and answers are compressed per session for it.
+    """
+
+    def __init__(self, directory, max_open_segments=8):
+        self.directory = directory
+        self.max_open_segments = max_open_segments
+        os.makedirs(directory, exist_ok=True)
+        self.index = SessionIndex(os.path.join(directory, "index.bin"))
+        self._segments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"segment-{number:06d}.hrc")
+
+    def _segment_numbers(self):
+        return sorted(int(os.path.basename(p)[8:14]) for p in glob.glob(os.path.join(self.directory, "segment-*.hrc")))
+
+    def _segment(self, number):
+        with self._lock:
+            segment = self._segments.get(number)
+            if segment is None:
+                segment = self._segments[number] = Segment(self._segment_path(number))
+                while len(self._segments) > self.max_open_segments:
+                    _, evicted = self._segments.popitem(last=False)
+                    evicted.close()
+            self._segments.move_to_end(number)
+            return segment
+
+    def write(self, records):
+        """Append session records as a new segment and index them; returns the segment number"""
+        records = list(records)
+        if not records:
+            return None
+        lock_file = open(os.path.join(self.directory, ".lock"), "w")
+        try:
+            # Pre-forked workers share the directory: one writer at a time across processes
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self.index.reload()
+            numbers = self._segment_numbers()
+            number = numbers[-1] + 1 if numbers else 1
+            session_ids = write_segment(self._segment_path(number), records)
+            self.index.append((session_key(session_id), number, row) for row, session_id in enumerate(session_ids))
+        finally:
+            lock_file.close()
+        COLUMNAR_ARCHIVED_SESSIONS.inc(len(records))
+        return number
+
+    def _locate(self, session_id):
+        location = self.index.lookup(session_id)
+        if location is None:
+            # Another process may have added a segment since the index was opened
+            self.index.reload()
+            location = self.index.lookup(session_id)
+        return location
+
+    def contains(self, session_id):
+        """Whether a session was archived, from the index alone"""
+        return self._locate(session_id) is not None
+
+    def get(self, session_id):
+        """Archived record of one session, or None"""
+        start = time.perf_counter()
+        location = self._locate(session_id)
+        record = None
+        if location is not None:
+            segment = self._segment(location[0])
+            if segment.column("sessions.session_id")[location[1]] == session_id:
+                record = segment.session(location[1])
+        COLUMNAR_LOOKUP_SECONDS.observe(time.perf_counter() - start)
+        return record
+
+    def scan(self, columns):
+        """Yield {column: values} per segment for the requested "sessions.*" / "turns.*" columns"""
+        for number in self._segment_numbers():
+            segment = Segment(self._segment_path(number))
+            try:
+                yield {name: segment.column(name) for name in columns}
+            finally:
+                segment.close()
+
+    def scores_by(self, group_by="role"):
+        """Sessions, average scores, duration and answer length per role / level / interview_type / techstack"""
+        if group_by not in ("role", "level", "interview_type", "techstack"):
+            raise ValueError(f"Cannot group by {group_by}")
+        totals = defaultdict(lambda: {"sessions": 0, "technical": [0.0, 0], "communication": [0.0, 0],
+                                      "duration": [0.0, 0], "turns": 0, "answer_words": 0})
+        columns = [f"sessions.{group_by}", "sessions.technical_score", "sessions.communication_score",
+                   "sessions.duration_seconds", "sessions.turn_count", "turns.session_row", "turns.answer_words"]
+        for data in self.scan(columns):
+            words_per_row = defaultdict(int)
+            for row, words in zip(data["turns.session_row"], data["turns.answer_words"]):
+                words_per_row[row] += words
+            for row, group in enumerate(data[f"sessions.{group_by}"]):
+                for key in (_techstack(group) or ["(none)"]) if group_by == "techstack" else [group or "(none)"]:
+                    entry = totals[key]
+                    entry["sessions"] += 1
+                    entry["turns"] += data["sessions.turn_count"][row]
+                    entry["answer_words"] += words_per_row[row]
+                    for field, column in (("technical", "sessions.technical_score"),
+                                          ("communication", "sessions.communication_score"),
+                                          ("duration", "sessions.duration_seconds")):
+                        value = data[column][row]
+                        if not math.isnan(value):
+                            entry[field][0] += value
+                            entry[field][1] += 1
+
+        def average(pair, digits=1):
+            return round(pair[0] / pair[1], digits) if pair[1] else None
+
+        return {
+            group: {
+                "sessions": entry["sessions"],
+                "graded_sessions": entry["technical"][1],
+                "avg_technical_score": average(entry["technical"]),
+                "avg_communication_score": average(entry["communication"]),
+                "avg_duration_minutes": round(average(entry["duration"], 3) / 60, 2) if entry["duration"][1] else None,
+                "turns": entry["turns"],
+                "avg_answer_words": round(entry["answer_words"] / entry["turns"], 1) if entry["turns"] else None,
+            }
+            for group, entry in sorted(totals.items(), key=lambda item: -item[1]["sessions"])
+        }
+
+    def stats(self):
+        numbers = self._segment_numbers()
+        size = sum(os.path.getsize(self._segment_path(n)) for n in numbers)
+        return {"sessions": len(self.index), "segments": len(numbers), "bytes": size, "open_segments": len(self._segments)}
+
+
+class SessionEvictor:
+    """Moves completed sessions out of the live session dict into the archive, in batches
+
+    A session becomes eligible grace seconds after completion once its
+    feedback job is done, so clients can still poll for feedback. A batch is
+    written when batch_size sessions are eligible, or when the oldest has
+    waited max_wait seconds.
+    """
+
+    def __init__(self, archive, sessions, batch_size=100, grace=600, max_wait=3600, interval=60):
+        self.archive = archive
+        self.sessions = sessions
+        self.batch_size = batch_size
+        self.grace = grace
+        self.max_wait = max_wait
+        self.interval = interval
+        self._thread = None
+
+    def _eligible(self, now):
+        eligible = []
+        for session in list(self.sessions.values()):
+            if not session.is_completed or session.completed_at is None:
+                continue
+            # A turn still holding the session (e.g. the farewell being generated) keeps it live
+            if session.lock.locked():
+                continue
+            if session.feedback_future is not None and not session.feedback_future.done():
+                continue
+            age = now - session.completed_at.timestamp()
+            if age >= self.grace:
+                eligible.append((age, session))
+        return eligible
+
+    def run_once(self, force=False):
+        """Archive and evict one batch if due; returns the number of sessions moved"""
+        eligible = self._eligible(time.time())
+        if not eligible:
+            return 0
+        if not force and len(eligible) < self.batch_size and max(age for age, _ in eligible) < self.grace + self.max_wait:
+            return 0
+        batch = [session for _, session in sorted(eligible, key=lambda item: -item[0])[:self.batch_size]]
+        self.archive.write(session.to_dict() for session in batch)
+        for session in batch:
+            self.sessions.pop(session.session_id, None)
+        return len(batch)
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                while self.run_once() >= self.batch_size:
+                    pass
+            except Exception as e:
+                print(f"⚠️ Columnar archiving failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="session-evictor", daemon=True)
+            self._thread.start()
+
+
+def create_columnar_archive_from_env():
+    """Archive in COLUMNAR_ARCHIVE_DIR; off unless set, since it holds full candidate transcripts"""
+    directory = os.getenv("COLUMNAR_ARCHIVE_DIR", "")
+    return ColumnarArchive(directory) if directory else None
+
+
+def create_session_evictor_from_env(archive, sessions):
+    """Evictor tuned by COLUMNAR_BATCH_SIZE, COLUMNAR_ARCHIVE_AFTER, COLUMNAR_MAX_WAIT, COLUMNAR_ARCHIVE_INTERVAL"""
+    return SessionEvictor(
+        archive,
+        sessions,
+        batch_size=int(os.getenv("COLUMNAR_BATCH_SIZE", "100")),
+        grace=float(os.getenv("COLUMNAR_ARCHIVE_AFTER", "600")),
+        max_wait=float(os.getenv("COLUMNAR_MAX_WAIT", "3600")),
+        interval=float(os.getenv("COLUMNAR_ARCHIVE_INTERVAL", "60")),
+    )
+
+
+def main():
+    from session_store import iter_sessions
+
+    parser = argparse.ArgumentParser(description="Import, inspect and aggregate the columnar session archive")
+    parser.add_argument("--dir", default=os.getenv("COLUMNAR_ARCHIVE_DIR") or "session_segments")
+    parser.add_argument("--import-jsonl", metavar="PATH", help="convert a JSONL session archive into segments")
+    parser.add_argument("--batch-size", type=int, default=10000, help="sessions per segment when importing")
+    parser.add_argument("--group-by", default="role", choices=["role", "level", "interview_type", "techstack"])
+    parser.add_argument("--session", help="print one archived session")
+    args = parser.parse_args()
+
+    archive = ColumnarArchive(args.dir)
+    if args.import_jsonl:
+        batch, imported = [], 0
+        for record in iter_sessions(args.import_jsonl):
+            if record.get("session_id") and archive.index.lookup(record["session_id"]) is None:
+                batch.append(record)
+            if len(batch) >= args.batch_size:
+                archive.write(batch)
+                imported += len(batch)
+                batch = []
+        archive.write(batch)
+        imported += len(batch)
+        print(f"📦 Imported {imported} sessions", file=sys.stderr)
+
+    if args.session:
+        print(json.dumps(archive.get(args.session), indent=2))
+        return
+
+    start = time.perf_counter()
+    report = {"archive": archive.stats(), "group_by": args.group_by, "groups": archive.scores_by(args.group_by)}
+    report["scan_seconds"] = round(time.perf_counter() - start, 3)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
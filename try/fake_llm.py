@@ -0,0 +1,66 @@
+import json
+import os
+import random
+import time
+
+# Latency / failure profile of the fake backend, tunable per benchmark run
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "100"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+
+FAKE_QUESTIONS = [
+    "Good point. How would you handle error propagation in that design?",
+    "Thanks. Can you explain how you would index this table for the common queries?",
+    "Makes sense. What trade-offs would you consider between consistency and availability here?",
+    "Nice. How would you test this component in isolation?",
+    "Understood. How would you profile and fix a slow endpoint in production?",
+]
+
+FAKE_STRUCTURED_FEEDBACK = {
+    "technical_score": 72,
+    "communication_score": 80,
+    "key_strengths": ["fundamentals", "clarity", "pragmatism"],
+    "areas_for_improvement": ["scalability", "testing strategy", "edge cases"],
+    "final_assessment": "Solid grasp of core concepts with some gaps in system design depth. Proceed to the next round.",
+}
+
+FAKE_FEEDBACK = """1. Technical Proficiency (Score 72/100):
+- Solid grasp of core concepts with some gaps in system design depth.
+
+2. Communication & Soft Skills (Score 80/100):
+- Clear, structured explanations.
+
+3. Overall Assessment:
+- Strengths: fundamentals, clarity, pragmatism
+- Areas for Improvement: scalability, testing strategy, edge cases
+- Final Recommendation: Proceed to the next round."""
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Drop-in stand-in for genai.GenerativeModel used for offline benchmarks"""
+
+    def __init__(self, model_name, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, **kwargs):
+        delay_ms = max(0.0, random.gauss(FAKE_LLM_LATENCY_MS, FAKE_LLM_JITTER_MS))
+        time.sleep(delay_ms / 1000)
+
+        if FAKE_LLM_ERROR_RATE and random.random() < FAKE_LLM_ERROR_RATE:
+            raise RuntimeError("Fake LLM injected error")
+
+        prompt_text = prompt if isinstance(prompt, str) else str(prompt)
+        if "closing message" in prompt_text:
+            return FakeResponse("Thank you for your time today, it was great speaking with you.")
+        if "respond with ONLY a JSON object" in prompt_text:
+            return FakeResponse(json.dumps(FAKE_STRUCTURED_FEEDBACK))
+        if "comprehensive feedback" in prompt_text:
+            return FakeResponse(FAKE_FEEDBACK)
+        if prompt_text.startswith("Say 'Hello'") or prompt_text == "Test":
+            return FakeResponse("Hello")
+        return FakeResponse(random.choice(FAKE_QUESTIONS))
@@ -0,0 +1,314 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import ssl
+import subprocess
+import threading
+import time
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+# Turns spoken in every session unless a script file is given
+DEFAULT_SCRIPT = [
+    {"text": "hi my name is alex and i have three years of experience with python and react", "pause_seconds": 1.0},
+    {"text": "i would add an index on the user id column and cache the hot reads in redis", "pause_seconds": 1.0},
+]
+
+
+class FakeSttConfig:
+    """Transcript script and fault injection for the fake streaming-STT server"""
+
+    def __init__(self, script=None, words_per_second=2.5, end_of_turn_silence=0.6,
+                 handshake_latency=0.0, turn_latency=0.0, drop_rate=0.0, error_rate=0.0, api_key=None):
+        self.script = script or DEFAULT_SCRIPT
+        self.words_per_second = words_per_second
+        self.end_of_turn_silence = end_of_turn_silence
+        self.handshake_latency = handshake_latency
+        self.turn_latency = turn_latency
+        self.drop_rate = drop_rate
+        self.error_rate = error_rate
+        self.api_key = api_key
+
+
+def load_script(path):
+    """Script file: a JSON list of turns, each a string or {"text", "pause_seconds"}"""
+    with open(path) as f:
+        turns = json.load(f)
+    return [turn if isinstance(turn, dict) else {"text": turn} for turn in turns]
+
+
+def format_transcript(text):
+    """What a formatted turn looks like: capitalized and punctuated"""
+    text = text.strip()
+    if not text:
+        return text
+    text = text[0].upper() + text[1:]
+    return text if text[-1] in ".?!" else text + "."
+
+
+def _request_path(websocket):
+    request = getattr(websocket, "request", None)
+    return request.path if request is not None else websocket.path
+
+
+def _request_headers(websocket):
+    request = getattr(websocket, "request", None)
+    return request.headers if request is not None else websocket.request_headers
+
+
+class _Session:
+    """One streaming session speaking the AssemblyAI v3 protocol"""
+
+    def __init__(self, websocket, config):
+        self.websocket = websocket
+        self.config = config
+        query = parse_qs(urlparse(_request_path(websocket)).query)
+        self.sample_rate = int(query.get("sample_rate", ["16000"])[0])
+        self.format_turns = query.get("format_turns", ["false"])[0].lower() == "true"
+        self.started = time.time()
+        self.audio_bytes = 0
+        self.turn_index = 0
+        self.turn_order = 0
+        self.turn_start = 0.0
+        self.words_sent = 0
+        self.outbox = asyncio.Queue()
+
+        # Decide up front whether (and after how much audio) this session fails
+        self.drop_at = random.uniform(0.5, 3.0) if random.random() < config.drop_rate else None
+        self.error_at = random.uniform(0.5, 3.0) if random.random() < config.error_rate else None
+
+    @property
+    def audio_seconds(self):
+        return self.audio_bytes / 2 / self.sample_rate
+
+    def send(self, message):
+        """Queue a message to go out after the configured per-message latency"""
+        self.outbox.put_nowait((time.monotonic() + self.config.turn_latency, json.dumps(message)))
+
+    async def sender(self):
+        while True:
+            due, payload = await self.outbox.get()
+            if payload is None:
+                return
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.websocket.send(payload)
+
+    def turn_message(self, words, end_of_turn, formatted):
+        elapsed = self.turn_start
+        transcript = " ".join(words)
+        return {
+            "type": "Turn",
+            "turn_order": self.turn_order,
+            "turn_is_formatted": formatted,
+            "end_of_turn": end_of_turn,
+            "transcript": format_transcript(transcript) if formatted else transcript,
+            "end_of_turn_confidence": 0.9 if end_of_turn else 0.1,
+            "words": [
+                {
+                    "start": int((elapsed + i / self.config.words_per_second) * 1000),
+                    "end": int((elapsed + (i + 1) / self.config.words_per_second) * 1000),
+                    "text": word,
+                    "confidence": 0.95,
+                    "word_is_final": end_of_turn,
+                }
+                for i, word in enumerate(words)
+            ],
+        }
+
+    def end_turn(self):
+        words = self.config.script[self.turn_index]["text"].split()
+        self.send(self.turn_message(words, True, False))
+        if self.format_turns:
+            self.send(self.turn_message(words, True, True))
+        pause = self.config.script[self.turn_index].get("pause_seconds", 1.0)
+        self.turn_index += 1
+        self.turn_order += 1
+        self.words_sent = 0
+        self.turn_start = self.audio_seconds + pause
+
+    def on_audio(self):
+        """Emit partial / final turns for the words 'spoken' during the audio received so far"""
+        if self.turn_index >= len(self.config.script) or self.audio_seconds < self.turn_start:
+            return
+        words = self.config.script[self.turn_index]["text"].split()
+        spoken = self.audio_seconds - self.turn_start
+        due = min(len(words), int(spoken * self.config.words_per_second))
+        if due > self.words_sent:
+            self.words_sent = due
+            self.send(self.turn_message(words[:due], False, False))
+        if due == len(words) and spoken >= len(words) / self.config.words_per_second + self.config.end_of_turn_silence:
+            self.end_turn()
+
+    def termination(self):
+        return {
+            "type": "Termination",
+            "audio_duration_seconds": round(self.audio_seconds),
+            "session_duration_seconds": round(time.time() - self.started),
+        }
+
+    async def run(self):
+        if self.config.api_key and _request_headers(self.websocket).get("Authorization") != self.config.api_key:
+            await self.websocket.close(code=1008, reason="Invalid API key")
+            return
+
+        if self.config.handshake_latency:
+            await asyncio.sleep(self.config.handshake_latency)
+
+        sender = asyncio.ensure_future(self.sender())
+        self.send({"type": "Begin", "id": str(uuid.uuid4()), "expires_at": int(time.time()) + 3600})
+        try:
+            async for message in self.websocket:
+                if isinstance(message, bytes):
+                    self.audio_bytes += len(message)
+                    if self.drop_at is not None and self.audio_seconds >= self.drop_at:
+                        # Vanish without a close frame, like a dropped network path
+                        self.websocket.transport.abort()
+                        return
+                    if self.error_at is not None and self.audio_seconds >= self.error_at:
+                        await self.websocket.close(code=1011, reason="Injected server error")
+                        return
+                    self.on_audio()
+                    continue
+
+                data = json.loads(message)
+                if data.get("type") == "Terminate":
+                    self.send(self.termination())
+                    self.outbox.put_nowait((time.monotonic(), None))
+                    await sender
+                    await self.websocket.close()
+                    return
+                if data.get("type") == "UpdateConfiguration" and "format_turns" in data:
+                    self.format_turns = bool(data["format_turns"])
+                elif data.get("type") == "ForceEndpoint" and self.words_sent and self.turn_index < len(self.config.script):
+                    self.end_turn()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            sender.cancel()
+
+
+class FakeSttServer:
+    """Fake streaming-STT endpoint on a background event loop, for benchmarks and tests"""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0, ssl_context=None):
+        self.config = config or FakeSttConfig()
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.sessions = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    async def _handle(self, websocket, *_):
+        self.sessions += 1
+        await _Session(websocket, self.config).run()
+
+    def start(self):
+        """Start serving; returns the bound port"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                websockets.serve(self._handle, self.host, self.port, ssl=self.ssl_context))
+            self.port = next(iter(self._server.sockets)).getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-stt", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.port
+
+    @property
+    def api_host(self):
+        """Value for ASSEMBLYAI_API_HOST / StreamingClientOptions(api_host=...)"""
+        return f"{'localhost' if self.host in ('127.0.0.1', '0.0.0.0') else self.host}:{self.port}"
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+
+def make_self_signed_cert(directory):
+    """Create a localhost cert/key with openssl; returns (certfile, keyfile)"""
+    os.makedirs(directory, exist_ok=True)
+    certfile = os.path.join(directory, "fake_stt_cert.pem")
+    keyfile = os.path.join(directory, "fake_stt_key.pem")
+    if not (os.path.exists(certfile) and os.path.exists(keyfile)):
+        subprocess.run([
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "30",
+            "-keyout", keyfile, "-out", certfile, "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+        ], check=True, capture_output=True)
+    return certfile, keyfile
+
+
+def server_ssl_context(certfile, keyfile):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    return context
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the AssemblyAI v3 streaming STT endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--certfile", help="TLS certificate (the AssemblyAI SDK always connects with wss://)")
+    parser.add_argument("--keyfile", help="TLS private key")
+    parser.add_argument("--self-signed", metavar="DIR", help="generate a localhost cert/key in DIR and serve TLS")
+    parser.add_argument("--script", help="JSON list of turns to transcribe in every session")
+    parser.add_argument("--words-per-second", type=float, default=2.5)
+    parser.add_argument("--handshake-latency-ms", type=float, default=0)
+    parser.add_argument("--turn-latency-ms", type=float, default=0, help="delay on every Turn/Termination message")
+    parser.add_argument("--drop-rate", type=float, default=0, help="fraction of sessions dropped mid-stream")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of sessions closed with an error")
+    parser.add_argument("--api-key", help="reject sessions whose Authorization header differs")
+    args = parser.parse_args()
+
+    certfile, keyfile = args.certfile, args.keyfile
+    if args.self_signed:
+        certfile, keyfile = make_self_signed_cert(args.self_signed)
+
+    config = FakeSttConfig(
+        script=load_script(args.script) if args.script else None,
+        words_per_second=args.words_per_second,
+        handshake_latency=args.handshake_latency_ms / 1000,
+        turn_latency=args.turn_latency_ms / 1000,
+        drop_rate=args.drop_rate,
+        error_rate=args.error_rate,
+        api_key=args.api_key,
+    )
+    server = FakeSttServer(config, args.host, args.port,
+                           server_ssl_context(certfile, keyfile) if certfile else None)
+    server.start()
+
+    scheme = "wss" if certfile else "ws"
+    print(f"🎙️ Fake STT server on {scheme}://{args.host}:{server.port}/v3/ws")
+    if certfile:
+        print(f"   Run the app with ASSEMBLYAI_API_HOST={server.api_host} SSL_CERT_FILE={certfile}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from metrics import REGISTRY
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+IDEMPOTENT_REQUESTS = REGISTRY.counter(
+    'idempotent_requests', 'Requests carrying an idempotency key by outcome', ['route', 'result'])
+
+
+class IdempotencyStore:
+    """Single-flight results by idempotency key: the first caller computes, duplicates wait or replay"""
+
+    def __init__(self, max_entries=1000, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key, func, route=''):
+        """Return (result, replayed) for key, calling func() only if no result is stored or in flight"""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None:
+                future = Future()
+                self._entries[key] = (time.time(), future)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                owner = True
+            else:
+                future = entry[1]
+                owner = False
+
+        if not owner:
+            IDEMPOTENT_REQUESTS.inc(route=route, result='replayed' if future.done() else 'joined')
+            return future.result(), True
+
+        IDEMPOTENT_REQUESTS.inc(route=route, result='new')
+        try:
+            result = func()
+        except BaseException as e:
+            # Let a retry compute again instead of replaying the failure forever
+            self.forget(key)
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result, False
+
+    def forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        while self._entries:
+            key, (created_at, future) = next(iter(self._entries.items()))
+            if created_at >= cutoff or not future.done():
+                break
+            self._entries.popitem(last=False)
+
+
+def create_idempotency_store_from_env():
+    """Store sized by IDEMPOTENCY_MAX_ENTRIES, keeping results for IDEMPOTENCY_TTL seconds"""
+    return IdempotencyStore(
+        max_entries=int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', '1000')),
+        ttl=float(os.getenv('IDEMPOTENCY_TTL', '600')),
+    )
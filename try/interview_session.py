@@ -0,0 +1,413 @@
+import json
+import sys
+import threading
+from datetime import datetime
+
+from question_planner import QuestionPlanner
+
+# Keywords scanned in every candidate answer
+EXPERIENCE_INDICATORS = {
+    'junior': ['junior', 'entry level', 'fresh graduate', '0-2 years', 'starting my career'],
+    'mid-level': ['mid level', 'intermediate', '2-5 years', '3-5 years', 'few years of experience'],
+    'senior': ['senior', 'lead', '5+ years', 'extensive experience', 'many years']
+}
+
+TECH_SKILLS = [
+    'python', 'java', 'javascript', 'typescript', 'react', 'node', 'angular', 'vue',
+    'aws', 'azure', 'docker', 'kubernetes', 'sql', 'nosql', 'mongodb', 'redis',
+    'rest', 'graphql', 'ci/cd', 'git', 'agile', 'scrum', 'machine learning',
+    'data structures', 'algorithms', 'system design', 'microservices'
+]
+
+TOPIC_KEYWORDS = ['react', 'node', 'python', 'javascript', 'java', 'sql', 'database']
+
+# Only the first few topic hits feed the topic summary
+TOPIC_SUMMARY_SIZE = 3
+
+END_PHRASES = [
+    "end interview",
+    "stop interview",
+    "finish interview",
+    "conclude interview",
+    "that's all",
+    "i'm done",
+    "let's end",
+    "let's stop",
+    "can we stop",
+    "can we end",
+    "wrap up",
+    "finish up",
+    "no more",
+    "thank you that's it",
+    "we can stop here",
+    "end the session"
+]
+
+FAREWELL_PROMPT = "The candidate has decided to end the interview. Please provide a brief polite closing message thanking them for their time. Keep it to one sentence. Do NOT repeat any previous conversation."
+
+
+def scan_topics(content):
+    """Extract key topics/technologies mentioned in one candidate message (simple approach)"""
+    topics = []
+    content_lower = content.lower()
+    if any(word in content_lower for word in TOPIC_KEYWORDS):
+        topics.append("technical experience")
+    if 'experience' in content_lower or 'worked' in content_lower:
+        topics.append("work experience")
+    return topics
+
+
+class InterviewSession:
+    def __init__(self, session_id, interview_data=None):
+        self.session_id = session_id
+        self.conversation_history = []
+        self.question_count = 0
+        self.start_time = datetime.now()
+        self.is_completed = False
+        self.completed_at = None
+        
+        # Store interview metadata from form
+        self.interview_data = interview_data or {}
+        self.role = self.interview_data.get('role', 'Software Engineer')
+        self.level = self.interview_data.get('level', 'intermediate')
+        self.techstack = self.interview_data.get('techstack', [])
+        self.interview_type = self.interview_data.get('type', 'Technical')
+        self.questions = self.interview_data.get('questions', [])
+        
+        self.candidate_info = {
+            'applied_role': self.role,  # Pre-fill with form data
+            'introduction': '',
+            'skills_mentioned': list(self.techstack) if isinstance(self.techstack, list) else [],
+            'experience_level': self.level,
+            'communication_score': 0,
+            'technical_score': 0,
+            'key_strengths': [],
+            'areas_for_improvement': []
+        }
+        self.all_questions_answers = []  # Store all Q&A for feedback
+        self.topic_coverage = {
+            'algorithms': 0,
+            'data_structures': 0,
+            'system_design': 0,
+            'coding': 0,
+            'problem_solving': 0,
+            'technical_concepts': 0
+        }
+        
+        # Per-turn state kept incrementally so a turn never rescans the whole history
+        self.user_message_count = 0
+        self.last_user_message = None
+        self.topic_mentions = []
+        
+        # Future for the first technical question, generated while the candidate introduces themselves
+        self.prefetched_first_question = None
+        
+        # Overall feedback job (future) and its result once generated
+        self.feedback_future = None
+        self.feedback = None
+        # Scores / strengths / assessment when feedback was generated as structured JSON
+        self.structured_feedback = None
+        
+        # Held for a whole turn so concurrent requests cannot interleave the conversation
+        self.lock = threading.Lock()
+        
+        # Which prepared questions have been asked; each turn's prompt carries only the next one
+        self.planner = QuestionPlanner(self.questions) if self.questions else None
+        
+        # Generate system prompt with interview data
+        system_prompt = self._generate_system_prompt()
+        self.add_message("system", system_prompt)
+    
+    def _generate_system_prompt(self):
+        """Generate system prompt based on interview metadata"""
+        techstack_str = ", ".join(self.techstack) if isinstance(self.techstack, list) else str(self.techstack)
+        
+        # Build questions context - CRITICAL for question scope
+        questions_context = ""
+        if self.questions and len(self.questions) > 0:
+            questions_list = "\n".join([f"{i+1}. {q}" for i, q in enumerate(self.questions)])
+            questions_context = f"""
+
+═══════════════════════════════════════════════════════════════
+PREPARED QUESTIONS FOR THIS INTERVIEW (MANDATORY SCOPE):
+═══════════════════════════════════════════════════════════════
+You have {len(self.questions)} prepared questions. You MUST ask questions ONLY from this list or variations/clarifications based on these questions.
+
+{questions_list}
+
+CRITICAL: All your questions MUST be directly related to these {len(self.questions)} prepared questions. You can:
+- Ask these questions in natural conversation flow
+- Adapt them based on candidate's previous answers
+- Ask follow-up questions related to these topics
+- BUT NEVER ask questions outside this scope or unrelated topics
+═══════════════════════════════════════════════════════════════
+"""
+        else:
+            questions_context = f"""
+
+═══════════════════════════════════════════════════════════════
+QUESTION SCOPE - NO PREPARED QUESTIONS PROVIDED
+═══════════════════════════════════════════════════════════════
+Since no specific questions were provided, you must generate questions STRICTLY based on:
+- Position: {self.role}
+- Level: {self.level}
+- Technologies: {techstack_str}
+- Type: {self.interview_type}
+
+ALL questions MUST be relevant to these specific criteria above.
+═══════════════════════════════════════════════════════════════
+"""
+        
+        return f"""
+You are an expert technical interviewer conducting an interview for a {self.role} position at {self.level} level. 
+
+═══════════════════════════════════════════════════════════════
+INTERVIEW CARD DETAILS (MANDATORY SCOPE - DO NOT DEVIATE):
+═══════════════════════════════════════════════════════════════
+- Position/Role: {self.role}
+- Experience Level: {self.level}
+- Required Technologies: {techstack_str}
+- Interview Type: {self.interview_type}
+{questions_context}
+
+CRITICAL QUESTION SCOPE RULES:
+1. ALL questions MUST be based ONLY on the interview card details above
+2. Questions MUST relate to: {self.role} position, {self.level} level concepts, {techstack_str} technologies
+3. Interview type focus: {self.interview_type} questions
+4. DO NOT ask questions outside this scope
+5. DO NOT ask about unrelated technologies, roles, or topics
+6. Every question must align with at least one of: role, level, technology, or prepared questions
+═══════════════════════════════════════════════════════════════
+
+INTERVIEW FLOW GUIDELINES:
+1. START with asking the candidate to introduce themselves (name, background, experience)
+2. DO NOT ask about the role, level, or technologies - these are already known from the form
+3. After introduction, proceed directly to ask questions STRICTLY from the interview card scope above
+4. There is NO fixed number of questions - continue until the candidate asks to stop
+5. Each question should build upon the previous responses - make it conversational and contextual
+6. Ask one question at a time and wait for their response
+7. Provide brief, constructive feedback after each answer (1-2 sentences only)
+8. Questions should be {self.level} level and CONCISE
+9. Make the interview flow naturally like a real conversation
+10. When the candidate says they want to stop or end the interview, provide brief overall feedback
+11. KEEP QUESTIONS AND FEEDBACK BRIEF AND TO THE POINT - maximum 2 sentences each
+12. Avoid long explanations and detailed examples
+
+ANTI-REPETITION RULES (CRITICAL):
+- NEVER repeat or echo back the candidate's response
+- NEVER repeat your previous question
+- NEVER summarize what they said unless absolutely necessary for context
+- Simply acknowledge briefly (1 sentence) and move to the next question
+- Your responses should ONLY contain: brief feedback + new question (2-3 sentences total)
+- Do NOT say things like "You mentioned..." or "Based on your answer about..." - just respond naturally
+
+Remember: The candidate has already scheduled this interview with these specific requirements. 
+ALL questions must be within the scope of: {self.role} role, {self.level} level, {techstack_str} technologies, and {self.interview_type} focus.
+DO NOT deviate from this scope.
+"""
+        
+    def add_message(self, role, content, offered=False):
+        """offered: an assistant message the model generated with the planner's next target in its prompt"""
+        self.conversation_history.append({
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        if role == "assistant" and self.planner is not None and self.user_message_count:
+            self.planner.mark_asked(content, offered=offered)
+        
+        if role == "user":
+            self.user_message_count += 1
+            self.last_user_message = content
+            if content and len(self.topic_mentions) < TOPIC_SUMMARY_SIZE:
+                self.topic_mentions.extend(scan_topics(content))
+                del self.topic_mentions[TOPIC_SUMMARY_SIZE:]
+    
+    def estimated_size_bytes(self):
+        """Rough memory held by this session's transcript and Q&A records"""
+        total = sys.getsizeof(self.conversation_history) + sys.getsizeof(self.all_questions_answers)
+        for msg in self.conversation_history:
+            total += sys.getsizeof(msg) + sys.getsizeof(msg['content']) + sys.getsizeof(msg['timestamp'])
+        for qa in self.all_questions_answers:
+            total += sys.getsizeof(qa) + sys.getsizeof(qa['question']) + sys.getsizeof(qa['answer'])
+        return total
+
+    def topic_summary(self):
+        """Key topics mentioned so far (without full text)"""
+        return ", ".join(set(self.topic_mentions)) if self.topic_mentions else "general background"
+    
+    def extract_candidate_info(self, response):
+        """Extract candidate information from their responses"""
+        response_lower = response.lower()
+        
+        # Extract role information
+        if "applied for" in response_lower or "role" in response_lower:
+            self.candidate_info['applied_role'] = response
+        
+        # Extract introduction and experience
+        if "introduction" in response_lower or "name" in response_lower or "experience" in response_lower:
+            self.candidate_info['introduction'] = response
+            
+            # Extract experience level
+            for level, indicators in EXPERIENCE_INDICATORS.items():
+                if any(indicator in response_lower for indicator in indicators):
+                    self.candidate_info['experience_level'] = level
+                    break
+        
+        # Extract technical skills
+        found_skills = [skill for skill in TECH_SKILLS if skill in response_lower]
+        if found_skills:
+            self.candidate_info['skills_mentioned'].extend(found_skills)
+            self.candidate_info['skills_mentioned'] = list(set(self.candidate_info['skills_mentioned']))
+    
+    def add_qa_pair(self, question, answer):
+        """Store question-answer pair for feedback"""
+        self.all_questions_answers.append({
+            'question': question,
+            'answer': answer,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    def to_dict(self):
+        """Plain record of the interview for the session archive (no futures or locks)"""
+        return {
+            'session_id': self.session_id,
+            'interview_data': self.interview_data,
+            'start_time': self.start_time.isoformat(),
+            'is_completed': self.is_completed,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'question_count': self.question_count,
+            'conversation_history': self.conversation_history,
+            'all_questions_answers': self.all_questions_answers,
+            'candidate_info': self.candidate_info,
+            'topic_coverage': self.topic_coverage,
+            'feedback': self.feedback,
+            'structured_feedback': self.structured_feedback,
+            'prepared_questions': self.planner.stats() if self.planner is not None else None,
+        }
+
+
+def should_end_interview(user_input):
+    """Check if user wants to end the interview"""
+    user_input_lower = user_input.lower()
+    return any(phrase in user_input_lower for phrase in END_PHRASES)
+
+
+def build_feedback_prompt(candidate_info, qa_pairs):
+    """Build the overall feedback prompt from candidate info and Q&A pairs"""
+    # Prepare conversation summary for feedback
+    qa_summary = "\n".join([f"Q: {qa['question']}\nA: {qa['answer']}\n" for qa in qa_pairs])
+    
+    return f"""
+As an expert technical interviewer, analyze the following interview and provide comprehensive feedback. Be objective and balanced in your assessment.
+
+Candidate Information:
+{json.dumps(candidate_info, indent=2)}
+
+Interview Conversation Summary:
+{qa_summary}
+
+Please provide structured feedback in the following format:
+
+1. Technical Proficiency (Score /100):
+- Knowledge of core concepts
+- Problem-solving capability
+- Code/system design understanding
+
+2. Communication & Soft Skills (Score /100):
+- Clarity of explanations
+- Question understanding
+- Professional interaction
+
+3. Overall Assessment:
+- Top 3 Strengths
+- Top 3 Areas for Improvement
+- Final Recommendation
+
+Remember:
+- Be specific with examples from their answers
+- Balance constructive criticism with positive feedback
+- Focus on actionable improvements
+- Keep the feedback professional and objective
+- Overall length should not exceed 200 words
+
+Format the response as a clear, well-structured assessment that would be valuable for both the candidate and hiring team.
+"""
+
+
+def build_turn_prompt(interview_session, last_user_msg, user_response_count):
+    """Build the next-question prompt with role context and question scope"""
+    role_context = ""
+    question_scope = ""
+    
+    if interview_session:
+        techstack_str = ", ".join(interview_session.techstack) if isinstance(interview_session.techstack, list) else str(interview_session.techstack)
+        role_context = f"\n\nINTERVIEW CARD SCOPE (MANDATORY):\n- Role: {interview_session.role}\n- Level: {interview_session.level}\n- Technologies: {techstack_str}\n- Type: {interview_session.interview_type}"
+        
+        # Add question scope reminder: only the planner's next prepared question, never the whole list
+        if interview_session.planner is not None:
+            planner = interview_session.planner
+            target = planner.next_target()
+            if target is not None:
+                index, question = target
+                question_scope = f"\n\nNEXT QUESTION (prepared question {index + 1} of {len(planner.questions)}): \"{question}\"\nAsk this question next. You may rephrase it naturally, but do not switch to a different question.\n\nDO NOT ask questions outside this scope!"
+            else:
+                question_scope = f"\n\nQUESTION SCOPE: All {len(planner.questions)} prepared questions have been covered. Your next question MUST be:\n- A follow-up/clarification on the topics already asked, OR\n- Related to {interview_session.role} role, {interview_session.level} level, and {techstack_str} technologies\n\nDO NOT ask questions outside this scope!"
+        else:
+            question_scope = f"\n\nQUESTION SCOPE: Your next question MUST be related to:\n- {interview_session.role} position\n- {interview_session.level} level concepts\n- {techstack_str} technologies\n- {interview_session.interview_type} interview focus\n\nDO NOT ask questions outside this scope!"
+    
+    # Build prompt that provides context but prevents repetition
+    if last_user_msg:
+        # Check if this is the first response after introduction/confirmation
+        is_after_confirmation = user_response_count == 1
+        
+        if is_after_confirmation:
+            # This is after introduction and confirmation - acknowledge and start technical questions
+            prompt = f"""You are conducting a technical interview. The candidate has just introduced themselves and confirmed the interview details (role, level, tech stack, number of questions).
+
+{role_context}{question_scope}
+
+IMPORTANT: They have confirmed the interview details. Now start asking TECHNICAL questions based on the interview card scope above.
+
+Your response should:
+1. Briefly acknowledge their introduction and confirmation (1 sentence)
+2. Ask your FIRST technical question based on the interview card scope
+3. Maximum 2-3 sentences total
+4. Question MUST be within the scope: {interview_session.role if interview_session else 'role'}, {interview_session.level if interview_session else 'level'}, and technologies listed above
+
+Start with your first technical question now:"""
+        else:
+            # Regular follow-up question
+            prompt = f"""You are conducting a technical interview. The candidate just responded to your question.
+
+{role_context}{question_scope}
+
+CRITICAL ANTI-REPETITION RULES:
+1. NEVER repeat what the candidate just said - assume you already know their answer
+2. NEVER echo back phrases like "you mentioned..." or "based on your answer..."
+3. NEVER repeat your previous question
+4. Simply acknowledge briefly (1 short sentence) and ask the NEXT new question
+5. Maximum 2-3 sentences total: brief acknowledgment + new question
+6. Keep it natural and forward-moving
+7. REMEMBER: Next question MUST be within the interview card scope above
+
+GOOD example: "Good point. What's your approach to testing this?"
+BAD example: "Based on your answer about React hooks, you mentioned useState. Tell me about React hooks..." (DON'T DO THIS)
+
+Now respond with brief acknowledgment and next question (must be within scope):"""
+    else:
+        # This shouldn't happen, but fallback
+        prompt = f"""You are conducting a technical interview. The candidate has just introduced themselves.
+
+{role_context}{question_scope}
+
+Ask your first technical question. The question MUST be:
+- Within the interview card scope listed above
+- Related to {interview_session.role if interview_session else 'the position'} role
+- Appropriate for {interview_session.level if interview_session else 'the'} level
+- Keep it to 1-2 sentences
+- Do NOT repeat what they said in their introduction
+- Do NOT ask questions outside the scope"""
+    
+    return prompt
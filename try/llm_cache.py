@@ -0,0 +1,138 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import REGISTRY
+
+LLM_CACHE_REQUESTS = REGISTRY.counter(
+    'llm_cache_requests', 'LLM response cache lookups per call site', ['call_site', 'result'])
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so formatting-only differences share an entry"""
+    return _WHITESPACE.sub(" ", str(prompt)).strip()
+
+
+def config_key(generation_config):
+    if generation_config is None:
+        return ""
+    if isinstance(generation_config, dict):
+        return json.dumps(generation_config, sort_keys=True, default=str)
+    return repr(generation_config)
+
+
+class _Entry:
+    def __init__(self, expires_at):
+        self.variants = []
+        self.expires_at = expires_at
+
+
+class LLMResponseCache:
+    """TTL + size bounded cache of LLM texts for constant prompts, with optional variant pools"""
+
+    def __init__(self, max_entries=256, default_ttl=3600):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _key(self, model_name, prompt, generation_config):
+        return (model_name, normalize_prompt(prompt), config_key(generation_config))
+
+    def _count(self, call_site, result):
+        LLM_CACHE_REQUESTS.inc(call_site=call_site, result=result)
+        with self._lock:
+            stats = self._stats.setdefault(call_site, {'hits': 0, 'misses': 0})
+            stats['hits' if result == 'hit' else 'misses'] += 1
+
+    def lookup(self, key, variants=1):
+        """Cached text for key, or None if missing/expired/variant pool not yet full"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            if len(entry.variants) < variants:
+                return None
+            return random.choice(entry.variants)
+
+    def store(self, key, text, ttl=None, variants=1):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.time():
+                entry = self._entries[key] = _Entry(time.time() + ttl)
+            entry.variants.append(text)
+            del entry.variants[:-variants]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def generate_text(self, call_site, model, prompt, generation_config=None, ttl=None, variants=1):
+        """Return cached text for (model, prompt, config) or call the model and cache the result"""
+        key = self._key(model.model_name, prompt, generation_config)
+        cached = self.lookup(key, variants) if self.enabled else None
+        if cached is not None:
+            self._count(call_site, 'hit')
+            return cached
+
+        self._count(call_site, 'miss')
+        if generation_config is None:
+            response = model.generate_content(prompt)
+        else:
+            response = model.generate_content(prompt, generation_config=generation_config)
+
+        text = response.text.strip() if response and response.text else ""
+        if text and self.enabled:
+            self.store(key, text, ttl=ttl, variants=variants)
+        return text
+
+    def prefill(self, call_site, model, prompt, variants, generation_config=None, ttl=None):
+        """Pre-generate a pool of variants for a constant prompt (run in a background thread)"""
+        if not self.enabled:
+            return
+        key = self._key(model.model_name, prompt, generation_config)
+        for _ in range(variants * 2):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and len(entry.variants) >= variants:
+                    break
+            try:
+                response = model.generate_content(prompt)
+                if response and response.text:
+                    self.store(key, response.text.strip(), ttl=ttl, variants=variants)
+            except Exception as e:
+                print(f"⚠️ Could not pre-generate '{call_site}' variant: {e}")
+                break
+
+    def stats(self):
+        """Per call-site hit rates"""
+        with self._lock:
+            sites = {site: dict(s) for site, s in self._stats.items()}
+            entries = len(self._entries)
+        for s in sites.values():
+            total = s['hits'] + s['misses']
+            s['hit_rate'] = round(s['hits'] / total, 4) if total else 0.0
+        return {'entries': entries, 'max_entries': self.max_entries, 'call_sites': sites}
+
+
+def create_llm_cache_from_env(enabled=True):
+    """Cache sized by LLM_CACHE_MAX_ENTRIES (0 disables it) / LLM_CACHE_TTL"""
+    return LLMResponseCache(
+        max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '256')) if enabled else 0,
+        default_ttl=float(os.getenv('LLM_CACHE_TTL', '3600')),
+    )
@@ -0,0 +1,103 @@
+import inspect
+import os
+import time
+
+import google.generativeai as genai
+
+from fake_llm import FakeGenerativeModel
+from metrics import REGISTRY
+from tracing import TRACER
+from llm_scheduler import create_llm_scheduler_from_env
+from cancellation import current_token
+from cassettes import CASSETTE_PLAYER, CASSETTE_RECORDER, prompt_key
+
+# LLM backend: "gemini" (default), "fake" for offline benchmarks/load tests,
+# or "cassette" to answer from recorded traffic (CASSETTE_MODE=replay)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'gemini')
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    'llm_request_duration_seconds', 'LLM generate_content latency', ['model'])
+LLM_REQUESTS_TOTAL = REGISTRY.counter(
+    'llm_requests', 'LLM generate_content calls by outcome', ['model', 'status'])
+
+# Admission control shared by every LLM call in this process
+LLM_SCHEDULER = create_llm_scheduler_from_env()
+
+
+class InstrumentedLLMModel:
+    """Wraps a generative model, admits calls through the scheduler and records latency/outcome"""
+
+    def __init__(self, model, model_name, priority='interactive'):
+        self._model = model
+        self.model_name = model_name
+        self.priority = priority
+
+    def generate_content(self, *args, **kwargs):
+        # The SDK call itself can't be interrupted: a cancelled turn stops queueing for a slot,
+        # and a response that arrives after cancellation is dropped
+        cancel_token = current_token()
+        with TRACER.span('llm.generate_content', model=self.model_name, priority=self.priority):
+            with LLM_SCHEDULER.slot(self.priority, cancel_token=cancel_token):
+                if cancel_token is not None:
+                    cancel_token.check('llm')
+                start = time.perf_counter()
+                status = 'ok'
+                try:
+                    response = self._model.generate_content(*args, **kwargs)
+                except Exception:
+                    status = 'error'
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    LLM_REQUEST_SECONDS.observe(elapsed, model=self.model_name)
+                    LLM_REQUESTS_TOTAL.inc(model=self.model_name, status=status)
+            if CASSETTE_RECORDER is not None:
+                CASSETTE_RECORDER.record(
+                    'llm',
+                    model=self.model_name,
+                    prompt_key=prompt_key(args[0] if args else kwargs.get('contents'), kwargs.get('generation_config')),
+                    text=_response_text(response),
+                    seconds=round(elapsed, 3),
+                )
+            if cancel_token is not None:
+                cancel_token.check('llm')
+            return response
+
+
+def _response_text(response):
+    try:
+        return response.text if response else ""
+    except ValueError:
+        # Blocked or empty candidates raise on .text
+        return ""
+
+
+def configure_llm_backend(api_key):
+    """Configure the selected backend; the fake backend needs no credentials"""
+    if LLM_BACKEND == 'gemini':
+        if not api_key:
+            raise ValueError("Please set GEMINI_API_KEY in your .env file")
+        genai.configure(api_key=api_key)
+
+
+def supports_response_schema():
+    """Whether generate_content accepts response_mime_type / response_schema (newer google-generativeai only)"""
+    if LLM_BACKEND == 'fake':
+        return True
+    try:
+        return 'response_schema' in inspect.signature(genai.types.GenerationConfig).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+def create_llm_model(model_name, priority='interactive'):
+    """Create a generative model client for the configured LLM backend"""
+    if LLM_BACKEND == 'fake':
+        model = FakeGenerativeModel(model_name)
+    elif LLM_BACKEND == 'cassette':
+        if CASSETTE_PLAYER is None:
+            raise ValueError("LLM_BACKEND=cassette needs CASSETTE_MODE=replay")
+        model = CASSETTE_PLAYER.model(model_name)
+    else:
+        model = genai.GenerativeModel(model_name)
+    return InstrumentedLLMModel(model, model_name, priority)
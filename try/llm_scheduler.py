@@ -0,0 +1,217 @@
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import REGISTRY
+
+# Lower value is served first: next-question calls beat speculative work, which beats feedback jobs
+PRIORITIES = {
+    'interactive': 0,
+    'background': 1,
+    'batch': 2,
+}
+
+LLM_QUEUE_DEPTH = REGISTRY.gauge(
+    'llm_scheduler_queue_depth', 'LLM calls waiting for a slot', ['priority'])
+LLM_ACTIVE_CALLS = REGISTRY.gauge(
+    'llm_scheduler_active_calls', 'LLM calls currently holding a slot')
+LLM_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    'llm_scheduler_wait_seconds', 'Time LLM calls spent waiting for a slot', ['priority'])
+LLM_QUEUE_TIMEOUTS = REGISTRY.counter(
+    'llm_scheduler_timeouts', 'LLM calls rejected after waiting too long for a slot', ['priority'])
+LLM_ADMISSION_REJECTIONS = REGISTRY.counter(
+    'llm_scheduler_admission_rejections', 'LLM calls refused because their client already had too many queued', ['priority'])
+
+
+class LLMQueueTimeout(Exception):
+    """Raised when an LLM call could not get a slot within its timeout"""
+
+
+class LLMClientOverloaded(LLMQueueTimeout):
+    """Raised at admission when one client already has too many calls queued"""
+
+
+# Who an LLM call is made for (session id, else client address); set per request, inherited by background work
+_current_client = contextvars.ContextVar('llm_client', default=None)
+
+
+def set_client(client):
+    """Attribute LLM calls in this context to client; returns the contextvar token for reset_client()"""
+    return _current_client.set(client)
+
+
+def reset_client(context_token):
+    try:
+        _current_client.reset(context_token)
+    except ValueError:
+        _current_client.set(None)
+
+
+class _Waiter:
+    __slots__ = ('priority', 'level', 'client', 'sequence', 'enqueued')
+
+    def __init__(self, priority, client, sequence, enqueued):
+        self.priority = priority
+        self.level = PRIORITIES[priority]
+        self.client = client
+        self.sequence = sequence
+        self.enqueued = enqueued
+
+
+class TokenBucket:
+    """Rate limiter allowing `rate` calls per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def try_take(self):
+        """Take a token if available; otherwise return seconds until one will be"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class LLMScheduler:
+    """Global concurrency cap + token bucket, with per-client fairness and aging across priorities
+
+    The next slot goes to the waiter with the best (effective priority,
+    client last served, arrival). A call's effective priority improves one
+    level per aging_seconds waited, so background and batch calls cannot be
+    starved by sustained interactive load. Within a level, the client served
+    longest ago goes first, which round-robins between sessions. A client
+    with max_waiting_per_client calls already queued is refused at admission.
+    """
+
+    def __init__(self, max_concurrent=8, rate_per_second=0, burst=None, default_timeout=60,
+                 aging_seconds=10, max_waiting_per_client=8, max_clients=10000):
+        self.max_concurrent = max_concurrent
+        self.default_timeout = default_timeout
+        self.aging_seconds = aging_seconds
+        self.max_waiting_per_client = max_waiting_per_client
+        self.max_clients = max_clients
+        self._bucket = TokenBucket(rate_per_second, burst) if rate_per_second > 0 else None
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        # client -> sequence number of its last granted slot, least recently served first
+        self._served = OrderedDict()
+        self._grants = itertools.count(1)
+        self._active = 0
+
+    def _rank(self, waiter, now):
+        level = waiter.level
+        if self.aging_seconds > 0:
+            level = max(0, level - int((now - waiter.enqueued) / self.aging_seconds))
+        return level, self._served.get(waiter.client, 0), waiter.sequence
+
+    def _head(self):
+        now = time.monotonic()
+        return min(self._waiting, key=lambda waiter: self._rank(waiter, now))
+
+    @contextmanager
+    def slot(self, priority='interactive', timeout=None, cancel_token=None, client=None):
+        """Hold one LLM call slot for the duration of the block; a cancelled token gives up the wait"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority '{priority}'. Expected one of {list(PRIORITIES)}")
+
+        timeout = self.default_timeout if timeout is None else timeout
+        client = client if client is not None else _current_client.get()
+        start = time.monotonic()
+        waiter = _Waiter(priority, client, next(self._sequence), start)
+        deadline = start + timeout
+
+        def wake():
+            with self._cond:
+                self._cond.notify_all()
+
+        with self._cond:
+            if client is not None and sum(1 for w in self._waiting if w.client == client) >= self.max_waiting_per_client:
+                LLM_ADMISSION_REJECTIONS.inc(priority=priority)
+                raise LLMClientOverloaded(f"Client already has {self.max_waiting_per_client} LLM calls queued ({priority})")
+            self._waiting.append(waiter)
+            LLM_QUEUE_DEPTH.inc(priority=priority)
+
+        if cancel_token is not None:
+            cancel_token.add_callback(wake)
+
+        with self._cond:
+            try:
+                while True:
+                    if cancel_token is not None:
+                        cancel_token.check('llm_queue')
+                    wait = None
+                    if self._active < self.max_concurrent and self._head() is waiter:
+                        granted, wait = self._bucket.try_take() if self._bucket else (True, 0.0)
+                        if granted:
+                            break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        LLM_QUEUE_TIMEOUTS.inc(priority=priority)
+                        raise LLMQueueTimeout(f"No LLM slot available within {timeout}s ({priority})")
+                    # Wake up at least once per aging step so rankings that change with time are seen
+                    timeouts = [t for t in (remaining, wait, self.aging_seconds or None) if t]
+                    self._cond.wait(min(timeouts))
+
+                self._active += 1
+                self._served[client] = next(self._grants)
+                self._served.move_to_end(client)
+                while len(self._served) > self.max_clients:
+                    self._served.popitem(last=False)
+            finally:
+                self._waiting.remove(waiter)
+                LLM_QUEUE_DEPTH.dec(priority=priority)
+                # The next head of the queue may be able to proceed now
+                self._cond.notify_all()
+                if cancel_token is not None:
+                    cancel_token.remove_callback(wake)
+
+        LLM_ACTIVE_CALLS.inc()
+        LLM_QUEUE_WAIT_SECONDS.observe(time.monotonic() - start, priority=priority)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+            LLM_ACTIVE_CALLS.dec()
+
+    def stats(self):
+        with self._cond:
+            waiting = {name: 0 for name in PRIORITIES}
+            for waiter in self._waiting:
+                waiting[waiter.priority] += 1
+            return {
+                'active': self._active,
+                'max_concurrent': self.max_concurrent,
+                'waiting': waiting,
+                'waiting_clients': len({waiter.client for waiter in self._waiting}),
+                'aging_seconds': self.aging_seconds,
+                'max_waiting_per_client': self.max_waiting_per_client,
+                'rate_per_second': self._bucket.rate if self._bucket else None,
+            }
+
+
+def create_llm_scheduler_from_env():
+    """Scheduler configured by LLM_MAX_CONCURRENCY, LLM_RATE_PER_SECOND, LLM_BURST, LLM_QUEUE_TIMEOUT,
+    LLM_PRIORITY_AGING_SECONDS and LLM_MAX_WAITING_PER_CLIENT"""
+    burst = os.getenv('LLM_BURST')
+    return LLMScheduler(
+        max_concurrent=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+        rate_per_second=float(os.getenv('LLM_RATE_PER_SECOND', '0')),
+        burst=float(burst) if burst else None,
+        default_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT', '60')),
+        aging_seconds=float(os.getenv('LLM_PRIORITY_AGING_SECONDS', '10')),
+        max_waiting_per_client=int(os.getenv('LLM_MAX_WAITING_PER_CLIENT', '8')),
+    )
@@ -0,0 +1,193 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets (seconds) covering fast routes up to slow LLM feedback calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labelvalues, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, labelvalues, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            return [("_total", key, None, value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Compute the (unlabelled) value lazily on every scrape"""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            try:
+                return [("", (), None, self._function())]
+            except Exception:
+                return []
+        with self._lock:
+            return [("", key, None, value) for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution with sum and count"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the wrapped block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        """(count, sum) for one label set"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return (state["count"], state["sum"]) if state else (0, 0.0)
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state["counts"]):
+                    cumulative += count
+                    samples.append(("_bucket", key, ("le", _format_value(float(bound))), cumulative))
+                samples.append(("_sum", key, None, state["sum"]))
+                samples.append(("_count", key, None, state["count"]))
+        return samples
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered in Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Process-wide registry used by the server
+REGISTRY = MetricsRegistry()
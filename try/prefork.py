@@ -0,0 +1,339 @@
+import gc
+import hashlib
+import os
+import re
+import selectors
+import signal
+import socket
+import time
+import uuid
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+# Fields of /proc/<pid>/smaps_rollup worth reporting, in kB
+_SMAPS_FIELDS = {
+    'Rss': 'rss_bytes',
+    'Pss': 'pss_bytes',
+    'Shared_Clean': 'shared_clean_bytes',
+    'Shared_Dirty': 'shared_dirty_bytes',
+    'Private_Clean': 'private_clean_bytes',
+    'Private_Dirty': 'private_dirty_bytes',
+    'Swap': 'swap_bytes',
+}
+
+# Set in workers so they can find their siblings; None when not running pre-forked
+MASTER_PID = None
+# This worker's index and the worker count, so ids it hands out route back to it
+WORKER_INDEX = None
+NUM_WORKERS = 1
+
+# Requests are routed by the session id (or capture handle) in their path, query or JSON body
+_AFFINITY_PATH = re.compile(rb"^[A-Z]+ /(?:api/(?:end-interview|feedback|interview-status)|stt/(?:result|events))/([A-Za-z0-9_-]+)")
+_AFFINITY_QUERY = re.compile(rb"[?&]session_id=([A-Za-z0-9_-]+)")
+_AFFINITY_BODY = re.compile(rb'"session_id"\s*:\s*"([A-Za-z0-9_-]+)"')
+# Without a session id, turn ids and idempotency keys in the body (e.g. POST /api/cancel) route like their headers
+_AFFINITY_BODY_FALLBACK = re.compile(rb'"(?:turn_id|request_id)"\s*:\s*"([A-Za-z0-9_-]+)"')
+# Bytes of a request the master looks at, and how long it waits for them, before routing it.
+# Waiting is per connection (the master never blocks on one), so only a slow client's own request is delayed
+MAX_PEEK_BYTES = 65536
+PEEK_TIMEOUT = 5.0
+
+
+def memory_usage(pid='self'):
+    """RSS/PSS and shared vs private pages of a process (Linux /proc); empty dict if unavailable"""
+    usage = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                field = parts[0].rstrip(':')
+                if field in _SMAPS_FIELDS:
+                    usage[_SMAPS_FIELDS[field]] = int(parts[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        # Older kernels: RSS only
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                usage['rss_bytes'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            pass
+    return usage
+
+
+def affinity_worker(key, num_workers):
+    """Worker that owns a session id or other routing key"""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % num_workers
+
+
+def new_id(hex=False):
+    """A uuid4 id (str or .hex) that routes back to this worker; a plain one when not pre-forked"""
+    while True:
+        value = uuid.uuid4()
+        key = value.hex if hex else str(value)
+        if WORKER_INDEX is None or affinity_worker(key, NUM_WORKERS) == WORKER_INDEX:
+            return key
+
+
+def affinity_key(data, headers=()):
+    """Key to route a buffered request by, or None when any worker can serve it
+
+    Session ids and capture handles come first; otherwise the first of the
+    given headers present (idempotency key, turn id) keeps retries together,
+    then a turn_id or request_id in the JSON body.
+    """
+    head, _, body = data.partition(b"\r\n\r\n")
+    request_line = head.split(b"\r\n", 1)[0]
+    match = _AFFINITY_PATH.match(request_line) or _AFFINITY_QUERY.search(request_line) or _AFFINITY_BODY.search(body)
+    if match:
+        return match.group(1).decode('ascii')
+    fields = {}
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        fields[name.strip().lower().decode('latin-1')] = value.strip().decode('latin-1')
+    for header in headers:
+        if fields.get(header.lower()):
+            return fields[header.lower()]
+    match = _AFFINITY_BODY_FALLBACK.search(body)
+    return match.group(1).decode('ascii') if match else None
+
+
+def _request_buffered(data):
+    """Whether the headers and Content-Length body of a request have all arrived"""
+    head, separator, body = data.partition(b"\r\n\r\n")
+    if not separator:
+        return len(data) >= MAX_PEEK_BYTES
+    match = re.search(rb"(?im)^content-length:\s*(\d+)", head)
+    length = int(match.group(1)) if match else 0
+    return len(body) >= length or len(data) >= MAX_PEEK_BYTES
+
+
+class _OneRequestHandler(WSGIRequestHandler):
+    # A connection is routed once: keep-alive would let its next request bypass affinity.
+    # Streamed responses (SSE, chunked audio) still work: without a length they end at close
+    protocol_version = "HTTP/1.0"
+
+
+def worker_pids():
+    """Pids of all workers forked by our master, or just this process when not pre-forked"""
+    if MASTER_PID is None:
+        return [os.getpid()]
+    try:
+        with open(f'/proc/{MASTER_PID}/task/{MASTER_PID}/children') as f:
+            return sorted(int(pid) for pid in f.read().split())
+    except (OSError, ValueError):
+        return [os.getpid()]
+
+
+def workers_memory_report():
+    """Per-worker memory, so we can check copy-on-write sharing holds as workers serve traffic"""
+    workers = []
+    for pid in worker_pids():
+        usage = memory_usage(pid)
+        if usage:
+            workers.append(dict(usage, pid=pid, current=pid == os.getpid()))
+    return {
+        'master_pid': MASTER_PID,
+        'master': memory_usage(MASTER_PID) if MASTER_PID else None,
+        'workers': workers,
+        'total_pss_bytes': sum(w.get('pss_bytes', 0) for w in workers),
+        'total_rss_bytes': sum(w.get('rss_bytes', 0) for w in workers),
+    }
+
+
+class PreforkServer:
+    """Bind once, then fork workers that share everything loaded so far copy-on-write
+
+    The master never serves requests. It accepts connections, peeks at each
+    request and hands the connection (by fd passing) to the worker that owns
+    its session id, so a session's turns, captures and idempotency keys always
+    reach the worker holding them. Requests without a key go round-robin;
+    ids a worker hands out (new_id) hash back to that worker. The master also
+    restarts workers that die.
+
+    Routing happens once per connection, so workers answer HTTP/1.0 and close
+    after each response: clients lose keep-alive and reconnect per request,
+    which is cheap next to an LLM turn and keeps every request on its owner.
+    The master waits up to PEEK_TIMEOUT for a request's headers and body
+    before routing it on whatever has arrived.
+    """
+
+    def __init__(self, app, host, port, num_workers, post_fork=None, backlog=128, affinity_headers=()):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = num_workers
+        self.post_fork = post_fork
+        self.backlog = backlog
+        self.affinity_headers = affinity_headers
+        self._workers = {}
+        self._channels = {}
+        self._next_worker = 0
+        # Accepted connections not yet handed to a worker: conn -> routing deadline
+        self._pending = {}
+        # Those of them that have not sent anything yet (watched by the selector)
+        self._unread = set()
+        self._stopping = False
+
+    def run(self):
+        global MASTER_PID
+        MASTER_PID = os.getpid()
+
+        sock = socket.create_server((self.host, self.port), backlog=self.backlog)
+        sock.setblocking(False)
+
+        # Move everything allocated so far into the permanent generation: the collector then
+        # never writes to those objects' headers, which would un-share their pages in workers
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for index in range(self.num_workers):
+            self._spawn(sock, index)
+        print(f"🍴 Pre-fork master {MASTER_PID} serving on {self.host}:{self.port} with {self.num_workers} workers")
+
+        selector = selectors.DefaultSelector()
+        selector.register(sock, selectors.EVENT_READ)
+        while self._workers or not self._stopping:
+            if self._stopping:
+                self._reap(sock)
+                time.sleep(0.1)
+                continue
+            try:
+                events = selector.select(timeout=0.02 if len(self._pending) > len(self._unread) else 1.0)
+            except InterruptedError:
+                continue
+            for key, _ in events:
+                if key.fileobj is sock:
+                    self._accept(sock, selector)
+                else:
+                    selector.unregister(key.fileobj)
+                    self._unread.discard(key.fileobj)
+            now = time.monotonic()
+            for conn, deadline in list(self._pending.items()):
+                if now >= deadline and conn in self._unread:
+                    selector.unregister(conn)
+                    self._unread.discard(conn)
+                if conn not in self._unread and self._route(conn, force=now >= deadline):
+                    del self._pending[conn]
+            self._reap(sock)
+
+        selector.close()
+        sock.close()
+
+    def _accept(self, sock, selector):
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            conn.setblocking(False)
+            selector.register(conn, selectors.EVENT_READ)
+            self._pending[conn] = time.monotonic() + PEEK_TIMEOUT
+            self._unread.add(conn)
+
+    def _route(self, conn, force=False):
+        """Hand a connection to its worker once its request has arrived; False to keep waiting"""
+        try:
+            data = conn.recv(MAX_PEEK_BYTES, socket.MSG_PEEK)
+        except BlockingIOError:
+            data = None
+        except OSError:
+            conn.close()
+            return True
+        if data == b"":
+            conn.close()
+            return True
+        if not force and (data is None or not _request_buffered(data)):
+            return False
+
+        key = affinity_key(data or b"", self.affinity_headers)
+        if key is not None:
+            index = affinity_worker(key, self.num_workers)
+        else:
+            index = self._next_worker
+            self._next_worker = (self._next_worker + 1) % self.num_workers
+        # The worker shares this file description, including its O_NONBLOCK flag
+        conn.setblocking(True)
+        try:
+            socket.send_fds(self._channels[index], [b"c"], [conn.fileno()])
+        except (KeyError, OSError) as e:
+            print(f"⚠️ Could not hand connection to worker {index}: {e}")
+        conn.close()
+        return True
+
+    def _reap(self, sock):
+        """Restart workers that exited (unless stopping)"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._workers.clear()
+                return
+            if pid == 0:
+                return
+            index = self._workers.pop(pid, None)
+            if index is None or self._stopping:
+                continue
+            print(f"⚠️ Worker {pid} exited (status {status}); restarting")
+            time.sleep(1)
+            self._spawn(sock, index)
+
+    def _spawn(self, sock, index):
+        global WORKER_INDEX, NUM_WORKERS
+        old_channel = self._channels.pop(index, None)
+        if old_channel is not None:
+            old_channel.close()
+        channel, worker_channel = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+        pid = os.fork()
+        if pid:
+            worker_channel.close()
+            self._channels[index] = channel
+            self._workers[pid] = index
+            return
+
+        # Worker process
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        WORKER_INDEX, NUM_WORKERS = index, self.num_workers
+        sock.close()
+        channel.close()
+        for other in self._channels.values():
+            other.close()
+        # A client connection kept open here would never see EOF when its real worker closes it
+        for conn in self._pending:
+            conn.close()
+        exit_code = 0
+        try:
+            if self.post_fork is not None:
+                self.post_fork(index)
+            # Connections arrive from the master; the server's own listening socket is never accepted on
+            server = make_server("127.0.0.1", 0, self.app, threaded=True, request_handler=_OneRequestHandler)
+            print(f"👷 Worker {index} (pid {os.getpid()}) ready")
+            while True:
+                message, fds, _, _ = socket.recv_fds(worker_channel, 16, 1)
+                if not message:
+                    break
+                conn = socket.socket(fileno=fds[0])
+                try:
+                    server.process_request(conn, conn.getpeername())
+                except OSError:
+                    conn.close()
+        except BaseException as e:
+            print(f"❌ Worker {index} crashed: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _handle_stop(self, signum, frame):
+        if self._stopping:
+            return
+        self._stopping = True
+        print("🛑 Stopping pre-fork workers...")
+        for pid in list(self._workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
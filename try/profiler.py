@@ -0,0 +1,128 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MAX_PROFILE_SECONDS = 60
+TRACEMALLOC_GROUP_BY = ("filename", "lineno", "traceback")
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile or tracemalloc session is already running"""
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """Low-overhead wall-clock sampler over all threads, producing collapsed stacks for flamegraphs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds, interval=0.01, include_idle=False):
+        """Sample every thread's stack for `seconds`; returns (collapsed text, sample count)"""
+        seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+
+        try:
+            stacks = Counter()
+            samples = 0
+            own_thread = threading.get_ident()
+            thread_names = {}
+            deadline = time.perf_counter() + seconds
+
+            while time.perf_counter() < deadline:
+                if samples % 100 == 0:
+                    thread_names = {t.ident: t.name for t in threading.enumerate()}
+
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+
+                    frames = []
+                    while frame is not None:
+                        frames.append(_frame_label(frame))
+                        frame = frame.f_back
+                    if not frames:
+                        continue
+
+                    # Threads parked in wait()/select() dominate wall-clock samples; skip unless asked
+                    if not include_idle and frames[0].split(" ", 1)[0] in ("wait", "select", "poll", "accept", "_wait_for_tstate_lock", "sleep"):
+                        continue
+
+                    frames.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+                    stacks[";".join(reversed(frames))] += 1
+
+                samples += 1
+                time.sleep(interval)
+
+            collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+            return collapsed + "\n", samples
+        finally:
+            self._lock.release()
+
+
+class TracemallocTracker:
+    """Start tracemalloc on demand and diff snapshots against a baseline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._baseline = None
+
+    @property
+    def running(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, frames=10):
+        if frames is None or frames < 1:
+            raise ValueError("frames must be a positive integer")
+        with self._lock:
+            if tracemalloc.is_tracing():
+                raise ProfilerBusy("tracemalloc is already running")
+            tracemalloc.start(frames)
+            self._baseline = tracemalloc.take_snapshot()
+
+    def diff(self, limit=25, group_by="lineno", reset_baseline=False):
+        """Top allocation growth since the baseline snapshot"""
+        if group_by not in TRACEMALLOC_GROUP_BY:
+            raise ValueError(f"Cannot group by {group_by}; use one of {', '.join(TRACEMALLOC_GROUP_BY)}")
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._baseline is None:
+                return None
+
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            stats = snapshot.compare_to(self._baseline, group_by)
+            if reset_baseline:
+                self._baseline = snapshot
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "top": [
+                {
+                    "location": str(stat.traceback[0]) if stat.traceback else "?",
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                    "traceback": [str(frame) for frame in stat.traceback],
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def stop(self):
+        with self._lock:
+            self._baseline = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from collections import defaultdict
+
+from interview_session import TECH_SKILLS
+from metrics import REGISTRY
+from question_planner import content_terms, coverage
+
+QUESTION_BANK_LOOKUPS = REGISTRY.counter(
+    'question_bank_lookups', 'Interview questions served from the question bank instead of the LLM', ['kind', 'result'])
+QUESTION_BANK_QUESTIONS = REGISTRY.gauge(
+    'question_bank_questions', 'Distinct questions held in the question bank')
+
+_WORDS = re.compile(r"[a-z0-9+#./-]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Short openers so a banked question does not read the same in every interview
+FIRST_QUESTION_OPENERS = [
+    "Thanks for the introduction.",
+    "Thank you for confirming the details.",
+    "Great, thanks for sharing that.",
+    "Thanks, that's a helpful background.",
+]
+FOLLOW_UP_OPENERS = [
+    "Thank you.",
+    "Got it.",
+    "Okay, thanks.",
+    "Understood.",
+    "Thanks for explaining.",
+]
+
+# Questions longer than this are likely tied to the candidate's own answer
+MAX_QUESTION_WORDS = 45
+# Share of a prepared question's content words a later question must cover to be banked
+MIN_PREPARED_COVERAGE = 0.5
+
+# Phrases that tie a question to what one candidate said; such questions are never banked
+_ANSWER_REFERENCE = re.compile(
+    r"\byou(?:'ve| have)?\s+(?:just\s+)?(?:mentioned|said|described|talked|noted|brought up|referred|highlighted|shared)\b"
+    r"|\byour\s+(?:answer|response|example|project|company|employer|team|current|previous|last)\b"
+    r"|\b(?:earlier|before)\s+you\b|\bat your\b|\bin that (?:project|role|company)\b",
+    re.IGNORECASE,
+)
+_CAPITALIZED = re.compile(r"\b[A-Z][A-Za-z0-9&+#.-]+")
+
+
+def _normalize(text):
+    return " ".join(_WORDS.findall(str(text).lower()))
+
+
+def _techstack(interview_data):
+    techstack = interview_data.get('techstack') or []
+    if not isinstance(techstack, list):
+        techstack = str(techstack).split(',')
+    return sorted({_normalize(t) for t in techstack if _normalize(t)})
+
+
+def card_key(interview_data):
+    """Stable key of an interview card: role, level, type, tech stack and prepared questions, normalized"""
+    card = {
+        'role': _normalize(interview_data.get('role', '')),
+        'level': _normalize(interview_data.get('level', '')),
+        'type': _normalize(interview_data.get('type', '')),
+        'techstack': _techstack(interview_data),
+        'questions': [_normalize(q) for q in interview_data.get('questions') or []],
+    }
+    return hashlib.sha256(json.dumps(card, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def extract_question(message):
+    """The question part of an interviewer message, without the acknowledgement in front of it"""
+    sentences = [s for s in _SENTENCE_END.split(str(message).strip()) if s]
+    if not sentences or not sentences[-1].endswith('?'):
+        return None
+    # The first sentence acknowledges the previous answer; keep it only if it is the question itself
+    question = " ".join(sentences[1:] if len(sentences) > 1 and not sentences[0].endswith('?') else sentences)
+    if len(question.split()) > MAX_QUESTION_WORDS:
+        return None
+    return question
+
+
+def _candidate_names(record):
+    """Capitalized words from the candidate's own answers and introduction: names, employers, products"""
+    candidate_info = record.get('candidate_info') or {}
+    texts = [qa.get('answer') or '' for qa in record.get('all_questions_answers') or []]
+    texts.append(str(candidate_info.get('introduction') or ''))
+    names = set()
+    for text in texts:
+        for sentence in _SENTENCE_END.split(text.strip()):
+            # The first word of a sentence is capitalized anyway
+            names.update(_normalize(match.group()) for match in _CAPITALIZED.finditer(sentence) if match.start() > 0)
+    return {name for name in names if name}
+
+
+def references_candidate(question, candidate_names, card_words):
+    """Whether a question quotes the candidate's answer or their names (the card's own terms excepted)"""
+    if _ANSWER_REFERENCE.search(question):
+        return True
+    words = {_normalize(word) for word in _CAPITALIZED.findall(question)}
+    return bool(words & candidate_names - card_words)
+
+
+def _card_terms(interview_data):
+    terms = {f"role:{word}" for word in _normalize(interview_data.get('role', '')).split()}
+    terms.update(f"tech:{tech}" for tech in _techstack(interview_data))
+    return terms
+
+
+def _topics(question, techstack):
+    text = _normalize(question)
+    return {f"topic:{skill}" for skill in set(TECH_SKILLS) | set(techstack) if skill and skill in text}
+
+
+class BankedQuestion:
+    def __init__(self, text, card, level, interview_type, first, terms):
+        self.text = text
+        self.card = card
+        self.level = level
+        self.interview_type = interview_type
+        self.first = first
+        self.terms = terms
+        self.seen = 1
+        self.served = 0
+
+
+class QuestionBank:
+    """Interview questions from completed sessions, keyed by card and indexed by role / tech / topic
+
+    A card with at least min_questions distinct banked first questions gets
+    its first technical question from the bank instead of the LLM. Only first
+    questions and questions asking one of the card's prepared questions are
+    banked, and never ones that quote the candidate's answer or their names,
+    so nothing one candidate said reaches another. Follow-ups depend on the
+    candidate's last answer, so serving them is off unless follow_up_rate is
+    set; they come from the same card or, failing that, from cards of the
+    same level and type whose role and tech stack are similar enough.
+    """
+
+    def __init__(self, min_questions=3, follow_up_rate=0.0, min_similarity=0.6, max_per_card=50, ignore=()):
+        self.min_questions = min_questions
+        self.follow_up_rate = follow_up_rate
+        self.min_similarity = min_similarity
+        self.max_per_card = max_per_card
+        self._ignore = {_normalize(text) for text in ignore}
+        self._questions = {}
+        self._by_card = defaultdict(list)
+        self._index = defaultdict(set)
+        self._lock = threading.Lock()
+        QUESTION_BANK_QUESTIONS.set_function(lambda: len(self._questions))
+
+    def add_session(self, record):
+        """Bank the interviewer questions of one completed session record (InterviewSession.to_dict())"""
+        if not record.get('is_completed'):
+            return 0
+        interview_data = record.get('interview_data') or {}
+        card = card_key(interview_data)
+        techstack = _techstack(interview_data)
+        card_terms = _card_terms(interview_data)
+        level = _normalize(interview_data.get('level', ''))
+        interview_type = _normalize(interview_data.get('type', ''))
+        prepared = [content_terms(q) for q in interview_data.get('questions') or []]
+        candidate_names = _candidate_names(record)
+        card_words = set(_normalize(" ".join([
+            interview_data.get('role', ''), *techstack, *(interview_data.get('questions') or []), *TECH_SKILLS,
+        ])).split())
+
+        added = 0
+        # Pair 0 is the greeting answered by the introduction; pair 1 holds the first technical question
+        for position, qa in enumerate(record.get('all_questions_answers') or []):
+            if position == 0 or not qa.get('answer'):
+                continue
+            question = extract_question(qa.get('question', ''))
+            if question is None or _normalize(question) in self._ignore or _normalize(qa['question']) in self._ignore:
+                continue
+            # Later questions usually build on the previous answer: bank only those asking a prepared question
+            if position > 1 and not any(coverage(terms, content_terms(question)) >= MIN_PREPARED_COVERAGE for terms in prepared):
+                continue
+            if references_candidate(question, candidate_names, card_words):
+                continue
+            question_id = hashlib.sha1(f"{card}:{_normalize(question)}".encode()).hexdigest()[:16]
+            with self._lock:
+                banked = self._questions.get(question_id)
+                if banked is not None:
+                    banked.seen += 1
+                    banked.first = banked.first or position == 1
+                    continue
+                if len(self._by_card[card]) >= self.max_per_card:
+                    continue
+                terms = card_terms | _topics(question, techstack)
+                banked = BankedQuestion(question, card, level, interview_type, position == 1, terms)
+                self._questions[question_id] = banked
+                self._by_card[card].append(question_id)
+                for term in terms:
+                    self._index[term].add(question_id)
+                added += 1
+        return added
+
+    def load(self, records):
+        """Bank every completed session in an iterable of archived records"""
+        return sum(self.add_session(record) for record in records)
+
+    def _first_questions(self, card):
+        return [self._questions[qid] for qid in self._by_card.get(card, ()) if self._questions[qid].first]
+
+    def can_serve_first(self, interview_data):
+        """Whether the card's first technical question will come from the bank"""
+        with self._lock:
+            return len(self._first_questions(card_key(interview_data))) >= self.min_questions
+
+    def _similar(self, interview_data, card):
+        """Questions of similar cards (same level and type) ranked by role / tech / topic overlap"""
+        role_terms = {t for t in _card_terms(interview_data) if t.startswith('role:')}
+        techstack = _techstack(interview_data)
+        level = _normalize(interview_data.get('level', ''))
+        interview_type = _normalize(interview_data.get('type', ''))
+
+        candidates = set()
+        for term in role_terms | {f"tech:{t}" for t in techstack} | {f"topic:{t}" for t in techstack}:
+            candidates |= self._index.get(term, set())
+
+        scored = []
+        for question_id in candidates:
+            banked = self._questions[question_id]
+            if banked.card == card or banked.level != level or banked.interview_type != interview_type:
+                continue
+            role_score = len(role_terms & banked.terms) / len(role_terms) if role_terms else 1.0
+            tech_hits = sum(1 for t in techstack if f"tech:{t}" in banked.terms or f"topic:{t}" in banked.terms)
+            tech_score = tech_hits / len(techstack) if techstack else 1.0
+            score = 0.4 * role_score + 0.6 * tech_score
+            if score >= self.min_similarity:
+                scored.append((score, banked))
+        scored.sort(key=lambda item: -item[0])
+        return [banked for _, banked in scored[:self.max_per_card]]
+
+    def _pick(self, candidates, asked):
+        asked = [_normalize(text) for text in asked]
+        fresh = [b for b in candidates if not any(_normalize(b.text) in text for text in asked)]
+        if not fresh:
+            return None
+        # Favour questions served least often so popular cards rotate through the bank
+        least = min(b.served for b in fresh)
+        banked = random.choice([b for b in fresh if b.served <= least + 1])
+        banked.served += 1
+        return banked
+
+    def next_question(self, interview_data, user_response_count, asked=()):
+        """A banked question (with a varied opener) for this turn, or None to generate one with the LLM"""
+        card = card_key(interview_data)
+        kind = 'first' if user_response_count == 1 else 'follow_up'
+        with self._lock:
+            if kind == 'first':
+                candidates = self._first_questions(card)
+                if len(candidates) < self.min_questions:
+                    QUESTION_BANK_LOOKUPS.inc(kind=kind, result='miss')
+                    return None
+                openers = FIRST_QUESTION_OPENERS
+            else:
+                if random.random() >= self.follow_up_rate:
+                    QUESTION_BANK_LOOKUPS.inc(kind=kind, result='skipped')
+                    return None
+                candidates = [self._questions[qid] for qid in self._by_card.get(card, ())]
+                candidates = candidates or self._similar(interview_data, card)
+                openers = FOLLOW_UP_OPENERS
+            banked = self._pick(candidates, asked)
+
+        QUESTION_BANK_LOOKUPS.inc(kind=kind, result='hit' if banked else 'miss')
+        if banked is None:
+            return None
+        return f"{random.choice(openers)} {banked.text}"
+
+    def stats(self):
+        with self._lock:
+            return {
+                'questions': len(self._questions),
+                'cards': len(self._by_card),
+                'index_terms': len(self._index),
+                'min_questions': self.min_questions,
+                'follow_up_rate': self.follow_up_rate,
+            }
+
+
+def create_question_bank_from_env(ignore=()):
+    """Bank tuned by QUESTION_BANK_MIN_QUESTIONS / _FOLLOW_UP_RATE / _MIN_SIMILARITY / _MAX_PER_CARD; QUESTION_BANK=0 disables"""
+    if os.getenv('QUESTION_BANK', '1') != '1':
+        return None
+    return QuestionBank(
+        min_questions=int(os.getenv('QUESTION_BANK_MIN_QUESTIONS', '3')),
+        follow_up_rate=float(os.getenv('QUESTION_BANK_FOLLOW_UP_RATE', '0')),
+        min_similarity=float(os.getenv('QUESTION_BANK_MIN_SIMILARITY', '0.6')),
+        max_per_card=int(os.getenv('QUESTION_BANK_MAX_PER_CARD', '50')),
+        ignore=ignore,
+    )
@@ -0,0 +1,100 @@
+import re
+
+from metrics import REGISTRY
+
+PREPARED_QUESTIONS_COVERED = REGISTRY.counter(
+    'prepared_questions_covered', 'Prepared interview questions marked as asked, by how the match was made', ['match'])
+
+_WORDS = re.compile(r"[a-z0-9+#]+")
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'could', 'do', 'does', 'for', 'from', 'how',
+    'i', 'if', 'in', 'is', 'it', 'me', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what',
+    'when', 'where', 'which', 'who', 'why', 'will', 'with', 'would', 'you', 'your', 'tell', 'about',
+    'explain', 'describe', 'please', 'us', 'we', 'have', 'has', 'there', 'their', 'them', 'some',
+}
+
+
+def _stem(word):
+    for suffix in ('ing', 'ed', 's'):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def content_terms(text):
+    """Stemmed content words of a question, for order-insensitive matching"""
+    return {_stem(word) for word in _WORDS.findall(str(text).lower()) if word not in STOPWORDS}
+
+
+def coverage(prepared_terms, asked_terms):
+    """Share of a prepared question's content words that appear in an asked question"""
+    if not prepared_terms:
+        return 0.0
+    return len(prepared_terms & asked_terms) / len(prepared_terms)
+
+
+class QuestionPlanner:
+    """Tracks which prepared questions have been asked and picks the next one to ask
+
+    Interviewer messages are matched against the uncovered prepared questions
+    by content-word overlap, since the model rephrases them. A target that
+    max_offers interviewer messages in a row fail to ask is treated as
+    covered, so one question the model keeps avoiding cannot stall the plan.
+    """
+
+    def __init__(self, questions, threshold=0.5, max_offers=2):
+        self.questions = [str(q).strip() for q in questions if str(q).strip()]
+        self.threshold = threshold
+        self.max_offers = max_offers
+        self._terms = [content_terms(q) for q in self.questions]
+        self.covered = [None] * len(self.questions)
+        self._offers = [0] * len(self.questions)
+
+    @property
+    def remaining(self):
+        return sum(1 for match in self.covered if match is None)
+
+    def next_target(self):
+        """(index, question) of the next prepared question to ask, or None once all are covered"""
+        for index, match in enumerate(self.covered):
+            if match is None:
+                return index, self.questions[index]
+        return None
+
+    def mark_asked(self, message, offered=False):
+        """Match an interviewer message against the uncovered questions
+
+        Only a message the model wrote from a prompt naming next_target()
+        (offered=True) counts as an offer of that target when it matches nothing.
+        """
+        asked = content_terms(message)
+        best, best_score = None, 0.0
+        for index, match in enumerate(self.covered):
+            if match is None:
+                score = coverage(self._terms[index], asked)
+                if score > best_score:
+                    best, best_score = index, score
+
+        if best is not None and best_score >= self.threshold:
+            self._cover(best, 'similar')
+            return best
+
+        target = self.next_target() if offered else None
+        if target is not None:
+            self._offers[target[0]] += 1
+            if self._offers[target[0]] >= self.max_offers:
+                self._cover(target[0], 'assumed')
+        return None
+
+    def _cover(self, index, match):
+        self.covered[index] = match
+        PREPARED_QUESTIONS_COVERED.inc(match=match)
+
+    def stats(self):
+        return {
+            'total': len(self.questions),
+            'covered': len(self.questions) - self.remaining,
+            'remaining': self.remaining,
+            'next': self.next_target()[1] if self.next_target() else None,
+        }
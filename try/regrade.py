@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+# Before llm_client is imported: it reads LLM_BACKEND (and the scheduler settings) at import
+load_dotenv()
+
+from interview_session import build_feedback_prompt
+from llm_client import configure_llm_backend, create_llm_model, supports_response_schema
+from session_store import iter_sessions
+from structured_feedback import (apply_to_candidate_info, build_structured_feedback_prompt, format_feedback_text,
+                                 generate_structured_feedback)
+
+DEFAULT_MODEL = os.getenv('REGRADE_MODEL', 'models/gemini-2.0-flash')
+# Same settings as the server, so offline grades match what finished interviews get
+FEEDBACK_FORMAT = os.getenv('FEEDBACK_FORMAT', 'structured')
+FEEDBACK_FIELD_RETRIES = int(os.getenv('FEEDBACK_FIELD_RETRIES', '2'))
+
+
+def rubric_fingerprint(feedback_format=FEEDBACK_FORMAT):
+    """Short hash of the feedback prompt template, so editing the rubric invalidates old grades"""
+    if feedback_format == 'structured':
+        template = build_structured_feedback_prompt({}, [])
+    else:
+        template = build_feedback_prompt({}, [])
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+
+
+def load_checkpoint(output_path, rubric_version):
+    """Session ids already graded with this rubric version in a previous (possibly interrupted) run"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('rubric_version') == rubric_version:
+                done.add(record['session_id'])
+    return done
+
+
+def grade_prose(model, candidate_info, qa_pairs):
+    """Free-form feedback text from the feedback rubric"""
+    response = model.generate_content(build_feedback_prompt(candidate_info, qa_pairs))
+    feedback = response.text.strip() if response and response.text else ""
+    if not feedback:
+        raise ValueError("empty feedback")
+    return feedback
+
+
+def grade_session(model, record, rubric_version, retries=2, feedback_format=FEEDBACK_FORMAT, use_schema=False):
+    """Grade one archived session with the current feedback rubric
+
+    In the structured format the feedback is validated JSON, as on the server; a
+    session whose fields all fail validation is graded in prose instead.
+    """
+    candidate_info = dict(record.get('candidate_info') or {})
+    qa_pairs = record.get('all_questions_answers') or []
+    for attempt in range(retries + 1):
+        try:
+            start = time.perf_counter()
+            structured = None
+            if feedback_format == 'structured':
+                structured, failing = generate_structured_feedback(
+                    model, candidate_info, qa_pairs, use_schema, retries=FEEDBACK_FIELD_RETRIES)
+                if structured and failing:
+                    print(f"⚠️ {record['session_id']}: structured feedback missing fields {failing}", file=sys.stderr)
+            if structured:
+                apply_to_candidate_info(candidate_info, structured)
+                feedback = format_feedback_text(structured)
+            else:
+                feedback = grade_prose(model, candidate_info, qa_pairs)
+            return {
+                'session_id': record['session_id'],
+                'rubric_version': rubric_version,
+                'model': model.model_name,
+                'graded_at': datetime.now().isoformat(),
+                'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+                'questions_answered': len(qa_pairs),
+                'format': 'structured' if structured else 'prose',
+                'feedback': feedback,
+                'structured_feedback': structured or None,
+                'candidate_info': candidate_info if structured else None,
+            }
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def pending_sessions(input_path, done, limit=None):
+    """Stream archived sessions that still need grading"""
+    count = 0
+    for record in iter_sessions(input_path):
+        if limit is not None and count >= limit:
+            return
+        if not record.get('session_id') or record['session_id'] in done:
+            continue
+        if not record.get('all_questions_answers'):
+            continue
+        count += 1
+        yield record
+
+
+def run(args):
+    done = load_checkpoint(args.output, args.rubric_version)
+    if done:
+        print(f"↩️  Resuming: {len(done)} sessions already graded with rubric '{args.rubric_version}'", file=sys.stderr)
+
+    # The scheduler is per process, so batch priority only orders this run's own calls; it shares
+    # nothing with a server on the same API key. Keep --workers low next to live traffic.
+    model = create_llm_model(args.model, priority='batch')
+    use_schema = args.feedback_format == 'structured' and supports_response_schema()
+    graded = failed = 0
+    failures = []
+    start = last_report = time.perf_counter()
+
+    # The output file doubles as the checkpoint: one flushed line per finished session
+    with open(args.output, 'a', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        in_flight = {}
+        sessions = pending_sessions(args.input, done, args.limit)
+        exhausted = False
+
+        while in_flight or not exhausted:
+            # Keep a bounded window of submitted work so the archive is streamed, not loaded
+            while not exhausted and len(in_flight) < args.workers * 2:
+                record = next(sessions, None)
+                if record is None:
+                    exhausted = True
+                    break
+                future = pool.submit(grade_session, model, record, args.rubric_version, args.retries,
+                                     args.feedback_format, use_schema)
+                in_flight[future] = record['session_id']
+
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                session_id = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    failures.append({'session_id': session_id, 'error': str(e)})
+                    continue
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                graded += 1
+
+            now = time.perf_counter()
+            if now - last_report >= args.progress_every:
+                last_report = now
+                rate = graded / (now - start) if now > start else 0.0
+                print(f"📊 graded={graded} failed={failed} in_flight={len(in_flight)} rate={rate:.2f}/s", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'input': args.input,
+        'output': args.output,
+        'rubric_version': args.rubric_version,
+        'feedback_format': args.feedback_format,
+        'model': args.model,
+        'workers': args.workers,
+        'previously_graded': len(done),
+        'graded': graded,
+        'failed': failed,
+        'elapsed_seconds': round(elapsed, 2),
+        'sessions_per_second': round(graded / elapsed, 3) if elapsed else 0.0,
+        'failures': failures[:50],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-grade archived interviews with the current feedback rubric")
+    parser.add_argument("--input", default=os.getenv('SESSION_ARCHIVE_PATH') or None,
+                        required=not os.getenv('SESSION_ARCHIVE_PATH'),
+                        help="session archive (JSONL) written by app.py with SESSION_ARCHIVE_PATH set")
+    parser.add_argument("--output", default="regraded_sessions.jsonl",
+                        help="JSONL results; also the checkpoint used to resume")
+    parser.add_argument("--feedback-format", choices=('structured', 'prose'), default=FEEDBACK_FORMAT,
+                        help="structured JSON feedback with a prose fallback, or prose only (default: FEEDBACK_FORMAT)")
+    parser.add_argument("--rubric-version",
+                        help="label stored with each grade (default: hash of the current rubric for the format); "
+                             "sessions already graded with it are skipped")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent LLM calls")
+    parser.add_argument("--retries", type=int, default=2, help="retries per session on LLM errors")
+    parser.add_argument("--limit", type=int, help="grade at most this many sessions in this run")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+    if args.rubric_version is None:
+        args.rubric_version = rubric_fingerprint(args.feedback_format)
+
+    configure_llm_backend(os.getenv('GEMINI_API_KEY'))
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if report['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
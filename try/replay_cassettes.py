@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench_interview import RouteStats, get_health
+from cassettes import iter_cassettes
+from idempotency import IDEMPOTENCY_KEY_HEADER
+from tracing import TURN_ID_HEADER
+
+BASE_URL = "http://localhost:5000"
+
+_ID_SEGMENT = re.compile(r"/[0-9a-fA-F-]{16,}")
+
+
+def route_name(path):
+    return _ID_SEGMENT.sub("/<id>", path)
+
+
+class IdMap:
+    """Server-generated ids (session ids, capture handles) of the recording mapped to this run's"""
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def learn(self, recorded_ids, response):
+        try:
+            data = response.json()
+        except ValueError:
+            return
+        with self._lock:
+            for key, recorded in (recorded_ids or {}).items():
+                if isinstance(data, dict) and key in data:
+                    self._ids[recorded] = data[key]
+
+    def apply(self, value):
+        with self._lock:
+            ids = dict(self._ids)
+        if isinstance(value, str):
+            for recorded, live in ids.items():
+                value = value.replace(recorded, live)
+            return value
+        if isinstance(value, dict):
+            return {key: self.apply(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.apply(item) for item in value]
+        return value
+
+
+def load_sessions(directory, limit=None):
+    """Recorded requests per cassette, in order"""
+    sessions = []
+    for header, events in iter_cassettes(directory):
+        recorded = [e for e in events if e['kind'] == 'request']
+        if recorded:
+            sessions.append((header['session_id'], recorded))
+        if limit is not None and len(sessions) >= limit:
+            break
+    return sessions
+
+
+def drain_events(url, headers):
+    """Hold an SSE stream open until the server closes it, like the browser's EventSource"""
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=300) as response:
+            for _ in response.iter_lines():
+                pass
+    except requests.RequestException:
+        pass
+
+
+def replay_session(base_url, recorded, t0, wall_start, speed, stats, recorded_stats):
+    """Send one session's requests at their recorded offsets (scaled by speed) and record latencies"""
+    http = requests.Session()
+    ids = IdMap()
+    mismatches = 0
+    for event in recorded:
+        # Requests are recorded when they finish: start them at finish time minus their duration
+        started_at = event['ts'] - event['seconds'] - t0
+        delay = wall_start + (started_at / speed if speed > 0 else 0) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        url = base_url + ids.apply(event['path']) + (f"?{event['query']}" if event.get('query') else "")
+        headers = {TURN_ID_HEADER: event['turn_id']}
+        if event.get('idempotency_key'):
+            headers[IDEMPOTENCY_KEY_HEADER] = event['idempotency_key']
+        route = route_name(event['path'])
+
+        if route == "/stt/events/<id>":
+            threading.Thread(target=drain_events, args=(url, headers), daemon=True).start()
+            continue
+
+        start = time.perf_counter()
+        try:
+            response = http.request(event['method'], url, json=ids.apply(event.get('body')), headers=headers, timeout=300)
+            ok = response.status_code == event['status']
+        except requests.RequestException:
+            response, ok = None, False
+        stats.setdefault(route, RouteStats()).record(time.perf_counter() - start, ok)
+        recorded_stats.setdefault(route, RouteStats()).record(event['seconds'], True)
+
+        if response is None:
+            mismatches += 1
+            continue
+        if not ok:
+            mismatches += 1
+        if event.get('ids'):
+            ids.learn(event['ids'], response)
+    return mismatches
+
+
+def spawn_replay_server(port, cassette_dir, speed):
+    """Start app.py answering LLM and STT calls from the cassettes and wait until it is healthy"""
+    env = dict(os.environ, FLASK_DEBUG="0", PORT=str(port),
+               CASSETTE_MODE="replay", CASSETTE_DIR=cassette_dir, CASSETTE_SPEED=str(speed),
+               LLM_BACKEND="cassette", STT_POOL_SIZE="0",
+               # Keep the run independent of local state: no archives, no question bank
+               SESSION_ARCHIVE_PATH="", COLUMNAR_ARCHIVE_DIR="", QUESTION_BANK="0")
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    process = subprocess.Popen([sys.executable, app_path], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        if get_health(base_url).get("status") == "healthy":
+            return process, base_url
+        time.sleep(1)
+
+    process.terminate()
+    raise RuntimeError("Server did not become healthy in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded interview cassettes against the server")
+    parser.add_argument("--cassettes", default="cassettes", help="directory of *.jsonl.gz cassettes (CASSETTE_DIR)")
+    parser.add_argument("--speed", type=float, default=1.0, help="2.0 replays twice as fast, 0 sends back to back")
+    parser.add_argument("--limit", type=int, help="replay at most this many sessions")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="start app.py with CASSETTE_MODE=replay so upstream calls come from the cassettes")
+    parser.add_argument("--port", type=int, default=5056, help="port for --spawn-server")
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.cassettes, args.limit)
+    if not sessions:
+        sys.exit(f"No cassettes with requests in {args.cassettes}")
+
+    server = None
+    base_url = args.base_url
+    if args.spawn_server:
+        print("🚀 Starting local server in cassette replay mode...", file=sys.stderr)
+        server, base_url = spawn_replay_server(args.port, args.cassettes, args.speed)
+
+    try:
+        health_before = get_health(base_url)
+        stats, recorded_stats = {}, {}
+        # Sessions keep their recorded start offsets from each other, reproducing the original load
+        t0 = min(recorded[0]['ts'] - recorded[0]['seconds'] for _, recorded in sessions)
+        print(f"🎞️ Replaying {len(sessions)} sessions at {args.speed}x", file=sys.stderr)
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(sessions)) as executor:
+            mismatches = list(executor.map(
+                lambda session: replay_session(base_url, session[1], t0, wall_start, args.speed, stats, recorded_stats),
+                sessions,
+            ))
+        wall_seconds = time.perf_counter() - wall_start
+
+        health_after = get_health(base_url)
+        report = {
+            "config": {
+                "cassettes": args.cassettes,
+                "sessions": len(sessions),
+                "speed": args.speed,
+                "llm_backend": health_after.get("llm_backend"),
+            },
+            "wall_seconds": round(wall_seconds, 3),
+            "status_mismatches": sum(mismatches),
+            "routes": {
+                route: {
+                    "replayed": s.summary(wall_seconds),
+                    "recorded": recorded_stats[route].summary(wall_seconds),
+                }
+                for route, s in sorted(stats.items())
+            },
+            "cassettes_server": health_after.get("cassettes") or health_before.get("cassettes"),
+        }
+
+        output = json.dumps(report, indent=2)
+        print(output)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
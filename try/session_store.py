@@ -0,0 +1,39 @@
+import json
+import os
+import threading
+
+
+class SessionArchive:
+    """Append-only JSONL file of finished interviews, one session record per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, interview_session):
+        line = json.dumps(interview_session.to_dict(), default=str)
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not archive session {interview_session.session_id}: {e}")
+
+
+def iter_sessions(path):
+    """Stream archived session records without loading the whole file"""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A crash mid-write leaves a truncated last line; skip it rather than abort
+                print(f"⚠️ Skipping unreadable session record at {path}:{line_number}")
+
+
+def create_session_archive_from_env():
+    """Archive at SESSION_ARCHIVE_PATH; off unless set, since it holds full candidate transcripts"""
+    path = os.getenv('SESSION_ARCHIVE_PATH', '')
+    return SessionArchive(path) if path else None
@@ -0,0 +1,170 @@
+import json
+import re
+
+from interview_session import build_feedback_prompt
+from metrics import REGISTRY
+
+STRUCTURED_FEEDBACK_RESULTS = REGISTRY.counter(
+    'structured_feedback_results', 'Structured feedback generations by outcome', ['result'])
+STRUCTURED_FEEDBACK_RETRIES = REGISTRY.counter(
+    'structured_feedback_field_retries', 'Feedback fields re-requested after failing validation', ['field'])
+
+MAX_LIST_ITEMS = 3
+MAX_ASSESSMENT_WORDS = 80
+
+# Response schema (the subset of OpenAPI the Gemini response_schema accepts); ranges are checked locally
+FEEDBACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "technical_score": {"type": "integer", "description": "Technical proficiency, 0-100"},
+        "communication_score": {"type": "integer", "description": "Communication and soft skills, 0-100"},
+        "key_strengths": {"type": "array", "items": {"type": "string"}, "description": f"Top {MAX_LIST_ITEMS} strengths, one short phrase each"},
+        "areas_for_improvement": {"type": "array", "items": {"type": "string"}, "description": f"Top {MAX_LIST_ITEMS} areas for improvement, one short phrase each"},
+        "final_assessment": {"type": "string", "description": f"Overall assessment and recommendation, at most {MAX_ASSESSMENT_WORDS} words"},
+    },
+    "required": ["technical_score", "communication_score", "key_strengths", "areas_for_improvement", "final_assessment"],
+}
+FEEDBACK_FIELDS = FEEDBACK_SCHEMA["required"]
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def field_schema(fields):
+    """The response schema restricted to some fields, for retrying only those"""
+    return {
+        "type": "object",
+        "properties": {field: FEEDBACK_SCHEMA["properties"][field] for field in fields},
+        "required": list(fields),
+    }
+
+
+def build_structured_feedback_prompt(candidate_info, qa_pairs, fields=FEEDBACK_FIELDS):
+    """The feedback rubric, asking for a JSON object with the given fields instead of prose"""
+    field_lines = "\n".join(
+        f'- "{field}" ({FEEDBACK_SCHEMA["properties"][field]["type"]}): {FEEDBACK_SCHEMA["properties"][field]["description"]}'
+        for field in fields
+    )
+    return f"""{build_feedback_prompt(candidate_info, qa_pairs)}
+OUTPUT FORMAT (overrides the format above): respond with ONLY a JSON object, no prose or code fences, with exactly these fields:
+{field_lines}
+"""
+
+
+def parse_json_object(text):
+    """The JSON object in a model response, tolerating code fences and text around it"""
+    text = _CODE_FENCE.sub("", (text or "").strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _validate_score(value):
+    if isinstance(value, str):
+        value = value.strip().split("/")[0]
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, bool) or not 0 <= score <= 100:
+        return None
+    return int(round(score))
+
+
+def _validate_list(value):
+    if not isinstance(value, list):
+        return None
+    items = [str(item).strip() for item in value if str(item).strip()]
+    return items[:MAX_LIST_ITEMS] if items else None
+
+
+def _validate_text(value):
+    if not isinstance(value, str) or not value.strip():
+        return None
+    words = value.split()
+    return " ".join(words[:MAX_ASSESSMENT_WORDS])
+
+
+VALIDATORS = {
+    "technical_score": _validate_score,
+    "communication_score": _validate_score,
+    "key_strengths": _validate_list,
+    "areas_for_improvement": _validate_list,
+    "final_assessment": _validate_text,
+}
+
+
+def validate_feedback(data, fields=FEEDBACK_FIELDS):
+    """(valid fields, names of fields that are missing or invalid)"""
+    valid, failing = {}, []
+    for field in fields:
+        value = VALIDATORS[field]((data or {}).get(field))
+        if value is None:
+            failing.append(field)
+        else:
+            valid[field] = value
+    return valid, failing
+
+
+def generate_structured_feedback(model, candidate_info, qa_pairs, use_schema, retries=2, max_output_tokens=512):
+    """Generate and validate structured feedback, re-requesting only the fields that fail
+
+    Returns (feedback, failing fields). With use_schema the model is asked for
+    JSON through response_schema; otherwise the schema is only in the prompt.
+    Errors from the model call itself are raised, not counted as failing fields.
+    """
+    feedback, fields = {}, list(FEEDBACK_FIELDS)
+    for attempt in range(retries + 1):
+        generation_config = {"temperature": 0.2, "max_output_tokens": max_output_tokens}
+        if use_schema:
+            generation_config.update(response_mime_type="application/json", response_schema=field_schema(fields))
+        # Transport errors propagate: only an unusable response is retried here
+        response = model.generate_content(
+            build_structured_feedback_prompt(candidate_info, qa_pairs, fields),
+            generation_config=generation_config,
+        )
+        try:
+            data = parse_json_object(response.text if response else None)
+        except ValueError as e:
+            # Blocked or empty candidates raise on .text: count it as every field failing
+            print(f"⚠️ Structured feedback response unusable: {e}")
+            data = None
+
+        valid, fields = validate_feedback(data, fields)
+        feedback.update(valid)
+        if not fields:
+            break
+        if attempt < retries:
+            for field in fields:
+                STRUCTURED_FEEDBACK_RETRIES.inc(field=field)
+
+    STRUCTURED_FEEDBACK_RESULTS.inc(result='complete' if not fields else 'partial' if feedback else 'failed')
+    return feedback, fields
+
+
+def apply_to_candidate_info(candidate_info, feedback):
+    """Fill the candidate_info scores and strengths from structured feedback"""
+    for field in ("technical_score", "communication_score", "key_strengths", "areas_for_improvement"):
+        if field in feedback:
+            candidate_info[field] = feedback[field]
+    return candidate_info
+
+
+def format_feedback_text(feedback):
+    """Readable feedback text rendered locally from the structured fields (no second LLM call)"""
+    lines = []
+    if "technical_score" in feedback:
+        lines.append(f"Technical Proficiency: {feedback['technical_score']}/100")
+    if "communication_score" in feedback:
+        lines.append(f"Communication & Soft Skills: {feedback['communication_score']}/100")
+    if feedback.get("key_strengths"):
+        lines.append("Strengths: " + "; ".join(feedback["key_strengths"]))
+    if feedback.get("areas_for_improvement"):
+        lines.append("Areas for Improvement: " + "; ".join(feedback["areas_for_improvement"]))
+    if feedback.get("final_assessment"):
+        lines.append(f"Overall Assessment: {feedback['final_assessment']}")
+    return "\n".join(lines)
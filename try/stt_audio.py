@@ -0,0 +1,40 @@
+import array
+import math
+import time
+import wave
+
+BYTES_PER_SAMPLE = 2
+
+
+def synthetic_pcm(speech_seconds=3.0, silence_seconds=1.5, sample_rate=16000):
+    """PCM16 mono: a quiet tone standing in for speech, then trailing silence to end the turn"""
+    samples = array.array("h")
+    for i in range(int(speech_seconds * sample_rate)):
+        samples.append(int(3000 * math.sin(2 * math.pi * 220 * i / sample_rate)))
+    samples.extend([0] * int(silence_seconds * sample_rate))
+    return samples.tobytes()
+
+
+def read_wav_pcm(path, sample_rate=16000):
+    """Raw PCM16 frames of a mono 16-bit WAV recorded at sample_rate"""
+    with wave.open(path, "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != BYTES_PER_SAMPLE:
+            raise ValueError(f"{path}: expected mono 16-bit PCM")
+        if wav.getframerate() != sample_rate:
+            raise ValueError(f"{path}: recorded at {wav.getframerate()} Hz, expected {sample_rate} Hz")
+        return wav.readframes(wav.getnframes())
+
+
+def iter_pcm_chunks(pcm, sample_rate=16000, chunk_ms=50, realtime=1.0):
+    """Yield PCM in chunk_ms pieces, paced like a live microphone (realtime=0 sends as fast as possible)"""
+    chunk_bytes = int(sample_rate * chunk_ms / 1000) * BYTES_PER_SAMPLE
+    start = time.perf_counter()
+    sent_seconds = 0.0
+    for offset in range(0, len(pcm), chunk_bytes):
+        chunk = pcm[offset:offset + chunk_bytes]
+        if realtime > 0:
+            delay = start + sent_seconds / realtime - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        sent_seconds += len(chunk) / BYTES_PER_SAMPLE / sample_rate
+        yield chunk
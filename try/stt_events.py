@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from prefork import new_id
+
+
+def format_sse(event, data, event_id=None):
+    """Encode one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class SttCapture:
+    """One push-mode STT capture: an append-only event log that any number of listeners can follow"""
+
+    def __init__(self, stop_on_final=True, cancel_token=None):
+        self.handle = new_id(hex=True)
+        self.stop_on_final = stop_on_final
+        self.cancel_token = cancel_token
+        self.listeners = 0
+        self.started_at = time.time()
+        self.finished_at = None
+        self.transcription = ""
+        self.error = None
+        self._events = []
+        self._cond = threading.Condition()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def attach(self):
+        with self._cond:
+            self.listeners += 1
+            return self.listeners
+
+    def detach(self):
+        """Drop a listener; returns how many are still following"""
+        with self._cond:
+            self.listeners -= 1
+            return self.listeners
+
+    def publish(self, event, data):
+        with self._cond:
+            if self.done:
+                return
+            self._events.append((event, dict(data, elapsed_ms=round((time.time() - self.started_at) * 1000))))
+            self._cond.notify_all()
+
+    def finish(self, transcription, error=None):
+        """Publish the terminal event and release all listeners"""
+        with self._cond:
+            if self.done:
+                return
+            self.transcription = transcription or ""
+            self.error = error
+            payload = {"transcription": self.transcription, "status": "ok" if self.transcription else "error"}
+            if error:
+                payload["message"] = error
+            elif not self.transcription:
+                payload["message"] = "No speech detected"
+            self._events.append(("end", dict(payload, elapsed_ms=round((time.time() - self.started_at) * 1000))))
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def iter_events(self, start_index=0, heartbeat_seconds=15):
+        """Yield (index, event, data) from start_index on, or (None, None, None) as a keep-alive tick"""
+        index = start_index
+        while True:
+            with self._cond:
+                if index >= len(self._events):
+                    if self.done:
+                        return
+                    self._cond.wait(heartbeat_seconds)
+                pending = self._events[index:]
+
+            if not pending:
+                yield None, None, None
+                continue
+
+            for event, data in pending:
+                yield index, event, data
+                index += 1
+                if event == "end":
+                    return
+
+    def snapshot(self):
+        with self._cond:
+            partial = next((d["text"] for e, d in reversed(self._events) if e in ("partial", "final")), "")
+            return {
+                "handle": self.handle,
+                "done": self.done,
+                "transcription": self.transcription if self.done else "",
+                "latest_text": partial,
+                "events": len(self._events),
+                "error": self.error,
+            }
+
+
+class SttCaptureRegistry:
+    """Recent captures by handle, bounded so finished captures age out"""
+
+    def __init__(self, max_captures=50):
+        self.max_captures = max_captures
+        self._captures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, capture):
+        with self._lock:
+            self._captures[capture.handle] = capture
+            while len(self._captures) > self.max_captures:
+                self._captures.popitem(last=False)
+
+    def get(self, handle):
+        with self._lock:
+            return self._captures.get(handle)
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from collections import deque
+
+from metrics import REGISTRY
+
+STT_HANDSHAKE_SECONDS = REGISTRY.histogram(
+    'stt_handshake_seconds', 'STT streaming connect (TLS + WebSocket + session begin) latency', ['path'])
+STT_CONNECTIONS_ACQUIRED = REGISTRY.counter(
+    'stt_connections_acquired', 'STT connections handed to captures, pre-warmed or connected inline', ['source'])
+STT_POOL_IDLE = REGISTRY.gauge(
+    'stt_pool_idle_connections', 'Pre-connected STT sessions waiting for a capture')
+STT_POOL_EXPIRED = REGISTRY.counter(
+    'stt_pool_expired_connections', 'Idle pooled STT connections closed unused', ['reason'])
+
+
+class PooledConnection:
+    """A connected streaming client plus what the pool needs to know about it"""
+
+    def __init__(self, client, connected_at):
+        self.client = client
+        self.connected_at = connected_at
+        self.closed = False
+
+    def mark_closed(self):
+        self.closed = True
+
+
+class SttConnectionPool:
+    """Keeps `size` pre-connected STT sessions so a capture starts streaming without a handshake
+
+    Each capture consumes its connection (a streaming session can't be reused
+    after it terminates), and a background thread refills the pool. Idle
+    connections are closed after idle_timeout, and the pool is only kept warm
+    for keep_warm seconds (idle_timeout by default) after the last capture,
+    since the provider bills open sessions. Nothing is opened before the
+    first capture, and every warm connection is a billed session: a pool of
+    size N keeps up to N sessions open for keep_warm after each capture.
+    """
+
+    def __init__(self, connect, size=1, idle_timeout=30, keep_warm=None, refill_interval=1.0):
+        self._connect = connect
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.keep_warm = idle_timeout if keep_warm is None else keep_warm
+        self.refill_interval = refill_interval
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        # No demand yet: the pool stays cold until the first capture
+        self._last_demand = None
+        STT_POOL_IDLE.set_function(lambda: len(self._idle))
+
+    def _open(self, path):
+        start = time.perf_counter()
+        pooled = PooledConnection(None, time.monotonic())
+        pooled.client = self._connect(pooled.mark_closed)
+        STT_HANDSHAKE_SECONDS.observe(time.perf_counter() - start, path=path)
+        return pooled
+
+    def acquire(self):
+        """Return (client, warm): a pre-connected client if one is usable, else a freshly connected one"""
+        with self._lock:
+            self._last_demand = time.monotonic()
+            pooled = None
+            while self._idle:
+                candidate = self._idle.popleft()
+                if not candidate.closed and time.monotonic() - candidate.connected_at < self.idle_timeout:
+                    pooled = candidate
+                    break
+                self._discard(candidate, 'closed' if candidate.closed else 'idle_timeout')
+        self._wake.set()
+
+        if pooled is not None:
+            STT_CONNECTIONS_ACQUIRED.inc(source='warm')
+            return pooled.client, True
+
+        STT_CONNECTIONS_ACQUIRED.inc(source='cold')
+        return self._open('inline').client, False
+
+    def _discard(self, pooled, reason):
+        STT_POOL_EXPIRED.inc(reason=reason)
+        if pooled.closed:
+            return
+        # Disconnect off the caller's thread: terminating a session waits for the server
+        threading.Thread(target=_disconnect_quietly, args=(pooled.client,), daemon=True).start()
+
+    def _warm(self, now):
+        return self._last_demand is not None and now - self._last_demand < self.keep_warm
+
+    def start(self):
+        """Start the background refill thread (call after forking, if pre-forked)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refill_loop, name='stt-pool', daemon=True)
+            self._thread.start()
+
+    def _refill_loop(self):
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            with self._lock:
+                for pooled in list(self._idle):
+                    if pooled.closed or now - pooled.connected_at >= self.idle_timeout:
+                        self._idle.remove(pooled)
+                        self._discard(pooled, 'closed' if pooled.closed else 'idle_timeout')
+                wanted = self.size - len(self._idle) if self._warm(now) else 0
+
+            for _ in range(max(wanted, 0)):
+                try:
+                    pooled = self._open('pool')
+                except Exception as e:
+                    print(f"⚠️ Could not pre-connect STT session: {e}")
+                    break
+                with self._lock:
+                    self._idle.append(pooled)
+
+            self._wake.wait(self.refill_interval)
+            self._wake.clear()
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "oldest_idle_seconds": round(now - self._idle[0].connected_at, 1) if self._idle else None,
+                "idle_timeout": self.idle_timeout,
+                "keep_warm": self.keep_warm,
+                "warm": self._warm(now),
+            }
+
+    def close(self):
+        self._stopped.set()
+        self._wake.set()
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.popleft(), 'shutdown')
+
+
+def _disconnect_quietly(client):
+    try:
+        client.disconnect(terminate=True)
+    except Exception:
+        pass
+
+
+def create_stt_pool_from_env(connect):
+    """Pool sized by STT_POOL_SIZE (default 0: every capture connects inline, no billed idle sessions)
+    with STT_POOL_IDLE_TIMEOUT / STT_POOL_KEEP_WARM seconds (keep-warm defaults to the idle timeout)"""
+    keep_warm = os.getenv('STT_POOL_KEEP_WARM')
+    return SttConnectionPool(
+        connect,
+        size=max(int(os.getenv('STT_POOL_SIZE', '0')), 0),
+        idle_timeout=float(os.getenv('STT_POOL_IDLE_TIMEOUT', '30')),
+        keep_warm=float(keep_warm) if keep_warm else None,
+    )
@@ -1,10 +1,18 @@
 import requests
 import json
 import time
+import uuid
 
 BASE_URL = "http://localhost:5000"
 
-def speak_text(text):
+def turn_headers(turn_id=None):
+    """Request headers tying STT, respond and TTS calls of one turn into a single trace"""
+    headers = {'Content-Type': 'application/json'}
+    if turn_id:
+        headers['X-Turn-Id'] = turn_id
+    return headers
+
+def speak_text(text, turn_id=None):
     """Call TTS endpoint to speak the text"""
     try:
         tts_data = {
@@ -16,7 +24,7 @@ def speak_text(text):
         tts_response = requests.post(
             f"{BASE_URL}/tts", 
             json=tts_data,
-            headers={'Content-Type': 'application/json'}
+            headers=turn_headers(turn_id)
         )
         
         if tts_response.status_code == 200:
@@ -30,11 +38,11 @@ def speak_text(text):
         print(f"❌ TTS call failed: {e}")
         return False
 
-def listen_for_speech():
+def listen_for_speech(turn_id=None):
     """Call STT endpoint to listen for user speech"""
     try:
         print("🎤 Listening for your response... (Speak now)")
-        stt_response = requests.get(f"{BASE_URL}/stt")
+        stt_response = requests.get(f"{BASE_URL}/stt", headers=turn_headers(turn_id))
         
         if stt_response.status_code == 200:
             stt_data = stt_response.json()
@@ -82,8 +90,11 @@ def test_interview_flow():
         
         # Continue with responses
         while True:
+            # One id per voice turn: /stt -> /api/respond -> /tts
+            turn_id = uuid.uuid4().hex
+            
             # Listen for user's speech response
-            user_input = listen_for_speech()
+            user_input = listen_for_speech(turn_id)
             
             if user_input is None:
                 print("🔄 Failed to get speech input. Please try typing your response:")
@@ -100,7 +111,7 @@ def test_interview_flow():
             respond_response = requests.post(
                 f"{BASE_URL}/api/respond", 
                 json=response_data,
-                headers={'Content-Type': 'application/json'}
+                headers=turn_headers(turn_id)
             )
             
             if respond_response.status_code != 200:
@@ -111,7 +122,7 @@ def test_interview_flow():
             
             if response_data.get('status') == 'completed':
                 # Speak and show the final message
-                speak_text(response_data['message'])
+                speak_text(response_data['message'], turn_id)
                 print(f"🤖 AI: {response_data['message']}")
                 
                 print("\n🎯" + "="*60)
@@ -128,7 +139,7 @@ def test_interview_flow():
                 break
             else:
                 # Speak and show the next question
-                speak_text(response_data['message'])
+                speak_text(response_data['message'], turn_id)
                 print(f"🤖 AI: {response_data['message']}")
                 print(f"🔢 Questions asked so far: {response_data['question_number']}")
                 print("-" * 70)
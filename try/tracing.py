@@ -0,0 +1,198 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Header clients use to tie /stt, /api/respond and /tts of one voice turn together
+TURN_ID_HEADER = "X-Turn-Id"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed stage of a turn"""
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+        self.thread_id = threading.get_ident()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, status=None):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._start
+            if status:
+                self.status = status
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class ChromeTraceExporter:
+    """Appends finished spans to a file in Chrome Trace Event (JSON array) format, viewable in Perfetto"""
+
+    def __init__(self, path, max_traces=200):
+        self.path = path
+        self.max_traces = max_traces
+        self._lock = threading.Lock()
+        # Only traces that may still be emitting spans need their pid; older ones are evicted
+        self._pids = OrderedDict()
+        self._next_pid = 1
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "w") as f:
+                f.write("[\n")
+
+    def export(self, span):
+        # One "process" row per trace (turn) so stages of a turn line up together
+        with self._lock:
+            pid = self._pids.get(span.trace_id)
+            if pid is None:
+                pid = self._pids[span.trace_id] = self._next_pid
+                self._next_pid += 1
+                while len(self._pids) > self.max_traces:
+                    self._pids.popitem(last=False)
+            else:
+                self._pids.move_to_end(span.trace_id)
+        event = {
+            "name": span.name,
+            "cat": "turn",
+            "ph": "X",
+            "ts": int(span.start_time * 1e6),
+            "dur": int((span.duration or 0) * 1e6),
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": {"trace_id": span.trace_id, "span_id": span.span_id,
+                     "parent_id": span.parent_id, "status": span.status, **span.attributes},
+        }
+        # The trailing "]" is optional in this format, so events can simply be appended
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps(event, default=str) + ",\n")
+
+
+class Tracer:
+    """Collects spans per turn id in an in-process ring buffer of recent traces"""
+
+    def __init__(self, max_traces=200, exporter=None):
+        self.max_traces = max_traces
+        self.exporter = exporter
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start_span(self, name, trace_id=None, **attributes):
+        """Start a span as a child of the current one; returns (span, context token)"""
+        parent = _current_span.get()
+        if trace_id is None:
+            trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        parent_id = parent.span_id if parent and parent.trace_id == trace_id else None
+
+        span = Span(name, trace_id, parent_id, attributes)
+        token = _current_span.set(span)
+        return span, token
+
+    def end_span(self, span, token=None, status=None):
+        span.end(status)
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Ended from a different context (e.g. after a streamed response)
+                pass
+        self._record(span)
+
+    def _record(self, span):
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            else:
+                self._traces.move_to_end(span.trace_id)
+            spans.append(span)
+
+        if self.exporter:
+            try:
+                self.exporter.export(span)
+            except OSError as e:
+                print(f"⚠️ Trace export failed: {e}")
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time the wrapped block as a child span of the current turn"""
+        span, token = self.start_span(name, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            span.set_attribute("error", str(e))
+            self.end_span(span, token, status="error")
+            raise
+        else:
+            self.end_span(span, token)
+
+    def current_trace_id(self):
+        span = _current_span.get()
+        return span.trace_id if span else None
+
+    def get_trace(self, trace_id):
+        with self._lock:
+            spans = list(self._traces.get(trace_id, []))
+        return self._trace_dict(trace_id, spans) if spans else None
+
+    def recent_traces(self, limit=50):
+        with self._lock:
+            items = list(self._traces.items())[-limit:]
+        return [self._trace_dict(trace_id, list(spans)) for trace_id, spans in reversed(items)]
+
+    @staticmethod
+    def _trace_dict(trace_id, spans):
+        spans = sorted(spans, key=lambda s: s.start_time)
+        start = spans[0].start_time
+        end = max(s.start_time + (s.duration or 0) for s in spans)
+        return {
+            "trace_id": trace_id,
+            "start_time": start,
+            "duration_ms": round((end - start) * 1000, 3),
+            "spans": [s.to_dict() for s in spans],
+        }
+
+
+def run_in_context(func, *args, **kwargs):
+    """Wrap func so a background thread keeps the caller's current span as parent"""
+    ctx = contextvars.copy_context()
+    return lambda: ctx.run(func, *args, **kwargs)
+
+
+def create_tracer_from_env():
+    """Tracer sized by TRACE_BUFFER_SIZE, exporting to TRACE_EXPORT_PATH when set"""
+    max_traces = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+    export_path = os.getenv("TRACE_EXPORT_PATH")
+    exporter = ChromeTraceExporter(export_path, max_traces=max_traces) if export_path else None
+    if exporter:
+        print(f"🧵 Exporting trace spans to {export_path}")
+    return Tracer(max_traces=max_traces, exporter=exporter)
+
+
+# Process-wide tracer used by the server
+TRACER = create_tracer_from_env()
@@ -0,0 +1,136 @@
+import os
+import re
+import time
+import torch
+
+# Supported Silero TTS engine variants
+#   stock     - model exactly as published on torch.hub
+#   quantized - dynamic int8 quantization of Linear/LSTM layers
+#   jit       - frozen TorchScript graph optimized for inference
+TTS_VARIANTS = ("stock", "quantized", "jit")
+
+# Sentence boundaries: synthesis can be abandoned between sentences when a turn is cancelled
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+DEFAULT_SAMPLE_RATE = 24000
+DEFAULT_SPEAKER = "en_10"
+WARMUP_TEXT = "Hello! Welcome to your interview."
+
+
+def default_num_threads(workers=1):
+    """Intra-op threads per TTS process, so `workers` processes together use each core once"""
+    return max(1, (os.cpu_count() or 1) // max(workers, 1))
+
+
+def configure_torch_threads(num_threads=None, num_interop_threads=None):
+    """Pin torch intra-op / inter-op thread pools for this worker"""
+    if num_threads:
+        torch.set_num_threads(int(num_threads))
+
+    if num_interop_threads:
+        try:
+            # Can only be set once, before any inter-op parallel work starts
+            torch.set_num_interop_threads(int(num_interop_threads))
+        except RuntimeError as e:
+            print(f"⚠️ Could not set torch inter-op threads: {e}")
+
+    return torch.get_num_threads()
+
+
+def _optimize_inner_model(inner, variant):
+    """Return an optimized copy of the inner Silero network for the given variant"""
+    if variant == "quantized":
+        return torch.quantization.quantize_dynamic(
+            inner,
+            {torch.nn.Linear, torch.nn.LSTM},
+            dtype=torch.qint8,
+        )
+
+    if variant == "jit":
+        if not isinstance(inner, torch.jit.ScriptModule):
+            inner = torch.jit.script(inner)
+        frozen = torch.jit.freeze(inner.eval())
+        return torch.jit.optimize_for_inference(frozen)
+
+    return inner
+
+
+def load_silero_model(variant="stock", language="en", model_id="v3_en", device=None):
+    """Load the Silero TTS model and apply the requested optimization variant"""
+    if variant not in TTS_VARIANTS:
+        raise ValueError(f"Unknown TTS variant '{variant}'. Expected one of {TTS_VARIANTS}")
+
+    device = device or torch.device("cpu")
+
+    model, _ = torch.hub.load(
+        repo_or_dir="snakers4/silero-models",
+        model="silero_tts",
+        language=language,
+        speaker=model_id,
+    )
+    model.to(device)
+
+    if variant == "stock":
+        return model, "stock"
+
+    # The hub package wraps the actual network in `model.model`
+    inner = getattr(model, "model", None)
+    if not isinstance(inner, torch.nn.Module):
+        print(f"⚠️ Silero package exposes no inner network, using stock model instead of '{variant}'")
+        return model, "stock"
+
+    try:
+        with torch.no_grad():
+            model.model = _optimize_inner_model(inner, variant)
+        return model, variant
+    except Exception as e:
+        print(f"⚠️ Could not build '{variant}' TTS variant, falling back to stock model: {e}")
+        model.model = inner
+        return model, "stock"
+
+
+def synthesize(model, text, speaker=DEFAULT_SPEAKER, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Run Silero synthesis without autograd bookkeeping"""
+    with torch.inference_mode():
+        return model.apply_tts(
+            text=text,
+            speaker=speaker,
+            sample_rate=sample_rate,
+            put_accent=True,
+            put_yo=True,
+        )
+
+
+def split_sentences(text):
+    """Split text into sentences (the whole text if there is no boundary)"""
+    sentences = [part.strip() for part in _SENTENCE_END.split(text)]
+    return [sentence for sentence in sentences if sentence] or [text]
+
+
+def warm_up(model, speaker=DEFAULT_SPEAKER, sample_rate=DEFAULT_SAMPLE_RATE, runs=1):
+    """Run throwaway syntheses so the first real request doesn't pay graph/alloc setup"""
+    start = time.perf_counter()
+    for _ in range(runs):
+        synthesize(model, WARMUP_TEXT, speaker=speaker, sample_rate=sample_rate)
+    return time.perf_counter() - start
+
+
+def create_tts_engine(variant=None, num_threads=None, num_interop_threads=None, warmup=True, workers=1):
+    """Configure threading, load the selected variant and warm it up
+
+    Without num_threads or TTS_NUM_THREADS, each of `workers` synthesizing
+    processes gets an equal share of the cores instead of torch's all-cores default.
+    """
+    variant = variant or os.getenv("TTS_VARIANT", "stock")
+    num_threads = num_threads or os.getenv("TTS_NUM_THREADS") or default_num_threads(workers)
+    num_interop_threads = num_interop_threads or os.getenv("TTS_NUM_INTEROP_THREADS", "1")
+
+    threads = configure_torch_threads(num_threads, num_interop_threads)
+    model, loaded_variant = load_silero_model(variant)
+    print(f"🔊 Silero TTS loaded (variant={loaded_variant}, torch threads={threads})")
+
+    if warmup:
+        elapsed = warm_up(model)
+        print(f"🔥 TTS warm-up synthesis took {elapsed:.2f}s")
+
+    return model, loaded_variant
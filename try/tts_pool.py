@@ -0,0 +1,259 @@
+import atexit
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class TTSPoolBusy(Exception):
+    """Raised when the synthesis queue is full (backpressure)"""
+
+
+class TTSWorkerError(Exception):
+    """Raised when a worker fails to synthesize a request"""
+
+
+def _worker_main(worker_id, job_queue, result_queue, variant, num_threads):
+    """TTS worker process: hold one model copy and synthesize jobs from the queue"""
+    # Imported here so the parent web process never needs torch for pool mode
+    from tts_engine import create_tts_engine, synthesize
+
+    model, _ = create_tts_engine(variant=variant, num_threads=num_threads, num_interop_threads=1)
+    result_queue.put(("ready", worker_id, None, None, 0, None))
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+
+        job_id, text, speaker, sample_rate = job
+        # Lets the parent fail this job if the process dies before reporting a result
+        result_queue.put(("start", worker_id, job_id, None, 0, None))
+        try:
+            audio = synthesize(model, text, speaker=speaker, sample_rate=sample_rate)
+            samples = np.ascontiguousarray(audio.numpy(), dtype=np.float32)
+
+            # Hand the samples back through shared memory instead of pickling the tensor
+            shm = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+            np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)[:] = samples
+            result_queue.put(("done", worker_id, job_id, shm.name, samples.shape[0], None))
+            shm.close()
+        except Exception as e:
+            result_queue.put(("done", worker_id, job_id, None, 0, str(e)))
+
+
+@contextmanager
+def _without_main_reimport():
+    """Stop spawn from re-executing the web app module (Gemini probe, model load) in each worker"""
+    main_module = sys.modules["__main__"]
+    saved_spec = getattr(main_module, "__spec__", None)
+    saved_file = getattr(main_module, "__file__", None)
+
+    main_module.__spec__ = None
+    if saved_file is not None:
+        del main_module.__file__
+    try:
+        yield
+    finally:
+        main_module.__spec__ = saved_spec
+        if saved_file is not None:
+            main_module.__file__ = saved_file
+
+
+class TTSWorkerPool:
+    """N worker processes, each holding one Silero model, fed through a bounded queue
+
+    Workers report which job they take, so when one dies its job fails with
+    TTSWorkerError instead of hanging, and the worker is started again.
+    """
+
+    def __init__(self, num_workers=2, max_pending=16, variant=None, num_threads=1, check_interval=1.0):
+        self.num_workers = num_workers
+        self.max_pending = max_pending
+        self.check_interval = check_interval
+        self.restarts = 0
+
+        self._ctx = mp.get_context("spawn")
+        self._variant = variant
+        self._num_threads = num_threads
+        self._job_queue = self._ctx.Queue(maxsize=max_pending)
+        self._result_queue = self._ctx.Queue()
+        self._futures = {}
+        self._futures_lock = threading.Lock()
+        # worker id -> job id it is synthesizing
+        self._in_flight = {}
+        self._job_ids = itertools.count()
+        self._ready = threading.Event()
+        self._ready_count = 0
+        self._closed = False
+
+        self._workers = [self._start_worker(worker_id) for worker_id in range(num_workers)]
+
+        self._dispatcher = threading.Thread(target=self._dispatch_results, name="tts-pool-dispatcher", daemon=True)
+        self._dispatcher.start()
+        atexit.register(self.shutdown)
+
+    def _start_worker(self, worker_id):
+        with _without_main_reimport():
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self._job_queue, self._result_queue, self._variant, self._num_threads),
+                name=f"tts-worker-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+        return process
+
+    def _fail(self, job_id, error):
+        with self._futures_lock:
+            future = self._futures.pop(job_id, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def _restart_dead_workers(self):
+        """Fail the job of each worker that died mid-synthesis and start a replacement"""
+        for worker_id, process in enumerate(self._workers):
+            if process.is_alive() or self._closed:
+                continue
+            job_id = self._in_flight.pop(worker_id, None)
+            if job_id is not None:
+                self._fail(job_id, TTSWorkerError(f"TTS worker {worker_id} exited (code {process.exitcode}) mid-synthesis"))
+            print(f"⚠️ TTS worker {worker_id} exited (code {process.exitcode}); restarting")
+            self.restarts += 1
+            self._workers[worker_id] = self._start_worker(worker_id)
+
+    def _dispatch_results(self):
+        """Resolve pending futures as workers report results, and replace workers that die"""
+        last_check = time.monotonic()
+        while True:
+            if time.monotonic() - last_check >= self.check_interval:
+                self._restart_dead_workers()
+                last_check = time.monotonic()
+            try:
+                kind, worker_id, job_id, shm_name, num_samples, error = self._result_queue.get(timeout=self.check_interval)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            if kind == "ready":
+                self._ready_count += 1
+                if self._ready_count >= self.num_workers:
+                    self._ready.set()
+                continue
+            if kind == "stop":
+                break
+            if kind == "start":
+                self._in_flight[worker_id] = job_id
+                continue
+
+            self._in_flight.pop(worker_id, None)
+            with self._futures_lock:
+                future = self._futures.pop(job_id, None)
+
+            if error is not None:
+                if future:
+                    future.set_exception(TTSWorkerError(error))
+                continue
+
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                audio = np.ndarray((num_samples,), dtype=np.float32, buffer=shm.buf).copy()
+            finally:
+                shm.close()
+                shm.unlink()
+
+            if future:
+                future.set_result(audio)
+
+    def wait_until_ready(self, timeout=None):
+        """Block until every worker has loaded and warmed up its model"""
+        return self._ready.wait(timeout)
+
+    def submit(self, text, speaker, sample_rate, block_timeout=0.5):
+        """Queue a synthesis job, raising TTSPoolBusy if the queue stays full"""
+        return self._enqueue(text, speaker, sample_rate, block_timeout)[1]
+
+    def _enqueue(self, text, speaker, sample_rate, block_timeout):
+        if self._closed:
+            raise TTSWorkerError("TTS pool is shut down")
+
+        job_id = next(self._job_ids)
+        future = Future()
+        with self._futures_lock:
+            self._futures[job_id] = future
+
+        try:
+            self._job_queue.put((job_id, text, speaker, sample_rate), timeout=block_timeout)
+        except queue.Full:
+            with self._futures_lock:
+                self._futures.pop(job_id, None)
+            raise TTSPoolBusy(f"TTS queue is full ({self.max_pending} pending jobs)")
+
+        return job_id, future
+
+    def synthesize(self, text, speaker, sample_rate, timeout=60):
+        """Synthesize text in a worker process and return float32 samples"""
+        job_id, future = self._enqueue(text, speaker, sample_rate, block_timeout=0.5)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._futures_lock:
+                self._futures.pop(job_id, None)
+            raise TTSWorkerError(f"TTS synthesis timed out after {timeout}s")
+
+    def stats(self):
+        """Snapshot of pool state for health reporting"""
+        with self._futures_lock:
+            pending = len(self._futures)
+        return {
+            "workers": self.num_workers,
+            "alive_workers": sum(1 for p in self._workers if p.is_alive()),
+            "restarts": self.restarts,
+            "ready": self._ready.is_set(),
+            "pending_jobs": pending,
+            "max_pending": self.max_pending,
+        }
+
+    def shutdown(self):
+        """Stop workers and the result dispatcher"""
+        if self._closed:
+            return
+        self._closed = True
+
+        for _ in self._workers:
+            try:
+                self._job_queue.put(None, timeout=1)
+            except queue.Full:
+                break
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+        self._result_queue.put(("stop", None, None, None, 0, None))
+
+
+def create_tts_pool_from_env():
+    """Build a worker pool from TTS_WORKERS / TTS_MAX_PENDING, or None for in-process TTS"""
+    num_workers = int(os.getenv("TTS_WORKERS", "0"))
+    if num_workers <= 0:
+        return None
+
+    pool = TTSWorkerPool(
+        num_workers=num_workers,
+        max_pending=int(os.getenv("TTS_MAX_PENDING", str(num_workers * 4))),
+        variant=os.getenv("TTS_VARIANT", "stock"),
+        # Default: the cores split between the workers (tts_engine.default_num_threads, without importing torch here)
+        num_threads=int(os.getenv("TTS_NUM_THREADS") or max(1, (os.cpu_count() or 1) // num_workers)),
+    )
+    print(f"🔊 Started TTS worker pool with {num_workers} processes")
+    return pool
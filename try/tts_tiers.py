@@ -0,0 +1,293 @@
+import os
+import tempfile
+import threading
+import time
+import wave
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from audio_encoding import to_float32
+from metrics import REGISTRY
+from tts_pool import TTSPoolBusy
+
+TTS_TIER_DECISIONS = REGISTRY.counter(
+    'tts_tier_decisions', 'TTS engine tier chosen per request and why', ['tier', 'reason'])
+TTS_PRIMARY_QUEUE_DEPTH = REGISTRY.gauge(
+    'tts_primary_queue_depth', 'Requests waiting for a Silero synthesis slot')
+TTS_PRIMARY_WAIT_SECONDS = REGISTRY.histogram(
+    'tts_primary_wait_seconds', 'Time requests waited for a Silero synthesis slot')
+
+
+class TierDecision:
+    """Which engine served a request, and the load that led to it"""
+
+    def __init__(self, tier, reason, queue_depth, estimated_wait):
+        self.tier = tier
+        self.reason = reason
+        self.queue_depth = queue_depth
+        self.estimated_wait = estimated_wait
+
+    def to_dict(self):
+        return {
+            "tier": self.tier,
+            "reason": self.reason,
+            "queue_depth": self.queue_depth,
+            "estimated_wait_ms": round(self.estimated_wait * 1000),
+        }
+
+
+class AudioCache:
+    """LRU of synthesized audio by (text, speaker, sample rate), bounded by total bytes"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, text, speaker, sample_rate):
+        key = (text.strip(), speaker, sample_rate)
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+            return audio
+
+    def put(self, text, speaker, sample_rate, audio):
+        audio = to_float32(audio)
+        if audio.nbytes > self.max_bytes:
+            return
+        key = (text.strip(), speaker, sample_rate)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = audio
+            self._bytes += audio.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+class Pyttsx3Synthesizer:
+    """The local pyttsx3 engine as a cheap fallback voice, rendered to samples instead of speakers
+
+    The engine renders one utterance at a time, so at most max_waiting requests
+    queue for it and each waits at most wait_timeout; past that TTSPoolBusy is
+    raised instead of letting a spike queue up behind the fallback too.
+    """
+
+    def __init__(self, engine, max_waiting=2, wait_timeout=1.0):
+        self.engine = engine
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        # pyttsx3 engines are not thread-safe and run one utterance loop at a time
+        self._lock = threading.Lock()
+        self._admission = threading.BoundedSemaphore(max_waiting + 1)
+
+    @contextmanager
+    def _engine_slot(self):
+        if not self._admission.acquire(blocking=False):
+            raise TTSPoolBusy(f"pyttsx3 fallback queue is full ({self.max_waiting} waiting)")
+        try:
+            if not self._lock.acquire(timeout=self.wait_timeout):
+                raise TTSPoolBusy(f"pyttsx3 fallback busy for more than {self.wait_timeout}s")
+            try:
+                yield
+            finally:
+                self._lock.release()
+        finally:
+            self._admission.release()
+
+    def synthesize(self, text, sample_rate):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with self._engine_slot():
+                self.engine.save_to_file(text, path)
+                self.engine.runAndWait()
+            with wave.open(path, "rb") as wav:
+                if wav.getsampwidth() != 2:
+                    raise ValueError(f"Unsupported pyttsx3 sample width: {wav.getsampwidth()}")
+                channels = wav.getnchannels()
+                source_rate = wav.getframerate()
+                samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").astype(np.float32) / 32768
+        finally:
+            os.unlink(path)
+
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        return _resample(samples, source_rate, sample_rate)
+
+
+def _resample(samples, source_rate, target_rate):
+    """Linear-interpolation resample; good enough for the degraded voice tier"""
+    if source_rate == target_rate or not len(samples):
+        return np.ascontiguousarray(samples, dtype=np.float32)
+    duration = len(samples) / source_rate
+    target_times = np.arange(int(duration * target_rate)) / target_rate
+    source_times = np.arange(len(samples)) / source_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+class TieredTTS:
+    """Silero while its queue is short; cached audio or the pyttsx3 voice once waiting would grow
+
+    Silero runs behind `concurrency` slots. The expected wait for a new request
+    is estimated from the number already waiting and the recent service time,
+    and requests over max_queue_depth / max_wait_seconds are degraded instead
+    of queued.
+    """
+
+    def __init__(self, fallback=None, cache=None, concurrency=1, max_queue_depth=4, max_wait_seconds=1.5):
+        self.fallback = fallback
+        self.cache = cache
+        self.concurrency = concurrency
+        self.max_queue_depth = max_queue_depth
+        self.max_wait_seconds = max_wait_seconds
+        self._slots = threading.Semaphore(concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._active = 0
+        self._service_seconds = None
+
+    def _estimated_wait(self):
+        if self._service_seconds is None or self._active + self._waiting < self.concurrency:
+            return 0.0
+        return (self._waiting + 1) * self._service_seconds / self.concurrency
+
+    def _decide(self):
+        """Pick primary or fallback from current load; a primary decision reserves a queue place"""
+        with self._lock:
+            depth = self._waiting
+            wait = self._estimated_wait()
+            if depth >= self.max_queue_depth:
+                reason = "queue_depth"
+            elif wait >= self.max_wait_seconds:
+                reason = "queue_wait"
+            else:
+                reason = None
+
+            if reason and self.fallback is not None:
+                return TierDecision("pyttsx3", reason, depth, wait)
+
+            self._waiting += 1
+            TTS_PRIMARY_QUEUE_DEPTH.inc()
+            return TierDecision("silero", reason or "idle", depth, wait)
+
+    @contextmanager
+    def _primary_slot(self):
+        start = time.perf_counter()
+        acquired = False
+        try:
+            self._slots.acquire()
+            acquired = True
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                if acquired:
+                    self._active += 1
+            TTS_PRIMARY_QUEUE_DEPTH.dec()
+        TTS_PRIMARY_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+        service_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - service_start
+            with self._lock:
+                self._active -= 1
+                # Exponentially weighted so the estimate follows the current text lengths and CPU load
+                self._service_seconds = elapsed if self._service_seconds is None else 0.8 * self._service_seconds + 0.2 * elapsed
+            self._slots.release()
+
+    def synthesize(self, text, speaker, sample_rate, primary, on_primary=None):
+        """Return (audio, TierDecision); primary(text) runs Silero for the whole text
+
+        on_primary(decision) is called as Silero starts, for callers that
+        stream its output before the whole text is synthesized.
+        """
+        if self.cache is not None:
+            audio = self.cache.get(text, speaker, sample_rate)
+            if audio is not None:
+                with self._lock:
+                    decision = TierDecision("cache", "cached", self._waiting, self._estimated_wait())
+                TTS_TIER_DECISIONS.inc(tier=decision.tier, reason=decision.reason)
+                return audio, decision
+
+        decision = self._decide()
+        if decision.tier == "silero":
+            try:
+                with self._primary_slot():
+                    if on_primary is not None:
+                        on_primary(decision)
+                    audio = primary(text)
+            except TTSPoolBusy:
+                if self.fallback is None:
+                    raise
+                decision = TierDecision("pyttsx3", "primary_busy", decision.queue_depth, decision.estimated_wait)
+            else:
+                TTS_TIER_DECISIONS.inc(tier=decision.tier, reason=decision.reason)
+                if self.cache is not None:
+                    self.cache.put(text, speaker, sample_rate, audio)
+                return audio, decision
+
+        try:
+            audio = self.fallback.synthesize(text, sample_rate)
+        except TTSPoolBusy:
+            # Both tiers are saturated: shed the request rather than queue it without bound
+            TTS_TIER_DECISIONS.inc(tier="rejected", reason="fallback_busy")
+            raise
+        except Exception as e:
+            # A broken local voice must not fail the request: queue for Silero after all
+            print(f"⚠️ pyttsx3 fallback failed, using Silero: {e}")
+            decision = TierDecision("silero", "fallback_failed", decision.queue_depth, decision.estimated_wait)
+            with self._lock:
+                self._waiting += 1
+            TTS_PRIMARY_QUEUE_DEPTH.inc()
+            with self._primary_slot():
+                if on_primary is not None:
+                    on_primary(decision)
+                audio = primary(text)
+        TTS_TIER_DECISIONS.inc(tier=decision.tier, reason=decision.reason)
+        return audio, decision
+
+    def stats(self):
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "waiting": self._waiting,
+                "active": self._active,
+                "estimated_wait_ms": round(self._estimated_wait() * 1000),
+                "service_ms": round(self._service_seconds * 1000) if self._service_seconds is not None else None,
+                "max_queue_depth": self.max_queue_depth,
+                "max_wait_ms": round(self.max_wait_seconds * 1000),
+                "fallback": self.fallback is not None,
+                "cache": self.cache.stats() if self.cache is not None else None,
+            }
+
+
+def create_tiered_tts_from_env(engine, concurrency):
+    """Tiers configured by TTS_DEGRADE_QUEUE_DEPTH, TTS_DEGRADE_WAIT_MS, TTS_AUDIO_CACHE_MB, TTS_FALLBACK,
+    TTS_FALLBACK_MAX_WAITING and TTS_FALLBACK_WAIT_MS"""
+    fallback = None
+    if engine is not None and os.getenv("TTS_FALLBACK", "1") == "1":
+        fallback = Pyttsx3Synthesizer(
+            engine,
+            max_waiting=int(os.getenv("TTS_FALLBACK_MAX_WAITING", "2")),
+            wait_timeout=float(os.getenv("TTS_FALLBACK_WAIT_MS", "1000")) / 1000,
+        )
+    cache_mb = float(os.getenv("TTS_AUDIO_CACHE_MB", "64"))
+    return TieredTTS(
+        fallback=fallback,
+        cache=AudioCache(int(cache_mb * 1024 * 1024)) if cache_mb > 0 else None,
+        concurrency=concurrency,
+        max_queue_depth=int(os.getenv("TTS_DEGRADE_QUEUE_DEPTH", "4")),
+        max_wait_seconds=float(os.getenv("TTS_DEGRADE_WAIT_MS", "1500")) / 1000,
+    )